@@ -1,5 +1,7 @@
 # observers/git_hooks/post-commit.py
 
+from __future__ import annotations
+
 import sys
 import os
 
@@ -10,47 +12,280 @@ src_path = os.path.join(project_root, 'src')
 if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
-import requests
-import git
-from datetime import datetime, timezone
-from typing import Dict, Optional
-from cortex.models.events import GitCommitEvent
+import json
+import subprocess
+import configparser
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+# GitPython, requests, pygit2 and the cortex models (pydantic) are comparatively
+# slow to import, so they are imported where they are first needed. A repository
+# without `cortex.api-url` configured exits before loading any of them.
+if TYPE_CHECKING:
+    import git
+    import requests
+    from cortex.models.events import GitCommitEvent
+
+@lru_cache(maxsize=None)
+def _load_pygit2() -> Any:
+    """
+    Returns the pygit2 module, or None if it is not installed.
+
+    pygit2 (libgit2 bindings) lets us compute the diff in-process instead of
+    forking a `git` subprocess per call. It is optional: when it is not installed
+    the hook falls back to GitPython, which shells out to `git`.
+    """
+    try:
+        import pygit2
+    except ImportError:
+        return None
+    return pygit2
+
+# Commit timestamps are epoch seconds; adding a timedelta to a UTC epoch
+# constant avoids the timezone conversion done by datetime.fromtimestamp.
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Opened pygit2 repositories, keyed by working directory.
+_PYGIT2_REPOS: Dict[str, Any] = {}
+
+def _get_pygit2_repo(working_dir: str) -> Any:
+    """Returns a cached pygit2 repository for the given working directory."""
+    p_repo = _PYGIT2_REPOS.get(working_dir)
+    if p_repo is None:
+        p_repo = _load_pygit2().Repository(working_dir)
+        _PYGIT2_REPOS[working_dir] = p_repo
+    return p_repo
+
+# Diffs larger than this are left out of the event (see _diff_within_limits):
+# a huge merge commit can produce a multi-megabyte patch.
+MAX_DIFF_FILES = 50
+MAX_DIFF_LINES = 5000
+
+def _diff_within_limits(stats: Dict[str, int]) -> bool:
+    """Returns True if a diff with these shortstat numbers is small enough to embed."""
+    changed_lines = stats["insertions"] + stats["deletions"]
+    return stats["files_changed"] < MAX_DIFF_FILES and changed_lines < MAX_DIFF_LINES
+
+def _probe_in_process(commit: git.Commit) -> Tuple[Dict[str, int], Callable[[], str]]:
+    """
+    Diff backend using libgit2, without spawning `git`. The stats come from
+    Diff.stats, so the patch text is not generated until it is requested.
+    """
+    p_repo = _get_pygit2_repo(commit.repo.working_dir)
+    p_commit = p_repo[commit.hexsha]
+
+    if p_commit.parents:
+        diff = p_repo.diff(p_commit.parents[0], p_commit)
+    else:
+        # Root commit: diff the tree against the empty tree.
+        diff = p_commit.tree.diff_to_tree(swap=True)
+
+    diff_stats = diff.stats
+    stats_dict = {
+        "files_changed": diff_stats.files_changed,
+        "insertions": diff_stats.insertions,
+        "deletions": diff_stats.deletions,
+    }
+    return stats_dict, lambda: diff.patch or ""
+
+def _probe_with_subprocess(commit: git.Commit) -> Tuple[Dict[str, int], Callable[[], str]]:
+    """
+    Diff backend using GitPython (forks `git`). The numstat probe runs first;
+    the patch is only read when it is requested.
+    """
+    repo = commit.repo
+    commit_stats = commit.stats.total
+    stats_dict = {
+        "files_changed": commit_stats.get("files", 0),
+        "insertions": commit_stats.get("insertions", 0),
+        "deletions": commit_stats.get("deletions", 0),
+    }
+    if commit.parents:
+        return stats_dict, lambda: repo.git.diff(commit.parents[0], commit)
+    return stats_dict, lambda: repo.git.show(commit.hexsha)
+
+def get_commit_diff(commit: git.Commit) -> Tuple[Optional[str], Optional[Dict[str, int]]]:
+    """
+    Computes the commit diff and stats, preferring libgit2 when available.
 
-def get_commit_details(commit: git.Commit) -> GitCommitEvent:
+    Returns:
+        A (diff_text, stats_dict) tuple. diff_text is None when the diff is
+        too large to embed, and stats_dict is None for root commits.
+    """
+    probe = _probe_in_process if _load_pygit2() is not None else _probe_with_subprocess
+    stats_dict, load_patch = probe(commit)
+    diff_text = load_patch() if _diff_within_limits(stats_dict) else None
+    return diff_text, stats_dict if commit.parents else None
+
+# Repository settings (API URL, repo name, branch) are persisted here so the
+# steady-state hook path skips config parsing and branch resolution.
+CACHE_FILE_NAME = "cortex-cache.json"
+
+# In-process memo of resolved repository settings, keyed by (git_dir, stamp).
+_REPO_SETTINGS: Dict[Tuple[str, Tuple[float, ...]], Dict[str, Optional[str]]] = {}
+
+def _settings_stamp(git_dir: str) -> Tuple[float, ...]:
+    """
+    Returns the mtimes of the files the cached settings are derived from.
+
+    The git directory's own mtime changes on every commit (lock files are
+    renamed into place), so we key on `config` and `HEAD` instead.
+    """
+    return (os.stat(_config_path(git_dir)).st_mtime, os.stat(os.path.join(git_dir, "HEAD")).st_mtime)
+
+def _config_path(git_dir: str) -> str:
+    """
+    Returns the path of the repository's config file.
+
+    Linked worktrees have their own git dir but share the main repository's
+    config, which is found through the `commondir` file.
+    """
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r", encoding="utf-8") as f:
+            common_dir = f.read().strip()
+    except OSError:
+        return os.path.join(git_dir, "config")
+    return os.path.join(git_dir, common_dir, "config")
+
+def _find_git_dir() -> Optional[str]:
+    """
+    Locates the git dir without GitPython: `$GIT_DIR` if git exported it,
+    otherwise the nearest `.git` directory (or `gitdir:` file) above the cwd.
+    """
+    git_dir = os.environ.get("GIT_DIR")
+    if git_dir:
+        return os.path.abspath(git_dir)
+
+    directory = os.getcwd()
+    while True:
+        candidate = os.path.join(directory, ".git")
+        if os.path.isdir(candidate):
+            return candidate
+        if os.path.isfile(candidate):
+            try:
+                with open(candidate, "r", encoding="utf-8") as f:
+                    content = f.read().strip()
+            except OSError:
+                return None
+            if content.startswith("gitdir:"):
+                return os.path.normpath(os.path.join(directory, content[len("gitdir:"):].strip()))
+            return None
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+@lru_cache(maxsize=8)
+def _read_local_config_value(config_path: str, mtime: float, section: str, option: str) -> Optional[str]:
+    """
+    Reads a single value from a repository's `.git/config`.
+
+    `cortex.api-url` is set with `git config --local`, so only the local file is
+    parsed instead of GitPython's full system/global/local config chain. The
+    mtime argument is part of the cache key, so edits to the file are picked up.
+    """
+    parser = configparser.RawConfigParser(
+        allow_no_value=True,
+        strict=False,
+        inline_comment_prefixes=("#", ";"),
+    )
+    parser.read(config_path, encoding="utf-8")
+    value = parser.get(section, option, fallback=None)
+    if value is None:
+        return None
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        value = value[1:-1]
+    return value or None
+
+# Returned by _read_api_url_fast when the config can't be read without GitPython.
+_URL_NOT_READ = object()
+
+def _get_api_url(repo: git.Repo) -> Optional[str]:
+    """Returns `cortex.api-url` from the local git config, or None if it's missing."""
+    config_path = _config_path(repo.git_dir)
+    try:
+        return _read_local_config_value(config_path, os.stat(config_path).st_mtime, "cortex", "api-url")
+    except (OSError, configparser.Error):
+        # Fall back to GitPython for anything the plain INI parser can't handle.
+        raw_url = repo.config_reader().get_value("cortex", "api-url", default=None)
+        return str(raw_url) if raw_url else None
+
+def _resolve_repo_settings(repo: git.Repo, api_url: Any = _URL_NOT_READ) -> Dict[str, Optional[str]]:
+    """
+    Reads the API URL, repository name and branch name from git. An api_url
+    already read by _read_api_url_fast is used as-is.
+    """
+    if api_url is _URL_NOT_READ:
+        api_url = _get_api_url(repo)
+
+    try:
+        branch_name = repo.active_branch.name
+    except TypeError:
+        branch_name = "DETACHED_HEAD"
+
+    return {
+        "api_url": api_url,
+        "repo_name": os.path.basename(repo.working_dir),
+        "branch_name": branch_name,
+    }
+
+def get_repo_settings(repo: git.Repo, api_url: Any = _URL_NOT_READ) -> Dict[str, Optional[str]]:
+    """
+    Returns the repository settings, reusing `.git/cortex-cache.json` while
+    the git config and HEAD are unchanged. Pass the result of
+    _read_api_url_fast as api_url to avoid reading the config again.
+    """
+    git_dir = repo.git_dir
+    stamp = _settings_stamp(git_dir)
+    memo_key = (git_dir, stamp)
+    if memo_key in _REPO_SETTINGS:
+        return _REPO_SETTINGS[memo_key]
+
+    cache_path = os.path.join(git_dir, CACHE_FILE_NAME)
+    settings: Optional[Dict[str, Optional[str]]] = None
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if tuple(cached.get("cache_mtime", ())) == stamp:
+            settings = {key: cached.get(key) for key in ("api_url", "repo_name", "branch_name")}
+    except (OSError, ValueError):
+        pass
+
+    if settings is None:
+        settings = _resolve_repo_settings(repo, api_url)
+        try:
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump({**settings, "cache_mtime": list(stamp)}, f)
+        except OSError:
+            # The cache is an optimisation only; never fail the hook over it.
+            pass
+
+    _REPO_SETTINGS[memo_key] = settings
+    return settings
+
+def get_commit_details(commit: git.Commit, repo_settings: Optional[Dict[str, Optional[str]]] = None) -> GitCommitEvent:
     """
     A pure function to extract data from a Git commit object and
     shape it directly into our Pydantic model.
     
     Args:
         commit: A git.Commit object.
+        repo_settings: Pre-resolved repository settings (see get_repo_settings).
+            Resolved from the commit's repository when not provided.
 
     Returns:
         An instance of the GitCommitEvent Pydantic model.
     """
-    repo = commit.repo
-    repo_name = os.path.basename(repo.working_dir)
-    
-    try:
-        branch_name = repo.active_branch.name
-    except TypeError:
-        branch_name = "DETACHED_HEAD"
+    if repo_settings is None:
+        repo_settings = get_repo_settings(commit.repo)
+    repo_name = repo_settings["repo_name"]
+    branch_name = repo_settings["branch_name"]
         
-    author_datetime_utc = datetime.fromtimestamp(commit.authored_date, tz=timezone.utc)
-
-    stats_dict: Optional[Dict[str, int]] = None
-    diff_text: Optional[str] = None
+    author_datetime_utc = _EPOCH + timedelta(seconds=commit.authored_date)
 
-    if commit.parents:
-        parent = commit.parents[0]
-        diff_text = repo.git.diff(parent, commit)
-        commit_stats = commit.stats.total
-        stats_dict = {
-            "files_changed": commit_stats.get("files", 0),
-            "insertions": commit_stats.get("insertions", 0),
-            "deletions": commit_stats.get("deletions", 0),
-        }
-    else:
-        diff_text = repo.git.show(commit.hexsha)
+    diff_text, stats_dict = get_commit_diff(commit)
 
     
     raw_message = commit.message 
@@ -59,6 +294,8 @@ def get_commit_details(commit: git.Commit) -> GitCommitEvent:
     else:
         message_str = str(raw_message)
 
+    from cortex.models.events import GitCommitEvent
+
     # Use the Pydantic model to construct and validate the event data.
     # This guarantees the data shape is correct.
     return GitCommitEvent(
@@ -71,21 +308,207 @@ def get_commit_details(commit: git.Commit) -> GitCommitEvent:
         author_email=commit.author.email,
         timestamp=author_datetime_utc,
         diff=diff_text,
+        truncated_diff=diff_text is None,
     )
 
+# Events that could not be delivered (e.g. while offline) are appended here,
+# one JSON document per line, and re-sent by the next hook run.
+QUEUE_FILE_NAME = "cortex-queue.jsonl"
+
+# Events the API rejected (4xx) are moved here instead of being retried:
+# re-sending the same body would fail again and block every event behind it.
+DEAD_LETTER_FILE_NAME = "cortex-dead-letter.jsonl"
+
+_SESSION: Optional[requests.Session] = None
+
+def _build_session() -> requests.Session:
+    """Creates a pooled session so queued events share one keep-alive connection."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=4,
+        max_retries=Retry(total=2, backoff_factor=0.1),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def _get_session() -> requests.Session:
+    """Returns the shared session, creating it on first use."""
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = _build_session()
+    return _SESSION
+
+def _post_payload(body: bytes, url: str) -> None:
+    """POSTs an already-serialized event to the Cortex API."""
+    response = _get_session().post(
+        url,
+        data=body,
+        headers={"Content-Type": "application/json", "Content-Length": str(len(body))},
+        timeout=5
+    )
+    response.raise_for_status()
+
 def send_event(event: GitCommitEvent, url: str) -> None:
     """
     An impure function with a single responsibility: send the event.
     It now takes the Pydantic model instance directly.
     """
-    # .model_dump_json() is the canonical way to serialize a Pydantic model to JSON
-    response = requests.post(
-        url,
-        data=event.model_dump_json(),
-        headers={"Content-Type": "application/json"},
-        timeout=5
+    # event.body is serialized once per event and reused across retries
+    _post_payload(event.body, url)
+
+def _enqueue_payloads(payloads: List[bytes], queue_path: str) -> None:
+    """Appends serialized events to the on-disk queue."""
+    with open(queue_path, "ab") as f:
+        f.writelines(payload + b"\n" for payload in payloads)
+
+def _dead_letter_path(queue_path: str) -> str:
+    """Returns the dead-letter file that sits next to the given queue file."""
+    return os.path.join(os.path.dirname(queue_path), DEAD_LETTER_FILE_NAME)
+
+def _is_retryable(error: requests.RequestException) -> bool:
+    """
+    Returns True if a failed delivery is worth retrying later.
+
+    Only network failures and server errors (5xx) are transient; any other
+    error, notably a 4xx rejection of the body, would recur on every retry.
+    """
+    import requests
+
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+def _claim_queue(queue_path: str) -> List[bytes]:
+    """
+    Takes ownership of the queued events and returns them.
+
+    The queue file is renamed before it is read, so when two hook runs drain
+    concurrently only one of them gets (and later removes) each batch.
+    """
+    claimed_path = f"{queue_path}.{os.getpid()}"
+    try:
+        os.rename(queue_path, claimed_path)
+    except FileNotFoundError:
+        return []
+    with open(claimed_path, "rb") as f:
+        pending = [line.rstrip(b"\n") for line in f if line.strip()]
+    os.remove(claimed_path)
+    return pending
+
+def drain_queue(url: str, queue_path: str) -> None:
+    """
+    Re-sends events queued by earlier runs, oldest first.
+
+    Queued lines are already-serialized request bodies and are sent as-is.
+    Events the API rejects are moved to the dead-letter file. On a transient
+    failure the unsent events are put back on the queue and the error is re-raised.
+    """
+    import requests
+
+    pending = _claim_queue(queue_path)
+    for i, payload in enumerate(pending):
+        try:
+            _post_payload(payload, url)
+        except requests.RequestException as e:
+            if not _is_retryable(e):
+                _enqueue_payloads([payload], _dead_letter_path(queue_path))
+                continue
+            _enqueue_payloads(pending[i:], queue_path)
+            raise
+
+def deliver_payload(body: bytes, url: str, queue_path: str) -> None:
+    """
+    Sends any queued events followed by this serialized event. If delivery
+    fails the event is queued for retry, or dead-lettered if it was rejected.
+    """
+    import requests
+
+    try:
+        drain_queue(url, queue_path)
+        _post_payload(body, url)
+    except requests.RequestException as e:
+        target = queue_path if _is_retryable(e) else _dead_letter_path(queue_path)
+        _enqueue_payloads([body], target)
+        raise
+
+def deliver_event(event: GitCommitEvent, url: str, queue_path: str) -> None:
+    """
+    Sends any queued events followed by this one, queueing it if delivery fails.
+    """
+    deliver_payload(event.body, url, queue_path)
+
+def send_event_detached(event: GitCommitEvent, url: str, queue_path: str) -> None:
+    """
+    Sends the event from a detached process so `git commit` returns immediately.
+
+    On POSIX the hook forks; the child starts a new session, drops the inherited
+    stdio (so git does not wait on it) and performs the POST. Elsewhere the
+    script is re-invoked in `--send` mode with the serialized event on stdin.
+    The event is fully built beforehand, so the sender needs no git access.
+    """
+    if hasattr(os, "fork"):
+        body = event.body
+        pid = os.fork()
+        if pid > 0:
+            return
+
+        exit_code = 0
+        try:
+            os.setsid()
+            devnull = os.open(os.devnull, os.O_RDWR)
+            for fd in (0, 1, 2):
+                os.dup2(devnull, fd)
+            deliver_payload(body, url, queue_path)
+        except Exception:
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    creationflags = getattr(subprocess, "DETACHED_PROCESS", 0) | getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+    sender = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--send", url, queue_path],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        creationflags=creationflags,
     )
-    response.raise_for_status()
+    sender.stdin.write(event.body)
+    sender.stdin.close()
+
+def send_from_stdin(url: str, queue_path: str) -> None:
+    """
+    Entry point for `--send` mode: reads a serialized event from stdin and delivers it.
+
+    The bytes were produced by GitCommitEvent.body in the parent, so they are
+    forwarded without re-validating or re-serializing the model.
+    """
+    deliver_payload(sys.stdin.buffer.read().strip(), url, queue_path)
+
+def _read_api_url_fast(git_dir: Optional[str]) -> Any:
+    """
+    Reads `cortex.api-url` without GitPython.
+
+    Returns the URL, None if it is not set, or _URL_NOT_READ when the config
+    cannot be read this way, so the caller falls through to the full GitPython
+    lookup instead of exiting.
+    """
+    if git_dir is None:
+        return _URL_NOT_READ
+    config_path = _config_path(git_dir)
+    try:
+        return _read_local_config_value(config_path, os.stat(config_path).st_mtime, "cortex", "api-url")
+    except (OSError, configparser.Error):
+        return _URL_NOT_READ
+
+def _print_missing_url_hint() -> None:
+    print("[Cortex Observer] Error: Cortex API URL not set in git config.", file=sys.stderr)
+    print("[Cortex Observer] Run: git config --local cortex.api-url \"http://127.0.0.1:8000/api/events\"", file=sys.stderr)
 
 def main() -> None:
 
@@ -97,26 +520,32 @@ def main() -> None:
 
     try:
 
-        # Read the URL from the git config instead of the environment
+        # Read the URL from the git config instead of the environment.
+        # Checked before GitPython is imported so unconfigured repos exit early.
+
+        fast_url = _read_api_url_fast(_find_git_dir())
+
+        if fast_url is None:
+
+            _print_missing_url_hint()
+
+            return
+
+
+
+        import git
 
         repo = git.Repo(search_parent_directories=True)
 
-        # 1. Get the raw value from the config. It could be any type.
-        raw_url = repo.config_reader().get_value("cortex", "api-url")
+        repo_settings = get_repo_settings(repo, fast_url)
 
-        # 2. Explicitly convert the raw value to a string, or None if it's missing.
-        #    This guarantees the type for the rest of the function.
-        url = str(raw_url) if raw_url else None
+        url = repo_settings["api_url"]
 
         
 
         if not url:
 
-            # Update the error message
-
-            print("[Cortex Observer] Error: Cortex API URL not set in git config.", file=sys.stderr)
-
-            print("[Cortex Observer] Run: git config --local cortex.api-url \"http://127.0.0.1:8000/api/events\"", file=sys.stderr)
+            _print_missing_url_hint()
 
             return
 
@@ -126,15 +555,17 @@ def main() -> None:
 
 
 
-        event_payload = get_commit_details(last_commit)
+        event_payload = get_commit_details(last_commit, repo_settings)
+
 
 
+        queue_path = os.path.join(repo.git_dir, QUEUE_FILE_NAME)
 
-        send_event(event_payload, url)
+        send_event_detached(event_payload, url, queue_path)
 
 
 
-        print("[Cortex Observer] Successfully sent commit event.")
+        print("[Cortex Observer] Commit event dispatched in the background.")
 
 
 
@@ -143,4 +574,7 @@ def main() -> None:
         print(f"[Cortex Observer] Error: Failed to send commit event. {e}", file=sys.stderr)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) == 4 and sys.argv[1] == "--send":
+        send_from_stdin(sys.argv[2], sys.argv[3])
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,17 @@
+"""
+Precompiles the prompt templates into Python modules, so workers import them
+at startup instead of parsing the Jinja2 sources. Rerun after editing a prompt.
+
+Usage: python scripts/compile_prompts.py [target_dir]
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from cortex.services.prompt_manager import COMPILED_PROMPTS_DIR, compile_prompts
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else COMPILED_PROMPTS_DIR
+    compile_prompts(target)
+    print(f"Compiled prompt templates into {target}")
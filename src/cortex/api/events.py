@@ -15,5 +15,7 @@ async def create_event(event: GitCommitEvent, request: Request):
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Redis connection not available."
         )
-    await redis.enqueue_job('process_event_task', event.model_dump())
+    # Ship the event as JSON: the worker validates it straight from the string
+    # with pydantic's JSON parser instead of rebuilding the model from a dict.
+    await redis.enqueue_job('process_event_task', event.model_dump_json())
     return {"message": "Event received and queued for processing."}
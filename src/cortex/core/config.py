@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from functools import lru_cache
 from pathlib import Path
 import os 
 
@@ -10,6 +11,18 @@ class Settings(BaseSettings):
     llm_model: str = "llama3.1:latest"
     llm_api_url: str = "http://localhost:11434/api/generate"
     llm_embed_url: str = "http://localhost:11434/api/embed"
+    # Summaries allowed in flight per worker process; match it to the LLM
+    # server's parallel slots (e.g. OLLAMA_NUM_PARALLEL) so it can batch them.
+    llm_max_concurrency: int = 8
+    # Curation runs (agent LLM calls plus Upstash writes) allowed at once per
+    # worker process; further runs wait for a slot instead of piling on.
+    curation_max_concurrency: int = 2
+    # Async embedding requests allowed in flight per worker process; bursts
+    # queue here instead of oversubscribing the Ollama embed model.
+    embed_max_concurrency: int = 4
+    # Write insight front matter with the specialised emitter instead of
+    # yaml.dump; turn off to fall back to PyYAML's (C) dumper.
+    kg_fast_frontmatter: bool = True
     gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
     gemini_flash_model: str = "gemini-2.5-flash"
     gemini_pro_model: str = "gemini-2.5-pro"
@@ -18,6 +31,15 @@ class Settings(BaseSettings):
 
     class Config:
         env_file = ".env"
-        extra = "ignore"   
-         
-        
\ No newline at end of file
+        extra = "ignore"
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Returns the process-wide Settings instance.
+
+    Settings() reads the environment and .env on every construction, so callers
+    that are instantiated per job should use this instead.
+    """
+    return Settings()
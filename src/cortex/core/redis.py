@@ -1,10 +1,38 @@
+from typing import Any
+
 import redis.asyncio as redis
 from arq import create_pool
 from arq.connections import RedisSettings, ArqRedis
+import orjson
+
+def _encode_fallback(value: Any) -> str:
+    """
+    Encodes values orjson cannot serialize. ARQ stores the exception as the
+    result of a failed, timed-out or aborted job; it is kept as its type and
+    message, which Job.result() re-raises as a SerializationError.
+    """
+    if isinstance(value, BaseException):
+        return f"{type(value).__name__}: {value}"
+    return repr(value)
+
+# ARQ pickles jobs by default. Job arguments here are plain strings, so jobs are
+# stored as JSON via orjson instead, which is faster to encode and decode. The
+# API and the worker must use the same pair. The serializer also encodes job
+# results, hence the fallback for non-JSON values.
+# Jobs pickled by an older deployment cannot be decoded by this pair: drain the
+# queues before rolling it out.
+def job_serializer(value: Any) -> bytes:
+    return orjson.dumps(value, default=_encode_fallback)
+
+job_deserializer = orjson.loads
 
 async def create_redis_pool() -> ArqRedis:
     """Creates and returns a new ARQ Redis pool."""
-    return await create_pool(RedisSettings())
+    return await create_pool(
+        RedisSettings(),
+        job_serializer=job_serializer,
+        job_deserializer=job_deserializer,
+    )
 
 async def close_redis_pool(pool: ArqRedis | None):
     """Closes the given Redis pool if it exists."""
@@ -1,9 +1,14 @@
-from typing import List, Union
+from typing import Any, Dict, List, Union
 from fastapi import WebSocket
+import asyncio
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on delivering one broadcast message to a single client.
+BROADCAST_SEND_TIMEOUT_SECONDS = 1.0
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
@@ -26,14 +31,29 @@ class ConnectionManager:
         else:
             await websocket.send_bytes(message)
 
-    async def broadcast(self, message: Union[str, bytes]):
-        for connection in self.active_connections:
-            try:
-                if isinstance(message, str):
-                    await connection.send_text(message)
-                else:
-                    await connection.send_bytes(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to WebSocket {connection.client}: {e}")
-                # Optionally, handle disconnection here if send_text/send_bytes fails due to a closed connection
-                # self.disconnect(connection)
+    async def broadcast(self, message: Union[str, bytes, Dict[str, Any]]):
+        """
+        Sends the message to every connected client concurrently.
+
+        A dict message is serialized to JSON once, before the fan-out.
+
+        Each send is bounded by BROADCAST_SEND_TIMEOUT_SECONDS, so a slow or dead
+        client cannot hold up the others; clients whose send fails are dropped.
+        """
+        if isinstance(message, dict):
+            message = orjson.dumps(message)
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *(self._send_with_timeout(connection, message) for connection in connections),
+            return_exceptions=True,
+        )
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error broadcasting to WebSocket {connection.client}: {result!r}")
+                self.disconnect(connection)
+
+    async def _send_with_timeout(self, websocket: WebSocket, message: Union[str, bytes]):
+        await asyncio.wait_for(
+            self.send_personal_message(message, websocket),
+            timeout=BROADCAST_SEND_TIMEOUT_SECONDS,
+        )
@@ -1,4 +1,5 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 from cortex.api import events
 from cortex.core.redis import create_redis_pool, close_redis_pool
@@ -24,7 +25,7 @@ async def lifespan(app: FastAPI):
     app.state.pubsub_task.cancel()
     await close_redis_pool(app.state.redis)
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.include_router(events.router, prefix="/api")
 
@@ -50,13 +51,13 @@ async def redis_pubsub_listener(app: FastAPI):
     await pubsub.subscribe("insights_channel")
     logger.info("Subscribed to Redis 'insights_channel'")
     try:
-        while True:
-            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
-            if message and message["type"] == "message":
+        # listen() blocks until the next message arrives, so an idle listener never wakes up.
+        async for message in pubsub.listen():
+            if message["type"] == "message":
                 data = message["data"] # Keep as bytes
                 logger.info(f"Received message from Redis (type: {type(data)}). Broadcasting...")
-                await manager.broadcast(data)
-            await asyncio.sleep(0.01)  # Small sleep to prevent busy-waiting
+                # Shielded so cancelling the listener does not cut off an in-flight fan-out.
+                await asyncio.shield(manager.broadcast(data))
     except asyncio.CancelledError:
         logger.info("Redis Pub/Sub listener task cancelled.")
     except Exception as e:
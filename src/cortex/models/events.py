@@ -1,9 +1,14 @@
-from pydantic import BaseModel, Field
-from typing import Optional, Literal, Union
+from functools import cached_property
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from typing import Annotated, Optional, Literal, Union
 from datetime import datetime
 from ..utility.utils import get_utc_now
 
 class CodeChangeEvent(BaseModel):
+   # Events are immutable once validated, so they can be shared across
+   # processors and tasks without defensive copies.
+   model_config = ConfigDict(frozen=True)
+
    event_type: Literal["file_change"] = "file_change"
    file_path: str = Field(..., description="The path to the file that was changed.")
    content: Optional[str] = Field(None, description="The new content of the file, if applicable.")
@@ -11,6 +16,9 @@ class CodeChangeEvent(BaseModel):
    timestamp: datetime = Field(default_factory=get_utc_now, description="The timestamp of the change in UTC format.")
 
 class GitCommitEvent(BaseModel):
+   # Frozen so the cached body can never go stale.
+   model_config = ConfigDict(frozen=True)
+
    event_type: Literal["git_commit"] = "git_commit"
    repo_name: str = Field(..., description="The name of the repository.")
    branch_name: str = Field(..., description="The name of the branch.")
@@ -21,5 +29,16 @@ class GitCommitEvent(BaseModel):
    author_email: Optional[str] = Field(None, description="The email of the commit author.")
    timestamp: datetime = Field(..., description="The timestamp of the commit in UTC format.")
    diff: Optional[str] = Field(None, description="The diff of the commit")
+   truncated_diff: bool = Field(False, description="True if the diff was omitted because the commit exceeded the size limits.")
+
+   @cached_property
+   def body(self) -> bytes:
+      """The event serialized to JSON, computed once and reused for every send attempt."""
+      return self.model_dump_json().encode("utf-8")
+
+SourceEvent = Union[CodeChangeEvent, GitCommitEvent]
 
-SourceEvent = Union[CodeChangeEvent, GitCommitEvent]
\ No newline at end of file
+# Validates any SourceEvent straight from JSON, dispatching on event_type.
+SourceEventAdapter: TypeAdapter[SourceEvent] = TypeAdapter(
+   Annotated[SourceEvent, Field(discriminator="event_type")]
+)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Literal, List,Any,Dict
 from datetime import datetime
 from cortex.models.events import SourceEvent
@@ -6,6 +6,9 @@ from cortex.models.events import SourceEvent
 from ..utility.utils import get_utc_now
 
 class Insight(BaseModel):
+    # Shared by the parallel KG and Chroma writers, so it must not change under them.
+    model_config = ConfigDict(frozen=True)
+
     insight_id:str = Field(..., description="Unique identifier for the insight.")
     source_event_type:str = Field(..., description="Type of the source event (e.g., git_commit, file_change).")
     summary:str = Field(..., description="A brief summary of the insight.")
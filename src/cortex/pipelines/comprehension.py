@@ -1,25 +1,105 @@
 from cortex.pipelines.processors import Processor
-from typing import Any, Dict
-from cortex.models.events import SourceEvent, GitCommitEvent,CodeChangeEvent
+from typing import Any, Callable, Dict, Union
+from cortex.models.events import SourceEvent, SourceEventAdapter, GitCommitEvent,CodeChangeEvent
 from cortex.models.insights import Insight
 from cortex.services.llmservice import LLMService
-from cortex.services.knowledge_graph_service import KnowledgeGraphService
+from cortex.services.knowledge_graph_service import KnowledgeGraphService, defer_index_appends, flush_index_appends
 from cortex.services.chroma_service import ChromaService
 from cortex.exceptions import ProcessorError, ServiceError
+from cortex.utility.batching import AsyncBatcher
+from cortex.core.config import get_settings
+import asyncio
+import hashlib
 import logging
-from uuid import uuid4
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import weakref
+from weakref import WeakKeyDictionary
+from os import urandom
 import redis.exceptions
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Knowledge graph writes are blocking file I/O. They run on a single background
+# thread so they never stall the event loop, and so appends to the same index
+# node are applied in submission order.
+_KG_WRITE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kg-writer")
+
+# While more writes are queued behind the current one, its index links are held
+# back, so a burst of insights reaches each index node in a single append; the
+# last queued write flushes them.
+_queued_kg_writes = 0
+_queued_kg_writes_lock = threading.Lock()
+
+def _finish_kg_write() -> None:
+    """Takes a write off the queued count, flushing held-back links once none remain."""
+    global _queued_kg_writes
+    with _queued_kg_writes_lock:
+        _queued_kg_writes -= 1
+        drained = _queued_kg_writes == 0
+    if drained:
+        try:
+            flush_index_appends()
+        except ServiceError as e:
+            # The links belong to earlier insights too, so this write is not
+            # failed over them; they stay queued for the next flush.
+            logger.error("Failed to flush index links, keeping them queued: %s", e)
+
+def _write_insight_to_kg(kg_service: KnowledgeGraphService, insight: Insight) -> None:
+    try:
+        with defer_index_appends():
+            kg_service.process_insight(insight)
+    finally:
+        _finish_kg_write()
+
+# LLMService summaries are blocking HTTP calls. They run on this pool so the
+# event loop stays free while ARQ processes several events at once. Concurrent
+# requests are what let the model server batch them, and the pool size
+# (llm_max_concurrency) caps how many are in flight at a time.
+_SUMMARY_EXECUTOR = ThreadPoolExecutor(
+    max_workers=get_settings().llm_max_concurrency,
+    thread_name_prefix="llm-summary",
+)
+
+# Summaries currently being generated, keyed by a digest of their inputs, so
+# identical concurrent requests (e.g. a replayed commit) share one LLM call.
+_inflight_summaries: Dict[bytes, asyncio.Future] = {}
+
+def _summary_key(kind: str, *parts: str) -> bytes:
+    digest = hashlib.blake2b(kind.encode(), digest_size=16)
+    for part in parts:
+        digest.update(b"\0")
+        digest.update(part.encode())
+    return digest.digest()
+
+async def _coalesced_summary(key: bytes, call: Callable[[], str]) -> str:
+    """Runs call on the summary pool unless an identical summary is already in flight."""
+    future = _inflight_summaries.get(key)
+    if future is None:
+        future = asyncio.get_running_loop().run_in_executor(_SUMMARY_EXECUTOR, call)
+        _inflight_summaries[key] = future
+        future.add_done_callback(lambda _: _inflight_summaries.pop(key, None))
+    # Shielded so one cancelled caller does not cancel the result for the others.
+    return await asyncio.shield(future)
+
+# Commit messages are cut to this many characters before being embedded; the
+# embedding model only sees a limited number of tokens anyway.
+MAX_EMBEDDED_MESSAGE_CHARS = 2048
+
 class EventDeserializer(Processor):
     """
     Processor to deserialize raw event data into SourceEvent objects.
     """
 
-    async def process(self, data: dict, context: dict) -> SourceEvent:
+    async def process(self, data: Union[str, bytes, dict], context: dict) -> SourceEvent:
+        if isinstance(data, (str, bytes)):
+            # JSON payloads (as enqueued by the API) are parsed and validated in one pass.
+            event = SourceEventAdapter.validate_json(data)
+            logger.info("Deserialized event of type: %s", event.event_type)
+            return event
+
         event_type = data.get("event_type")
-        logger.info(f"Deserializing event of type: {event_type}")
+        logger.info("Deserializing event of type: %s", event_type)
         if event_type == "git_commit":
             event = GitCommitEvent(**data)
         elif event_type == "file_change":
@@ -27,7 +107,7 @@ class EventDeserializer(Processor):
         else:
             raise ValueError(f"Unsupported event type: {event_type}")
         
-        logger.info(f"Deserialized event of type: {event_type}")
+        logger.info("Deserialized event of type: %s", event_type)
         return event
      
 class InsightGenerator(Processor):
@@ -48,21 +128,29 @@ class InsightGenerator(Processor):
         Returns:
             A new Insight object.
         """
-        logger.info(f"Generating insight for event type: {data.event_type}")
+        logger.info("Generating insight for event type: %s", data.event_type)
         try:
+            # Insights are built with model_construct: every field comes from
+            # the already-validated event or this method, so re-running the
+            # discriminated-union validator on source_event is wasted work.
             if isinstance(data, GitCommitEvent):
                 # Now, use the instance created in __init__
-                summary = self.llm_service.generate_commit_summary(
-                    commit_message=data.message or "",
-                    commit_diff=data.diff or ""
-                )
-                content_for_embedding = (
-                    f"Commit by {data.author_name} to {data.repo_name}/{data.branch_name}. "
-                    f"Summary: {summary}. "
-                    f"Message: {data.message}"
+                summary = await _coalesced_summary(
+                    _summary_key("commit", data.message or "", data.diff or ""),
+                    partial(
+                        self.llm_service.generate_commit_summary,
+                        commit_message=data.message or "",
+                        commit_diff=data.diff or ""
+                    ),
                 )
-                insight = Insight(
-                    insight_id=f"commit_{uuid4().hex[:12]}",
+                content_for_embedding = "".join((
+                    f"Commit by {data.author_name} to {data.repo_name}/{data.branch_name}. Summary: ",
+                    summary,
+                    ". Message: ",
+                    (data.message or "")[:MAX_EMBEDDED_MESSAGE_CHARS],
+                ))
+                insight = Insight.model_construct(
+                    insight_id=f"commit_{urandom(6).hex()}",
                     source_event_type="git_commit",
                     summary=summary,
                     patterns=[],
@@ -77,10 +165,14 @@ class InsightGenerator(Processor):
                 return insight
 
             elif isinstance(data, CodeChangeEvent):
-                summary = self.llm_service.generate_code_change_summary(
-                    file_path=data.file_path,
-                    change_type=data.change_type,
-                    content=data.content or ""
+                summary = await _coalesced_summary(
+                    _summary_key("file_change", data.file_path, data.change_type, data.content or ""),
+                    partial(
+                        self.llm_service.generate_code_change_summary,
+                        file_path=data.file_path,
+                        change_type=data.change_type,
+                        content=data.content or ""
+                    ),
                 )
 
                 content_for_embedding = (
@@ -89,8 +181,8 @@ class InsightGenerator(Processor):
                     f"Summary: {summary}."
                 )
 
-                insight = Insight(
-                    insight_id=f"code_{uuid4().hex[:12]}",
+                insight = Insight.model_construct(
+                    insight_id=f"code_{urandom(6).hex()}",
                     source_event_type="file_change",
                     summary=summary,
                     patterns=[],
@@ -103,11 +195,11 @@ class InsightGenerator(Processor):
                 )
                 return insight
         except ServiceError as e:
-            logger.error(f"Failed to generate insight for event {data.event_type}: {e}", exc_info=True)
+            logger.error("Failed to generate insight for event %s: %s", data.event_type, e, exc_info=True)
             raise ProcessorError(f"InsightGenerator failed due to service error: {e}") from e
         
         except Exception as e:
-            logger.error(f"Failed to generate insight for event {data.event_type}: {e}", exc_info=True)
+            logger.error("Failed to generate insight for event %s: %s", data.event_type, e, exc_info=True)
             raise ProcessorError(f"InsightGenerator failed due to unexpected error: {e}") from e
 
         raise TypeError(f"Unsupported event type for insight generation: {type(data)}")
@@ -120,18 +212,52 @@ class KnowledgeGraphWriter(Processor):
         self.kg_service = kg_service
 
     async def process(self, data: Insight, context: dict) -> None:
+        global _queued_kg_writes
         try: 
-            logger.info(f"Writing insight {data.insight_id} to knowledge graph.")
-            self.kg_service.process_insight(data)
-            logger.info(f"Insight {data.insight_id} written to knowledge graph.")
+            logger.info("Writing insight %s to knowledge graph.", data.insight_id)
+            with _queued_kg_writes_lock:
+                _queued_kg_writes += 1
+            loop = asyncio.get_running_loop()
+            try:
+                write = loop.run_in_executor(_KG_WRITE_EXECUTOR, _write_insight_to_kg, self.kg_service, data)
+            except BaseException:
+                # The job never started, so it will not take itself off the count.
+                _finish_kg_write()
+                raise
+            await write
+            logger.info("Insight %s written to knowledge graph.", data.insight_id)
         except ServiceError as e:
-            logger.error(f"Failed to write insight {data.insight_id}: {e}", exc_info=True)
+            logger.error("Failed to write insight %s: %s", data.insight_id, e, exc_info=True)
             raise ProcessorError(f"KnowledgeGraphWriter failed due to service error: {e}") from e
         except Exception as e:
-            logger.error(f"Failed to write insight {data.insight_id}: {e}", exc_info=True)
+            logger.error("Failed to write insight %s: %s", data.insight_id, e, exc_info=True)
             raise ProcessorError(f"KnowledgeGraphWriter failed due to unexpected error: {e}") from e
         return None
     
+# Insights written concurrently to the same ChromaService are coalesced into one
+# collection.add() per batch; a lone insight waits at most CHROMA_MAX_DELAY_MS.
+CHROMA_BATCH_SIZE = 128
+CHROMA_MAX_DELAY_MS = 50
+
+_chroma_batchers: "WeakKeyDictionary[ChromaService, AsyncBatcher[Insight]]" = WeakKeyDictionary()
+
+def _get_chroma_batcher(chroma_service: ChromaService) -> AsyncBatcher[Insight]:
+    batcher = _chroma_batchers.get(chroma_service)
+    if batcher is None:
+        # The flush holds the service weakly, or the batcher would keep its own key alive.
+        service_ref = weakref.ref(chroma_service)
+
+        async def flush(insights: list[Insight]) -> None:
+            await asyncio.to_thread(
+                service_ref().add_documents,
+                doc_ids=[insight.insight_id for insight in insights],
+                contents=[insight.content_for_embedding for insight in insights],
+                metadatas=[insight.metadata for insight in insights],
+            )
+        batcher = AsyncBatcher(flush, batch_size=CHROMA_BATCH_SIZE, max_delay_ms=CHROMA_MAX_DELAY_MS)
+        _chroma_batchers[chroma_service] = batcher
+    return batcher
+
 class ChromaWriter(Processor):
     """
     Processor to write Insights to the Chroma vector database.
@@ -141,19 +267,15 @@ class ChromaWriter(Processor):
 
     async def process(self, data: Insight, context: dict) -> None:
         try: 
-            logger.info(f"Adding insight {data.insight_id} to ChromaDB.")
-            self.chroma_service.add_document(
-                doc_id=data.insight_id,
-                content=data.content_for_embedding,
-                metadata=data.metadata
-            )
-            logger.info(f"Insight {data.insight_id} added to ChromaDB.")
+            logger.info("Adding insight %s to ChromaDB.", data.insight_id)
+            await _get_chroma_batcher(self.chroma_service).submit(data)
+            logger.info("Insight %s added to ChromaDB.", data.insight_id)
             return None
         except ServiceError as e:
-            logger.error(f"Failed to add insight {data.insight_id}: {e}", exc_info=True)
+            logger.error("Failed to add insight %s: %s", data.insight_id, e, exc_info=True)
             raise ProcessorError(f"ChromaWriter failed due to service error: {e}") from e
         except Exception as e:
-            logger.error(f"Failed to add insight {data.insight_id}: {e}", exc_info=True)
+            logger.error("Failed to add insight %s: %s", data.insight_id, e, exc_info=True)
             raise ProcessorError(f"ChromaWriter failed due to unexpected error: {e}") from e
 
 class SynthesisTrigger(Processor):
@@ -161,19 +283,21 @@ class SynthesisTrigger(Processor):
     Processor to trigger synthesis tasks based on the generated Insight.
     """
     async def process(self, data: Insight, context: dict) -> None:
+        # Named redis_pool so the except clause below still sees the redis module.
+        redis_pool = context.get("redis")
+        if not redis_pool:
+            logger.error("Redis pool not found in context for SynthesisTrigger.")
+            raise ProcessorError("Redis pool not found in context for SynthesisTrigger.")
+        if not data:
+            return None
         try:
-            logger.info(f"Triggering synthesis task for insight {data.insight_id}.")
-            redis = context.get("redis")
-            if not redis:
-                logger.error("Redis pool not found in context for SynthesisTrigger.")
-                raise ProcessorError("Redis pool not found in context for SynthesisTrigger.")
-            if data:
-                await redis.enqueue_job('synthesis_task', data.content_for_embedding)
-                logger.info(f"Synthesis task triggered for insight {data.insight_id}.")
-                return None
+            logger.info("Triggering synthesis task for insight %s.", data.insight_id)
+            await redis_pool.enqueue_job('synthesis_task', data.content_for_embedding)
+            logger.info("Synthesis task triggered for insight %s.", data.insight_id)
+            return None
         except redis.exceptions.RedisError as e: # Catch Redis specific errors
-            logger.error(f"Failed to trigger synthesis task for insight {data.insight_id}: {e}", exc_info=True)
+            logger.error("Failed to trigger synthesis task for insight %s: %s", data.insight_id, e, exc_info=True)
             raise ProcessorError(f"SynthesisTrigger failed due to service error: {e}") from e
         except Exception as e:
-            logger.error(f"Failed to trigger synthesis task for insight {data.insight_id}: {e}", exc_info=True)
+            logger.error("Failed to trigger synthesis task for insight %s: %s", data.insight_id, e, exc_info=True)
             raise ProcessorError(f"SynthesisTrigger failed due to unexpected error: {e}") from e
\ No newline at end of file
@@ -7,13 +7,27 @@ from google.adk.models.llm_request import LlmRequest
 from google.genai import types
 from cortex.utility.agent_runner import run_standalone_agent
 from google.adk.tools import FunctionTool
+import asyncio
 import logging
 import uuid
+from typing import Optional
+from weakref import WeakKeyDictionary
 from google.adk.tools.google_search_agent_tool import create_google_search_agent
-from cortex.services.prompt_manager import PromptManager
+from cortex.services.prompt_manager import PromptManager, get_prompt_manager
+from cortex.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# One semaphore per event loop bounds concurrent curation runs in the worker.
+_curation_slots: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = WeakKeyDictionary()
+
+def _get_curation_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slots = _curation_slots.get(loop)
+    if slots is None:
+        slots = _curation_slots[loop] = asyncio.Semaphore(get_settings().curation_max_concurrency)
+    return slots
+
 class UpstashWriter:
     def __init__(self, upstash_service: UpstashService):
         self.upstash_service = upstash_service
@@ -24,7 +38,7 @@ class UpstashWriter:
             logger.warning("Duplicate write attempt detected. Returning mock success to end loop.")
             return "TerminateProcess: Duplicate write attempt."
 
-        logger.info(f"Writing data to Upstash: {data}")
+        logger.info("Writing data to Upstash: %s", data)
         doc_id = str(uuid.uuid4())
         metadata = {"source": "web_search_curation"}
 
@@ -33,12 +47,18 @@ class UpstashWriter:
             self._has_written = True
             return "Successfully wrote data to Upstash."
         except Exception as e:
-            logger.error(f"[UpstashWriter] Error writing document {doc_id}: {e}")
+            logger.error("[UpstashWriter] Error writing document %s: %s", doc_id, e)
             return f"Failed to write data to Upstash: {e}"
 
-def create_curation_agent(upstash_service: UpstashService, llm_service: LLMService) -> SequentialAgent:
+def create_curation_agent(
+    upstash_service: UpstashService,
+    llm_service: LLMService,
+    prompt_manager: Optional[PromptManager] = None,
+) -> SequentialAgent:
     upstash_writer = UpstashWriter(upstash_service)
-    prompt_manager = PromptManager()
+    # Without an explicit manager, fall back to the shared one so the compiled
+    # chief editor template is reused instead of reparsed per agent.
+    prompt_manager = prompt_manager or get_prompt_manager()
 
     async def UpstashWriterTool(data: str) -> str:
         """Writes the given data to the Upstash knowledge base."""
@@ -66,24 +86,22 @@ def create_curation_agent(upstash_service: UpstashService, llm_service: LLMServi
         sub_agents=[security_analyst, best_practices_analyst],
     )
 
-    async def chief_editor_callback(callback_context: CallbackContext, llm_request: LlmRequest):
-        web_search_results = ""
-        security_analysis = ""
-        best_practices_analysis = ""
+    analyst_names = frozenset((web_searcher.name, security_analyst.name, best_practices_analyst.name))
 
+    async def chief_editor_callback(callback_context: CallbackContext, llm_request: LlmRequest):
+        # One pass over the session, keeping the latest final response per analyst.
+        analyst_outputs = {}
         for event in callback_context.session.events:
-            if event.author == web_searcher.name and event.is_final_response() and event.content and event.content.parts:
-                web_search_results = "".join([part.text for part in event.content.parts if part.text])
-            if event.author == "security_analyst" and event.is_final_response() and event.content and event.content.parts:
-                security_analysis = "".join([part.text for part in event.content.parts if part.text])
-            if event.author == "best_practices_analyst" and event.is_final_response() and event.content and event.content.parts:
-                best_practices_analysis = "".join([part.text for part in event.content.parts if part.text])
-        
+            if event.author not in analyst_names or not event.is_final_response():
+                continue
+            if event.content and event.content.parts:
+                analyst_outputs[event.author] = "".join(part.text for part in event.content.parts if part.text)
+
         prompt = prompt_manager.render(
             "chief_editor.jinja2",
-            web_search_results=web_search_results,
-            security_analysis=security_analysis,
-            best_practices_analysis=best_practices_analysis
+            web_search_results=analyst_outputs.get(web_searcher.name, ""),
+            security_analysis=analyst_outputs.get(security_analyst.name, ""),
+            best_practices_analysis=analyst_outputs.get(best_practices_analyst.name, "")
         )
 
         llm_request.contents = [types.Content(parts=[types.Part(text=prompt)])]
@@ -108,20 +126,24 @@ class CurationProcessor(Processor):
         # FIX: Removed self.curation_agent instantiation from __init__
         self.upstash_service = upstash_service
         self.llm_service = llm_service
+        # Stateless, so it is shared across requests to keep Jinja's template cache warm
+        self.prompt_manager = get_prompt_manager()
 
     async def process(self, data: dict, context: dict) -> dict:
         query_text = data["query_text"]
-        logger.info(f"Starting curation process for query: {query_text}")
+        logger.info("Starting curation process for query: %s", query_text)
 
         # FIX: Create the complex agent hierarchy specific to this request
-        curation_agent = create_curation_agent(self.upstash_service, self.llm_service)
-
-        # Run the full curation pipeline to get the final, synthesized result
-        final_summary = await run_standalone_agent(
-            curation_agent,
-            query_text,
-            target_agent_name="chief_editor"
-        )
+        curation_agent = create_curation_agent(self.upstash_service, self.llm_service, self.prompt_manager)
+
+        # Run the full curation pipeline to get the final, synthesized result.
+        # Bursts queue here rather than opening unbounded LLM and Upstash calls.
+        async with _get_curation_slots():
+            final_summary = await run_standalone_agent(
+                curation_agent,
+                query_text,
+                target_agent_name="chief_editor"
+            )
 
         # Immediately add the augmented knowledge to the data dictionary
         data["augmented_knowledge"] = final_summary
@@ -3,20 +3,59 @@ from cortex.pipelines.processors import Processor
 import logging
 from redis.asyncio import Redis
 from google.cloud import texttospeech
-from cortex.core.config import Settings
+from cortex.core.config import get_settings
 from cortex.exceptions import ProcessorError
-import base64
-import json
+import binascii
+import orjson
+import re
 
 logger = logging.getLogger(__name__)
 
+# Long insights are synthesized as sentence-aligned chunks of about this many
+# characters, concurrently. MP3 frames concatenate, so the chunks are joined
+# into one clip and clients still receive a single message.
+TTS_CHUNK_CHARS = 1000
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+def split_for_tts(text: str, max_chars: int = TTS_CHUNK_CHARS) -> list[str]:
+    """Packs whole sentences into chunks of at most max_chars where possible."""
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks: list[str] = []
+    current = ""
+    for sentence in _SENTENCE_BOUNDARY.split(text):
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+def encode_insight_message(text: str, audio: bytes) -> bytes:
+    """
+    Builds the JSON message published for an insight. The base64 audio is
+    ASCII and needs no escaping, so it is spliced in as bytes instead of
+    being decoded to str and re-scanned by the serializer.
+    """
+    return b"".join((
+        b'{"type":"insight","text":',
+        orjson.dumps(text),
+        b',"audio":"',
+        binascii.b2a_base64(audio, newline=False),
+        b'"}',
+    ))
+
 class AudioDeliveryProcessor(Processor):
     """
     Converts text to audio using Google Cloud Text-to-Speech and publishes it to a Redis channel.
     """
     def __init__(self, redis: Redis):
         self.redis = redis
-        self.settings = Settings()
+        self.settings = get_settings()
         self.tts_client = texttospeech.TextToSpeechClient()
 
     async def process(self, data: dict, context: dict) -> dict:
@@ -27,7 +66,6 @@ class AudioDeliveryProcessor(Processor):
 
         logger.info("Converting final insight to audio using Google Cloud Text-to-Speech...")
         try:
-            synthesis_input = texttospeech.SynthesisInput(text=final_insight)
             voice_params = texttospeech.VoiceSelectionParams(
                 language_code="en-US",
                 name=self.settings.tts_voice_name
@@ -36,33 +74,29 @@ class AudioDeliveryProcessor(Processor):
                 audio_encoding=texttospeech.AudioEncoding.MP3
             )
 
-            response = self.tts_client.synthesize_speech(
-                input=synthesis_input,
-                voice=voice_params,
-                audio_config=audio_config
-            )
+            # The TTS client is blocking, so each call runs in a worker thread
+            # to keep the event loop free for other jobs.
+            responses = await asyncio.gather(*(
+                asyncio.to_thread(
+                    self.tts_client.synthesize_speech,
+                    input=texttospeech.SynthesisInput(text=chunk),
+                    voice=voice_params,
+                    audio_config=audio_config
+                )
+                for chunk in split_for_tts(final_insight)
+            ))
 
-            audio_data = response.audio_content
+            audio_data = b"".join(response.audio_content or b"" for response in responses)
 
             if audio_data:
                 logger.info("Publishing audio data to Redis 'insights_channel'...")
-                
-                # Encode audio to base64 string
-                audio_b64 = base64.b64encode(audio_data).decode('utf-8')
-                
-                message = {
-                    "type": "insight",
-                    "text": final_insight,
-                    "audio": audio_b64
-                }
-                
-                await self.redis.publish("insights_channel", json.dumps(message))
+                await self.redis.publish("insights_channel", encode_insight_message(final_insight, audio_data))
                 logger.info("Audio data published successfully.")
             else:
                 logger.warning("Google Cloud Text-to-Speech returned no audio data.")
 
         except Exception as e:
-            logger.error(f"Error during audio generation or publishing: {e}", exc_info=True)
+            logger.error("Error during audio generation or publishing: %s", e, exc_info=True)
             raise ProcessorError(f"Error during audio generation or publishing: {e}")
 
         return data
@@ -1,12 +1,35 @@
 from cortex.pipelines.processors import Processor
+import asyncio
 import logging
 import os
 import re
-import yaml
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+_WIKILINK_PATTERN = re.compile(r"\[\[([^\]]+)\]\]")
+
+# Parsed nodes are cached per (path, mtime, size), so an edited file is
+# re-read while unchanged subtrees shared between entry points are not.
+NODE_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=NODE_CACHE_SIZE)
+def _load_node(full_path: str, mtime_ns: int, size: int) -> Tuple[str, Tuple[str, ...]]:
+    """Reads a node and returns its body and the raw targets of its [[links]]."""
+    with open(full_path, "r") as f:
+        content = f.read()
+
+    # Separate front matter from content. Only its [[links]] are needed, so
+    # the YAML itself is never parsed.
+    try:
+        _, _, body = content.split("---", 2)
+    except ValueError:
+        body = content
+
+    # Links are collected from both the front matter and the body
+    return body, tuple(_WIKILINK_PATTERN.findall(content))
+
 class GraphTraversalProcessor(Processor):
     """
     Traverses the knowledge graph to build a rich, multi-hop context.
@@ -22,7 +45,8 @@ class GraphTraversalProcessor(Processor):
             data["traversed_knowledge"] = ""
             return data
 
-        traversed_content = []
+        # Every node body lands in one flat list that is joined exactly once.
+        traversed_content: List[str] = []
         visited = set()
 
         for entry_point in entry_points:
@@ -31,41 +55,57 @@ class GraphTraversalProcessor(Processor):
             # The entry point from ChromaDB metadata should be an absolute path.
             # We need the relative path for our traversal logic.
             relative_path = os.path.relpath(entry_point, self.knowledge_graph_root)
-            traversed_content.append(self._traverse(relative_path, visited))
+            await self._traverse(relative_path, visited, context, traversed_content)
 
         data["traversed_knowledge"] = "\n".join(traversed_content)
         return data
 
-    def _traverse(self, file_path: str, visited: set, context: dict) -> str:
-        if file_path in visited:
-            return ""
+    async def _traverse(self, file_path: str, visited: set, context: dict, out: Optional[List[str]] = None) -> List[str]:
+        """
+        Appends to out the bodies of file_path and every node reachable through
+        its [[links]], breadth-first, and returns out. Uses an explicit frontier
+        rather than recursion, and reads all files of a frontier concurrently.
+        """
+        if out is None:
+            out = []
+        frontier = [file_path]
 
-        visited.add(file_path)
-        full_path = os.path.join(self.knowledge_graph_root, file_path)
+        while frontier:
+            level = []
+            for path in frontier:
+                if path not in visited:
+                    visited.add(path)
+                    level.append(path)
+            if not level:
+                break
 
-        try:
-            with open(full_path, "r") as f:
-                content = f.read()
-        except FileNotFoundError:
-            logger.warning(f"File not found during graph traversal: {full_path}")
-            context.setdefault("broken_links", []).append(full_path)
-            return ""
+            nodes = await asyncio.gather(*(asyncio.to_thread(self._read_node, path) for path in level))
+
+            frontier = []
+            for current_path, node in zip(level, nodes):
+                if node is None:
+                    full_path = os.path.join(self.knowledge_graph_root, current_path)
+                    logger.warning("File not found during graph traversal: %s", full_path)
+                    context.setdefault("broken_links", []).append(full_path)
+                    continue
+
+                body, links = node
+                out.append(body)
+
+                # Links are resolved relative to the current file's directory
+                current_dir = os.path.dirname(current_path)
+                frontier.extend(os.path.normpath(os.path.join(current_dir, link)) for link in links)
 
-        # Separate front matter from content
+        return out
+
+    def _read_node(self, file_path: str) -> Optional[Tuple[str, Tuple[str, ...]]]:
+        """
+        Returns the body and links of a node relative to the graph root, or
+        None if it does not exist.
+        """
+        full_path = os.path.join(self.knowledge_graph_root, file_path)
         try:
-            _, front_matter_str, body = content.split("---", 2)
-            front_matter = yaml.safe_load(front_matter_str) or {}
-        except ValueError:
-            front_matter = {}
-            body = content
-
-        # Find all [[links]] in the front matter and body
-        links = re.findall(r"\[\[(.*?)\]\]", content)
-        traversed_content = [body]
-
-        for link in links:
-            # Resolve the link relative to the current file's directory
-            link_path = os.path.normpath(os.path.join(os.path.dirname(file_path), link))
-            traversed_content.append(self._traverse(link_path, visited, context))
-
-        return "\n".join(traversed_content)
+            stat = os.stat(full_path)
+            return _load_node(full_path, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
@@ -1,9 +1,9 @@
 import asyncio
-from typing import Any, List, Union
+from functools import partial
+from typing import Any, Awaitable, Callable, List, Union
 from cortex.pipelines.processors import Processor
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class Pipeline:
@@ -13,45 +13,80 @@ class Pipeline:
 
     def __init__(self, processors: List[Union[Processor, List[Processor]]]):
         self.processors = processors
+        # The dispatch for each step is resolved once here rather than on every run.
+        self._steps: List[Callable[[Any, dict], Awaitable[Any]]] = [
+            partial(self._execute_parallel_step, step) if isinstance(step, list)
+            else partial(self._execute_sequential_step, step, step.__class__.__name__)
+            for step in processors
+        ]
 
-    async def _execute_sequential_step(self, processor: Processor, data: Any, context: dict) -> Any:
+    async def _execute_sequential_step(self, processor: Processor, processor_name: str, data: Any, context: dict) -> Any:
         """Executes a single processor sequentially."""
-        processor_name = processor.__class__.__name__
-        logger.info(f"Processing sequentially with {processor_name}...")
+        logger.info("Processing sequentially with %s...", processor_name)
         try:
             data = await processor.process(data, context)
-            logger.info(f"{processor_name} completed successfully.")
+            logger.info("%s completed successfully.", processor_name)
             return data
         except Exception as e:
-            logger.error(f"Error occurred while processing with {processor_name}: {e}")
+            logger.error("Error occurred while processing with %s: %s", processor_name, e)
             raise
 
     async def _execute_parallel_step(self, processors: List[Processor], data: Any, context: dict) -> Any:
-        """Executes a list of processors in parallel."""
-        tasks = []
+        """
+        Executes a list of processors in parallel. Dict results are merged into
+        the data as each branch finishes; processors run only for their side
+        effects return None and leave the data unchanged. The first failure
+        cancels the branches still running and is re-raised.
+        """
+        # Tasks start eagerly: each branch runs up to its first real suspension
+        # right here, so branches that finish without blocking (cache hits,
+        # early returns) never go through the event loop at all.
+        loop = asyncio.get_running_loop()
+        names = {}
         for processor in processors:
             processor_name = processor.__class__.__name__
-            logger.info(f"Processing in parallel with {processor_name}...")
-            tasks.append(processor.process(data, context))
-        
-        parallel_results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for i, result in enumerate(parallel_results):
-            if isinstance(result, Exception):
-                processor_name = processors[i].__class__.__name__
-                logger.error(f"Error occurred in parallel processor {processor_name}: {result}")
-                raise result
-            if isinstance(result, dict):
-                if isinstance(data, dict):
-                    data.update(result)
-                else:
-                    data = result
-            else:
-                logger.warning(f"Parallel processor {processors[i].__class__.__name__} returned non-dict result: {result}")
+            logger.info("Processing in parallel with %s...", processor_name)
+            names[asyncio.eager_task_factory(loop, processor.process(data, context))] = processor_name
+
+        pending = set(names)
+        try:
+            while pending:
+                done = {task for task in pending if task.done()}
+                if not done:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending -= done
+                # Branches finishing together are merged in declaration order.
+                for task, processor_name in names.items():
+                    if task in done:
+                        data = self._merge_parallel_result(processor_name, task, data)
+        except BaseException:
+            # As in a TaskGroup, the step only unwinds once the cancelled branches
+            # have finished, but the first error is re-raised as-is rather than
+            # wrapped in an ExceptionGroup.
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
 
         logger.info("Parallel processing step completed.")
         return data
 
+    def _merge_parallel_result(self, processor_name: str, task: asyncio.Task, data: Any) -> Any:
+        """Merges a finished branch's result into the data, re-raising its error."""
+        error = task.exception()
+        if error is not None:
+            logger.error("Error occurred in parallel processor %s: %s", processor_name, error)
+            raise error
+        result = task.result()
+        if isinstance(result, dict):
+            if isinstance(data, dict):
+                data.update(result)
+            else:
+                data = result
+        elif result is not None:
+            logger.warning("Parallel processor %s returned non-dict result: %s", processor_name, result)
+        return data
+
     async def execute(self, data: Any, context: dict) -> Any:
         """
         Executes the pipeline by passing data through each processor or group of parallel processors.
@@ -62,11 +97,8 @@ class Pipeline:
         Returns:
             The final output data after processing.
         """
-        logger.info(f"Starting pipeline execution with {len(self.processors)} steps...")
-        for step in self.processors:
-            if isinstance(step, list):
-                data = await self._execute_parallel_step(step, data, context)
-            else:
-                data = await self._execute_sequential_step(step, data, context)
+        logger.info("Starting pipeline execution with %d steps...", len(self._steps))
+        for step in self._steps:
+            data = await step(data, context)
         logger.info("Pipeline execution completed.")
         return data
\ No newline at end of file
@@ -1,6 +1,14 @@
 from cortex.pipelines.processors import Processor
 from cortex.models.insights import Insight
+import asyncio
+import copy
+import hashlib
 import logging
+import re
+import orjson
+from functools import partial
+from typing import Dict
+from weakref import WeakKeyDictionary
 from cortex.services.chroma_service import ChromaService
 from cortex.services.upstash_service import UpstashService
 from cortex.services.llmservice import LLMService
@@ -8,18 +16,43 @@ from cortex.pipelines.curation import CurationProcessor
 from pydantic import BaseModel
 from logging import Logger
 logger: Logger = logging.getLogger(__name__)
-from cortex.services.prompt_manager import PromptManager
+from cortex.services.prompt_manager import get_prompt_manager
 
 
 from google.adk.agents import LlmAgent
 from cortex.utility.agent_runner import run_standalone_agent
+from cortex.utility.agent_pool import AgentPool
+from cortex.utility.ttl_cache import TTLCache
 
 from cortex.pipelines.pipelines import Pipeline
-from cortex.core.config import Settings
+from cortex.core.config import Settings, get_settings
 from cortex.pipelines.graph_traversal import GraphTraversalProcessor
 from cortex.pipelines.delivery import AudioDeliveryProcessor
 from redis.asyncio import Redis
 
+# Upper bound on a single knowledge store lookup, so one slow backend cannot
+# hold up synthesis; a timed-out lookup contributes no results.
+KNOWLEDGE_QUERY_TIMEOUT_SECONDS = 2.0
+
+# Queries shorter than this carry too little meaning to search for and are
+# answered with empty results. Results for a repeated query are reused for a
+# short while instead of embedding and searching again.
+MIN_KNOWLEDGE_QUERY_CHARS = 3
+KNOWLEDGE_QUERY_TTL_SECONDS = 60.0
+KNOWLEDGE_QUERY_CACHE_SIZE = 256
+
+_private_query_results: TTLCache[tuple, dict] = TTLCache(KNOWLEDGE_QUERY_CACHE_SIZE, KNOWLEDGE_QUERY_TTL_SECONDS)
+_public_query_results: TTLCache[tuple, list] = TTLCache(KNOWLEDGE_QUERY_CACHE_SIZE, KNOWLEDGE_QUERY_TTL_SECONDS)
+
+# Results are handed on to later processors, which may modify them. The caches
+# therefore hold their own deep copies, and every hit gets a fresh copy.
+def _get_query_results(cache: TTLCache, key: tuple):
+    results = cache.get(key)
+    return None if results is None else copy.deepcopy(results)
+
+def _set_query_results(cache: TTLCache, key: tuple, results) -> None:
+    cache.set(key, copy.deepcopy(results))
+
 class RunPrivatePipeline(Processor):
     def __init__(self, chroma_service: ChromaService, settings: Settings):
         self.pipeline = Pipeline([
@@ -35,8 +68,7 @@ class RunPublicPipeline(Processor):
     def __init__(self, upstash_service: UpstashService, llm_service: LLMService):
         self.pipeline = Pipeline([
             PublicKnowledgeQuerier(upstash_service),
-            KnowledgeGatewayProcessor(llm_service),
-            CurationTriggerProcessor(llm_service, upstash_service),
+            KnowledgeGatewayProcessor(llm_service, upstash_service),
         ])
 
     async def process(self, data: str, context: dict) -> dict:
@@ -44,7 +76,7 @@ class RunPublicPipeline(Processor):
         return {"public_knowledge": public_results}
 
 def create_synthesis_pipeline(chroma_service: ChromaService, upstash_service: UpstashService, llm_service: LLMService, redis: Redis) -> Pipeline:
-    settings = Settings()
+    settings = get_settings()
     return Pipeline([
         # Running these in parallel
         [
@@ -63,8 +95,31 @@ class PrivateKnowledgeQuerier(Processor):
         self.chroma_service = chroma_service
 
     async def process(self, data: str, context: dict) -> dict:
-        logger.info("Querying private knowledge store (ChromaDB)...")
-        private_results = self.chroma_service.query(data, n_results=2)
+        if not data or len(data.strip()) < MIN_KNOWLEDGE_QUERY_CHARS:
+            logger.info("Query too short, skipping private knowledge store.")
+            return {
+                "query_text": data,
+                "private_results": {"ids": [[]], "documents": [[]], "metadatas": [[]]},
+                "entry_points": []
+            }
+
+        cache_key = (data, 2)
+        private_results = _get_query_results(_private_query_results, cache_key)
+        if private_results is not None:
+            logger.info("Reusing recent private knowledge results.")
+        else:
+            logger.info("Querying private knowledge store (ChromaDB)...")
+            # aquery awaits the embedding and searches in a worker thread, so the
+            # public query running alongside it is not stalled.
+            try:
+                private_results = await asyncio.wait_for(
+                    self.chroma_service.aquery(data, n_results=2),
+                    timeout=KNOWLEDGE_QUERY_TIMEOUT_SECONDS,
+                )
+                _set_query_results(_private_query_results, cache_key, private_results)
+            except asyncio.TimeoutError:
+                logger.warning("Private knowledge query timed out after %ss.", KNOWLEDGE_QUERY_TIMEOUT_SECONDS)
+                private_results = {}
         
         file_paths = []
         # Safely extract file paths from metadata
@@ -86,8 +141,25 @@ class PublicKnowledgeQuerier(Processor):
         self.upstash_service = upstash_service
 
     async def process(self, data: str, context: dict) -> dict:
-        logger.info("Querying public knowledge store (Upstash)...")
-        public_results = await self.upstash_service.query(data, n_results=2)
+        if not data or len(data.strip()) < MIN_KNOWLEDGE_QUERY_CHARS:
+            logger.info("Query too short, skipping public knowledge store.")
+            return {"public_results": [], "query_text": data}
+
+        cache_key = (data, 2)
+        public_results = _get_query_results(_public_query_results, cache_key)
+        if public_results is not None:
+            logger.info("Reusing recent public knowledge results.")
+        else:
+            logger.info("Querying public knowledge store (Upstash)...")
+            try:
+                public_results = await asyncio.wait_for(
+                    self.upstash_service.query(data, n_results=2),
+                    timeout=KNOWLEDGE_QUERY_TIMEOUT_SECONDS,
+                )
+                _set_query_results(_public_query_results, cache_key, public_results)
+            except asyncio.TimeoutError:
+                logger.warning("Public knowledge query timed out after %ss.", KNOWLEDGE_QUERY_TIMEOUT_SECONDS)
+                public_results = []
         return {
             "public_results": public_results, 
             "query_text": data
@@ -96,14 +168,63 @@ class PublicKnowledgeQuerier(Processor):
 class GatewayDecision(BaseModel):
     needs_improvement: bool
 
+# Slashes and newlines in public results are blanked in one pass per result.
+_SANITIZE_PUBLIC_RESULT = str.maketrans({"/": " ", "\n": " "})
+
+# When the gateway's reply is not valid JSON, only its opening characters are
+# searched for a verdict; the rest is explanation that may mention either word.
+GATEWAY_FALLBACK_PROBE_CHARS = 256
+_GATEWAY_FALLBACK_VERDICT = re.compile(r"\btrue\b|NEEDS_IMPROVEMENT", re.IGNORECASE)
+
+# A gateway decision depends only on the query and the public context, so recent
+# decisions are reused instead of asking the LLM again. Entries expire after the
+# TTL, and the least recently used are evicted beyond the size cap.
+GATEWAY_DECISION_TTL_SECONDS = 300.0
+GATEWAY_DECISION_CACHE_SIZE = 1024
+
+_gateway_decisions: TTLCache[bytes, bool] = TTLCache(GATEWAY_DECISION_CACHE_SIZE, GATEWAY_DECISION_TTL_SECONDS)
+
+def _gateway_decision_key(query_text: str, public_context: str) -> bytes:
+    digest = hashlib.blake2b(query_text.encode(), digest_size=16)
+    digest.update(b"\0")
+    digest.update(public_context.encode())
+    return digest.digest()
+
+# Gateway agents are built once per event loop and model and then reused; each
+# run still gets a fresh runner and session from run_standalone_agent.
+GATEWAY_AGENT_POOL_SIZE = 4
+
+_gateway_agent_pools: "WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AgentPool[LlmAgent]]]" = WeakKeyDictionary()
+
+def _build_gateway_agent(instruction: str, model: str) -> LlmAgent:
+    return LlmAgent(
+        name="knowledge_gateway_agent",
+        instruction=instruction,
+        output_schema=GatewayDecision,
+        model=model,
+        disallow_transfer_to_parent=True,
+        disallow_transfer_to_peers=True,
+    )
+
 class KnowledgeGatewayProcessor(Processor):
     """
-    A gateway processor that uses an LLM agent to decide if knowledge needs improvement.
+    A gateway processor that uses an LLM agent to decide if knowledge needs improvement,
+    and runs the curation pipeline when it does.
     """
-    def __init__(self, llm_service: LLMService):
+    def __init__(self, llm_service: LLMService, upstash_service: UpstashService):
         self.llm_service = llm_service
-        self.prompt_manager = PromptManager()
-        # FIX: Removed self.gateway_agent instantiation from __init__ to prevent session state reuse
+        self.curation_processor = CurationProcessor(upstash_service, llm_service)
+        self.prompt_manager = get_prompt_manager()
+        # The agent instruction takes no variables, so it is rendered once here
+        self._instruction = self.prompt_manager.render("knowledge_gateway.jinja2")
+
+    def _get_agent_pool(self) -> AgentPool[LlmAgent]:
+        pools = _gateway_agent_pools.setdefault(asyncio.get_running_loop(), {})
+        model = self.llm_service.settings.gemini_flash_model
+        pool = pools.get(model)
+        if pool is None:
+            pool = pools[model] = AgentPool(partial(_build_gateway_agent, self._instruction, model), GATEWAY_AGENT_POOL_SIZE)
+        return pool
 
     async def process(self, data: dict, context: dict) -> dict:
         logger.info("Evaluating retrieved public knowledge...")
@@ -111,18 +232,15 @@ class KnowledgeGatewayProcessor(Processor):
         public_results = data.get("public_results", [])
         
         # Sanitize the public knowledge before passing it to the prompt
-        sanitized_results = [str(r).replace("/", " ").replace("\n", " ") for r in public_results]
-        public_context = "\n".join(sanitized_results) 
-
-        # FIX: Instantiate the agent here for every request to ensure a fresh session
-        gateway_agent = LlmAgent(
-            name="knowledge_gateway_agent",
-            instruction=self.prompt_manager.render("knowledge_gateway.jinja2"),
-            output_schema=GatewayDecision,
-            model=self.llm_service.settings.gemini_flash_model, # Use self.llm_service to access settings
-            disallow_transfer_to_parent=True,
-            disallow_transfer_to_peers=True,
-        )
+        public_context = "\n".join(str(r).translate(_SANITIZE_PUBLIC_RESULT) for r in public_results)
+
+        cache_key = _gateway_decision_key(query_text, public_context)
+        cached_decision = _gateway_decisions.get(cache_key)
+        if cached_decision is not None:
+            logger.info("Knowledge evaluation result (cached): %s", cached_decision)
+            return await self._curate_if_needed(data, context, cached_decision)
+
+        agent_pool = self._get_agent_pool()
 
         prompt = self.prompt_manager.render(
             "knowledge_gateway.jinja2",
@@ -134,46 +252,46 @@ class KnowledgeGatewayProcessor(Processor):
         decision = False 
 
         try:
-            evaluation_str = await run_standalone_agent(gateway_agent, prompt)
+            async with agent_pool.agent() as gateway_agent:
+                evaluation_str = await run_standalone_agent(gateway_agent, prompt)
             gateway_decision = GatewayDecision.model_validate_json(evaluation_str)
             decision = gateway_decision.needs_improvement
+            # Only well-formed decisions are cached; fallbacks are retried next time.
+            _gateway_decisions.set(cache_key, decision)
         except Exception as e:
-            logger.error(f"Error running LLM agent for KnowledgeGatewayProcessor: {e}", exc_info=True)
+            logger.error("Error running LLM agent for KnowledgeGatewayProcessor: %s", e, exc_info=True)
             # Fallback for non-json response or agent errors
-            if "true" in evaluation_str.lower() or "NEEDS_IMPROVEMENT" in evaluation_str:
-                decision = True
-            else:
-                decision = False 
+            probe = evaluation_str[:GATEWAY_FALLBACK_PROBE_CHARS]
+            decision = _GATEWAY_FALLBACK_VERDICT.search(probe) is not None
 
-        logger.info(f"Knowledge evaluation result: {decision}")
-        data["needs_improvement"] = decision
-        return data
-        
-class CurationTriggerProcessor(Processor):
-    """
-    Triggers the curation pipeline if the knowledge needs improvement.
-    """
-    def __init__(self, llm_service: LLMService, upstash_service: UpstashService):
-        self.llm_service = llm_service
-        self.upstash_service = upstash_service
+        logger.info("Knowledge evaluation result: %s", decision)
+        return await self._curate_if_needed(data, context, decision)
 
-    async def process(self, data: dict, context: dict) -> dict:
-        needs_improvement = data.get("needs_improvement", False)
+    async def _curate_if_needed(self, data: dict, context: dict, needs_improvement: bool) -> dict:
+        data["needs_improvement"] = needs_improvement
         if needs_improvement:
             logger.info("Knowledge needs improvement. Triggering curation pipeline...")
-            curation_processor = CurationProcessor(self.upstash_service, self.llm_service)
-            data = await curation_processor.process(data, context)
+            data = await self.curation_processor.process(data, context)
         else:
             logger.info("Knowledge is sufficient.")
         return data
 
+def _to_prompt_text(value) -> str:
+    """
+    Serializes retrieved knowledge as compact JSON for the synthesis prompt, so
+    Jinja pastes a ready string and the prompt carries fewer tokens than a repr.
+    """
+    if isinstance(value, str):
+        return value
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
 class InsightSynthesizer(Processor):
     """
     Synthesizes the final insight from all gathered knowledge.
     """
     def __init__(self, llm_service: LLMService):
         self.llm_service = llm_service
-        self.prompt_manager = PromptManager()
+        self.prompt_manager = get_prompt_manager()
 
     async def process(self, data: dict, context: dict) -> dict:
         logger.info("Synthesizing final insight...")
@@ -187,14 +305,17 @@ class InsightSynthesizer(Processor):
 
         prompt = self.prompt_manager.render(
             "insight_synthesis.jinja2",
-            private_results=private_results,
-            traversed_knowledge=traversed_knowledge,
-            public_results=public_results,
-            augmented_knowledge=augmented_knowledge
+            private_results=_to_prompt_text(private_results),
+            traversed_knowledge=_to_prompt_text(traversed_knowledge),
+            public_results=_to_prompt_text(public_results),
+            augmented_knowledge=_to_prompt_text(augmented_knowledge)
         )
 
-        final_insight = self.llm_service.generate(prompt, model=self.llm_service.settings.gemini_pro_model)
+        # The async client awaits the Gemini call instead of holding a worker thread
+        final_insight = await self.llm_service.agenerate(
+            prompt, model=self.llm_service.settings.gemini_pro_model
+        )
         data["final_insight"] = final_insight
 
-        logger.info(f"Final Insight: {final_insight}")
+        logger.info("Final Insight: %s", final_insight)
         return data
\ No newline at end of file
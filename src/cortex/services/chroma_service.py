@@ -1,39 +1,207 @@
-from cortex.core.config import Settings
+from cortex.core.config import get_settings
+import asyncio
 import chromadb
+import hashlib
+import httpx
 import requests
-from typing import List
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
 import logging
+import threading
 from cortex.exceptions import ServiceError
 
 logger = logging.getLogger(__name__)
 
+_embedding_session: Optional[requests.Session] = None
+_embedding_session_lock = threading.Lock()
+
+def get_embedding_session() -> requests.Session:
+    """
+    Returns the shared HTTP session for the embedding API, creating it on first use.
+    """
+    global _embedding_session
+    if _embedding_session is None:
+        with _embedding_session_lock:
+            if _embedding_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _embedding_session = session
+    return _embedding_session
+
+# Async clients are bound to the event loop they were first used on, so there
+# is one per loop; the worker closes its loop's client on shutdown.
+_async_embedding_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = WeakKeyDictionary()
+
+def get_async_embedding_client() -> httpx.AsyncClient:
+    """
+    Returns the running loop's async HTTP client for the embedding API, creating it on first use.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_embedding_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=2.0),
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+        )
+        _async_embedding_clients[loop] = client
+    return client
+
+_embed_slots: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = WeakKeyDictionary()
+
+def _get_embed_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slots = _embed_slots.get(loop)
+    if slots is None:
+        slots = _embed_slots[loop] = asyncio.Semaphore(get_settings().embed_max_concurrency)
+    return slots
+
+async def close_async_embedding_client() -> None:
+    """
+    Closes the running loop's async embedding client, if it was created. The
+    client is shared by every ChromaService on the loop, so only the worker's
+    on_shutdown calls this.
+    """
+    client = _async_embedding_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+# Opening a PersistentClient starts SQLite and loading the collection reads it
+# back, so both are done once per database path and shared by every
+# ChromaService pointing at it.
+_chroma_collections: Dict[str, Tuple[Any, Any]] = {}
+_chroma_collections_lock = threading.Lock()
+
+def _get_shared_collection(path: str) -> Tuple[Any, Any]:
+    """
+    Returns the (client, collection) pair for the database at path, opening it on first use.
+    """
+    shared = _chroma_collections.get(path)
+    if shared is None:
+        with _chroma_collections_lock:
+            shared = _chroma_collections.get(path)
+            if shared is None:
+                client = chromadb.PersistentClient(path=path)
+                # Create the collection WITHOUT an embedding function.
+                collection = client.get_or_create_collection(name="private_user_model")
+                # Touch the collection so its SQLite pages are loaded before the first query.
+                collection.count()
+                shared = _chroma_collections[path] = (client, collection)
+    return shared
+
+# An embedding depends only on the model and the text, so recent ones are kept
+# and repeated texts (re-ingested insights, a query matching a just-added
+# document) never reach Ollama. Only the misses of a batch are requested.
+EMBEDDING_CACHE_SIZE = 4096
+
+_embedding_cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+def _embedding_key(model: str, text: str) -> bytes:
+    digest = hashlib.blake2b(model.encode(), digest_size=16)
+    digest.update(b"\0")
+    digest.update(text.encode())
+    return digest.digest()
+
+def _get_cached_embeddings(keys: List[bytes]) -> List[Optional[List[float]]]:
+    with _embedding_cache_lock:
+        embeddings = []
+        for key in keys:
+            embedding = _embedding_cache.get(key)
+            if embedding is not None:
+                _embedding_cache.move_to_end(key)
+            embeddings.append(embedding)
+        return embeddings
+
+def _cache_embeddings(keys: List[bytes], embeddings: List[List[float]]) -> None:
+    with _embedding_cache_lock:
+        for key, embedding in zip(keys, embeddings):
+            _embedding_cache[key] = embedding
+            _embedding_cache.move_to_end(key)
+        while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+
 # This is now a standalone helper class, not a ChromaDB type.
 class OllamaEmbeddingHelper:
     def __init__(self, model="nomic-embed-text:v1.5"):
         self.model = model
-        self.settings = Settings()
+        self.settings = get_settings()
 
     def get_embedding(self, text: str) -> List[float]:
         """Generates a single embedding for a single piece of text."""
+        return self.get_embeddings([text])[0]
+
+    def _missing_texts(self, texts: List[str]) -> Tuple[List[bytes], List[Optional[List[float]]], Dict[bytes, str]]:
+        """Looks texts up in the embedding cache; returns their keys, hits, and the unique misses."""
+        keys = [_embedding_key(self.model, text) for text in texts]
+        embeddings = _get_cached_embeddings(keys)
+        missing = {key: text for key, text, embedding in zip(keys, texts, embeddings) if embedding is None}
+        return keys, embeddings, missing
+
+    @staticmethod
+    def _fill_missing(keys: List[bytes], embeddings: List[Optional[List[float]]], missing: Dict[bytes, str], fetched: List[List[float]]) -> List[List[float]]:
+        _cache_embeddings(list(missing), fetched)
+        fetched_by_key = dict(zip(missing, fetched))
+        return [embedding if embedding is not None else fetched_by_key[key] for key, embedding in zip(keys, embeddings)]
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generates embeddings for several texts, requesting all cache misses in a single request."""
+        keys, embeddings, missing = self._missing_texts(texts)
+        if not missing:
+            return embeddings
+        fetched = self._request_embeddings(list(missing.values()))
+        return self._fill_missing(keys, embeddings, missing, fetched)
+
+    def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
         try:
-            response = requests.post(
+            response = get_embedding_session().post(
                 self.settings.llm_embed_url,
-                json={"model": self.model, "input": text}
+                json={"model": self.model, "input": texts}
             )
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to get embedding from Ollama: {e}", exc_info=True)
+            logger.error("Failed to get embedding from Ollama: %s", e, exc_info=True)
             raise ServiceError(f"Failed to get embedding from Ollama: {e}") from e
-        return response.json()["embeddings"][0]
+        embeddings = response.json()["embeddings"]
+        if len(embeddings) != len(texts):
+            raise ServiceError(f"Ollama returned {len(embeddings)} embeddings for {len(texts)} texts")
+        return embeddings
+
+    async def aget_embedding(self, text: str) -> List[float]:
+        """Async variant of get_embedding, for callers on the event loop."""
+        return (await self.aget_embeddings([text]))[0]
+
+    async def aget_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Async variant of get_embeddings, for callers on the event loop."""
+        keys, embeddings, missing = self._missing_texts(texts)
+        if not missing:
+            return embeddings
+        fetched = await self._arequest_embeddings(list(missing.values()))
+        return self._fill_missing(keys, embeddings, missing, fetched)
+
+    async def _arequest_embeddings(self, texts: List[str]) -> List[List[float]]:
+        try:
+            async with _get_embed_slots():
+                response = await get_async_embedding_client().post(
+                    self.settings.llm_embed_url,
+                    json={"model": self.model, "input": texts}
+                )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.error("Failed to get embedding from Ollama: %s", e, exc_info=True)
+            raise ServiceError(f"Failed to get embedding from Ollama: {e}") from e
+        embeddings = response.json()["embeddings"]
+        if len(embeddings) != len(texts):
+            raise ServiceError(f"Ollama returned {len(embeddings)} embeddings for {len(texts)} texts")
+        return embeddings
 
 class ChromaService:
     def __init__(self):
-        settings = Settings()
-        self.client = chromadb.PersistentClient(path=settings.chromadb_path)
-        # Create the collection WITHOUT an embedding function.
-        self.collection = self.client.get_or_create_collection(
-            name="private_user_model"
-        )
+        settings = get_settings()
+        self.client, self.collection = _get_shared_collection(settings.chromadb_path)
         # Create an instance of our helper for use in the add_document method.
         self.embedding_helper = OllamaEmbeddingHelper()
 
@@ -53,9 +221,27 @@ class ChromaService:
                 metadatas=[metadata]
             )
         except Exception as e:
-            logger.error(f"Failed to add document to Chroma: {e}", exc_info=True)
+            logger.error("Failed to add document to Chroma: %s", e, exc_info=True)
             raise ServiceError(f"Failed to add document to ChromaDB: {e}") from e
 
+    def add_documents(self, doc_ids: List[str], contents: List[str], metadatas: List[Dict]):
+        """
+        Adds several documents with a single collection.add() call, so the
+        batch is committed in one transaction instead of one per document.
+        """
+        embeddings = self.embedding_helper.get_embeddings(contents)
+
+        try:
+            self.collection.add(
+                ids=doc_ids,
+                embeddings=embeddings,
+                documents=contents,
+                metadatas=metadatas
+            )
+        except Exception as e:
+            logger.error("Failed to add documents to Chroma: %s", e, exc_info=True)
+            raise ServiceError(f"Failed to add documents to ChromaDB: {e}") from e
+
     def query(self, query_text: str, n_results: int = 3):
         """Query the collection for similar documents."""
         # For querying, we must also generate an embedding for the query text first.
@@ -65,4 +251,17 @@ class ChromaService:
             n_results=n_results,
             include=["documents", "metadatas"]
         )
-        return results
\ No newline at end of file
+        return results
+
+    async def aquery(self, query_text: str, n_results: int = 3):
+        """
+        Async variant of query: the embedding is awaited on the event loop and
+        the blocking vector search runs in a worker thread.
+        """
+        query_embedding = await self.embedding_helper.aget_embedding(query_text)
+        return await asyncio.to_thread(
+            self.collection.query,
+            query_embeddings=[query_embedding],
+            n_results=n_results,
+            include=["documents", "metadatas"]
+        )
@@ -1,27 +1,201 @@
 import os
+import atexit
+import threading
 import yaml
 import hashlib
+import orjson
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
 from ..models.insights import Insight
 from ..models.events import GitCommitEvent, CodeChangeEvent
-from ..core.config import Settings
+from ..core.config import get_settings
 from cortex.exceptions import ServiceError
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# libyaml's C emitter is several times faster than the pure-Python one; fall
+# back to the latter when PyYAML was built without it.
+try:
+    from yaml import CSafeDumper as _FrontmatterDumper
+except ImportError:
+    from yaml import SafeDumper as _FrontmatterDumper
+
+# Insight front matter always has the same keys holding strings or lists of
+# strings, so it is written directly as YAML. Every string is emitted as a
+# double-quoted scalar, which needs no tag resolution or style detection. A
+# JSON string is a valid double-quoted YAML scalar except for characters YAML
+# treats as line breaks or forbids in a stream, which JSON leaves as they are;
+# orjson does the quoting and escaping, and only those few are escaped after.
+_YAML_RESIDUAL_ESCAPES = str.maketrans({
+    **{chr(c): f"\\x{c:02x}" for c in range(0x7F, 0xA0)},
+    "\u2028": "\\L",
+    "\u2029": "\\P",
+    "\ufffe": "\\ufffe",
+    "\uffff": "\\uffff",
+})
+
+def _yaml_str(value: str) -> str:
+    quoted = orjson.dumps(value).decode()
+    if not value.isascii() or "\x7f" in value:
+        quoted = quoted.translate(_YAML_RESIDUAL_ESCAPES)
+    return quoted
+
+def _yaml_str_list(key: str, values: List[str]) -> str:
+    if not values:
+        return f"{key}: []\n"
+    return f"{key}:\n" + "".join(f"- {_yaml_str(value)}\n" for value in values)
+
+def _emit_frontmatter(insight: Insight, parent_nodes: List[str]) -> str:
+    """Renders the YAML front matter block of an insight node, without the --- fences."""
+    return "".join((
+        "insight_id: ", _yaml_str(insight.insight_id), "\n",
+        "source_event_type: ", _yaml_str(insight.source_event_type), "\n",
+        "timestamp: ", _yaml_str(insight.timestamp.isoformat()), "\n",
+        _yaml_str_list("patterns", insight.patterns),
+        _yaml_str_list("parent_nodes", parent_nodes),
+    ))
+
+# Append-only descriptors for index nodes, kept open across insights so each
+# link is a single O_APPEND write. Bounded so a long-lived worker does not
+# accumulate descriptors for every repository it has ever seen.
+_MAX_CACHED_INDEX_FDS = 64
+_index_fds: "OrderedDict[str, int]" = OrderedDict()
+
+def _get_append_fd(path: str) -> int:
+    fd = _index_fds.get(path)
+    if fd is not None:
+        _index_fds.move_to_end(path)
+        return fd
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    _index_fds[path] = fd
+    if len(_index_fds) > _MAX_CACHED_INDEX_FDS:
+        _, evicted_fd = _index_fds.popitem(last=False)
+        os.close(evicted_fd)
+    return fd
+
+def _forget_append_fd(path: str) -> None:
+    fd = _index_fds.pop(path, None)
+    if fd is not None:
+        os.close(fd)
+
+class IndexAppender:
+    """
+    Collects links bound for index nodes. Links are appended straight away
+    unless deferred() is active; deferred links are written on flush(), or once
+    max_pending have accumulated, with a single append per index node.
+    """
+    def __init__(self, max_pending: int = 64):
+        self.max_pending = max_pending
+        self._pending: Dict[str, List[str]] = {}
+        self._pending_count = 0
+        self._deferring = 0
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def deferred(self) -> Iterator[None]:
+        with self._lock:
+            self._deferring += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._deferring -= 1
+
+    def append(self, index_file: Path, link_markdown: str) -> None:
+        path = str(index_file)
+        with self._lock:
+            chunks = self._pending.get(path)
+            if chunks is None:
+                if not index_file.exists():
+                    # A cached descriptor would point at a deleted file; start afresh.
+                    _forget_append_fd(path)
+                    chunks = [f"# Index: {index_file.stem}\n\n## Related Insights\n\n"]
+                else:
+                    chunks = []
+                self._pending[path] = chunks
+            chunks.append(link_markdown)
+            self._pending_count += 1
+            if not self._deferring or self._pending_count >= self.max_pending:
+                # Only this node's own failure is the caller's; any other node
+                # that fails stays queued and is reported by flush().
+                error = self._write_pending().get(path)
+                if error is not None:
+                    raise error
+
+    def _write_pending(self) -> Dict[str, OSError]:
+        """
+        Writes the pending links out, one append per index node. A node whose
+        append fails keeps its links queued for the next attempt; the failures
+        are returned by path.
+        """
+        failures: Dict[str, OSError] = {}
+        with self._lock:
+            for path in list(self._pending):
+                try:
+                    os.write(_get_append_fd(path), "".join(self._pending[path]).encode("utf-8"))
+                except OSError as e:
+                    # The descriptor may be stale; the next attempt reopens the file.
+                    _forget_append_fd(path)
+                    logger.error("Failed to append to index node %s, keeping its links queued: %s", path, e)
+                    failures[path] = e
+                    continue
+                del self._pending[path]
+            self._pending_count = sum(len(chunks) for chunks in self._pending.values())
+        return failures
+
+    def flush(self) -> None:
+        """Writes the pending links out, raising a ServiceError if any node failed."""
+        failures = self._write_pending()
+        if failures:
+            path, error = next(iter(failures.items()))
+            raise ServiceError(f"Error updating index node {path}: {error}") from error
+
+# Shared by every KnowledgeGraphService, since the workers create one per job.
+_index_appender = IndexAppender()
+
+def defer_index_appends():
+    """Context manager that holds index links back until flush_index_appends()."""
+    return _index_appender.deferred()
+
+def flush_index_appends() -> None:
+    """Writes out any index links held back by defer_index_appends()."""
+    _index_appender.flush()
+
+@atexit.register
+def _close_append_fds() -> None:
+    _index_appender.flush()
+    while _index_fds:
+        os.close(_index_fds.popitem()[1])
+
+@lru_cache(maxsize=4096)
+def _path_slug(file_path: str) -> str:
+    """Short, stable slug for a source file path; the same files recur across many events."""
+    return hashlib.blake2b(file_path.encode("utf-8"), digest_size=6).hexdigest()
+
 class KnowledgeGraphService:
     """
     Manages a Zettelkasten-style Knowledge Graph, adopting patterns from
     tools like Obsidian and Dendron for a robust, interconnected system.
     """
-    def __init__(self, base_path: str = Settings().knowledge_graph_path):
-        self.base_path = Path(base_path)
-        (self.base_path / "insights"
-       ).mkdir(parents=True, exist_ok=True)
-        (self.base_path / "repositories"
-       ).mkdir(parents=True, exist_ok=True)
+    # Base paths whose directories were already created in this process, so
+    # constructing another service for the same graph skips the mkdir calls.
+    _prepared_paths: Set[Path] = set()
+
+    def __init__(self, base_path: Optional[str] = None):
+        self.base_path = Path(base_path or get_settings().knowledge_graph_path)
+        self.fast_frontmatter = get_settings().kg_fast_frontmatter
+        if self.base_path not in KnowledgeGraphService._prepared_paths:
+            (self.base_path / "insights"
+           ).mkdir(parents=True, exist_ok=True)
+            (self.base_path / "repositories"
+           ).mkdir(parents=True, exist_ok=True)
+            KnowledgeGraphService._prepared_paths.add(self.base_path)
+        self._insights_dir = self.base_path / "insights"
+        self._repositories_dir = self.base_path / "repositories"
 
     def _generate_insight_filepath(self, insight: Insight) -> str:
         """
@@ -33,7 +207,7 @@ class KnowledgeGraphService:
             filename = f"{event_type_slug}.{short_hash}.md"
 
         elif isinstance(insight.source_event, CodeChangeEvent):
-            path_hash = hashlib.md5(insight.source_event.file_path.encode()).hexdigest()[:12]
+            path_hash = _path_slug(insight.source_event.file_path)
             timestamp = insight.timestamp.strftime("%Y%m%dT%H%M%S")
             filename = f"{event_type_slug}.{path_hash}.{timestamp}.md"
 
@@ -51,22 +225,36 @@ class KnowledgeGraphService:
         insight_file = self.base_path / "insights" / filename
         
         repo_name = insight.metadata.get("repo_name")
-        parent_repo_node = f"[[../repositories/{repo_name}.md]]" if repo_name else None
-
-        frontmatter = {
-            "insight_id": insight.insight_id,
-            "source_event_type": insight.source_event_type,
-            "timestamp": insight.timestamp.isoformat(),
-            "patterns":insight.patterns,
-            "parent_nodes": [parent_repo_node] if parent_repo_node else []
-        }
-        
+        parent_nodes = [f"[[../repositories/{repo_name}.md]]"] if repo_name else []
+
+        if self.fast_frontmatter:
+            frontmatter_yaml = _emit_frontmatter(insight, parent_nodes)
+        else:
+            frontmatter = {
+                "insight_id": insight.insight_id,
+                "source_event_type": insight.source_event_type,
+                "timestamp": insight.timestamp.isoformat(),
+                "patterns":insight.patterns,
+                "parent_nodes": parent_nodes
+            }
+            frontmatter_yaml = yaml.dump(frontmatter, Dumper=_FrontmatterDumper, sort_keys=False)
+
+        # Assemble the whole document up front so it is written with a single call.
+        document = "".join((
+            "---\n",
+            frontmatter_yaml,
+            "---\n\n# Insight: ",
+            insight.summary,
+            "\n\n",
+        ))
+
         try:
-            with open(insight_file, "w",encoding="utf-8") as f:
-                f.write("---\n")
-                yaml.dump(frontmatter, f, sort_keys=False)
-                f.write("---\n\n")
-                f.write(f"# Insight: {insight.summary}\n\n")
+            # Written with a single os.write, bypassing the buffered text layer.
+            fd = os.open(insight_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, document.encode("utf-8"))
+            finally:
+                os.close(fd)
 
             return insight_file
         except (IOError, OSError) as e:
@@ -76,19 +264,19 @@ class KnowledgeGraphService:
         """
         Appends a wikilink to an index/hub node.
         """
-        # Use os.path.relpath for a more robust relative path calculation
-        # that works even when files are in sibling directories.
-        relative_link_path = os.path.relpath(link_to_add, start=index_file.parent)
-        # os.path.relpath returns a string. We need to ensure it uses forward slashes for the markdown link.
-        link_markdown = f"- [[{relative_link_path.replace(os.sep, '/')}]]\n"
+        if index_file.parent == self._repositories_dir and link_to_add.parent == self._insights_dir:
+            # The usual case, a repository index linking an insight: the two
+            # folders are siblings, so the relative link is known up front.
+            link_markdown = f"- [[../insights/{link_to_add.name}]]\n"
+        else:
+            # Use os.path.relpath for a more robust relative path calculation
+            # that works even when files are in sibling directories.
+            relative_link_path = os.path.relpath(link_to_add, start=index_file.parent)
+            # os.path.relpath returns a string. We need to ensure it uses forward slashes for the markdown link.
+            link_markdown = f"- [[{relative_link_path.replace(os.sep, '/')}]]\n"
 
         try:
-            if not index_file.exists():
-                with open(index_file, "w", encoding="utf-8") as f:
-                    f.write(f"# Index: {index_file.stem}\n\n## Related Insights\n\n{link_markdown}")
-            else:
-                with open(index_file, "a", encoding="utf-8") as f:
-                    f.write(link_markdown)
+            _index_appender.append(index_file, link_markdown)
         except (IOError,OSError) as e:
             raise ServiceError(f"Error updating index node: {e}")
 
@@ -103,4 +291,4 @@ class KnowledgeGraphService:
                 repo_node_path = self.base_path / "repositories" / f"{repo_name}.md"
                 self._update_index_node(repo_node_path, insight_file_path)
         
-        logger.info(f"Knowledge graph updated. Created insight node: {insight_file_path.name}")
\ No newline at end of file
+        logger.info("Knowledge graph updated. Created insight node: %s", insight_file_path.name)
\ No newline at end of file
@@ -1,13 +1,100 @@
-import requests
-from cortex.core.config import Settings
+import asyncio
+import hashlib
+import httpx
+import threading
+from cortex.core.config import get_settings
 from google import genai
 from typing import Optional
-from .prompt_manager import PromptManager
+from weakref import WeakKeyDictionary
+from .prompt_manager import get_prompt_manager
 from cortex.exceptions import ServiceError
+from cortex.utility.ttl_cache import TTLCache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# One pooled HTTP client is shared by every LLMService in the process, so
+# consecutive calls to the local LLM reuse keep-alive connections. Failed
+# connection attempts are retried; a request that reached the server is not,
+# since generation is not idempotent.
+OLLAMA_CONNECT_RETRIES = 2
+OLLAMA_TIMEOUT = httpx.Timeout(60.0, connect=2.0)
+OLLAMA_LIMITS = httpx.Limits(max_keepalive_connections=8, max_connections=16)
+_ollama_client: Optional[httpx.Client] = None
+_ollama_client_lock = threading.Lock()
+
+def get_ollama_client() -> httpx.Client:
+    """
+    Returns the shared HTTP client for the local LLM API, creating it on first use.
+    """
+    global _ollama_client
+    if _ollama_client is None:
+        with _ollama_client_lock:
+            if _ollama_client is None:
+                _ollama_client = httpx.Client(
+                    timeout=OLLAMA_TIMEOUT,
+                    transport=httpx.HTTPTransport(retries=OLLAMA_CONNECT_RETRIES, limits=OLLAMA_LIMITS),
+                )
+    return _ollama_client
+
+# Async clients are bound to the event loop they were created on, so callers
+# running on the loop (e.g. ARQ jobs) get one per loop.
+_async_ollama_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = WeakKeyDictionary()
+
+def get_async_ollama_client() -> httpx.AsyncClient:
+    """
+    Returns the running loop's async HTTP client for the local LLM API, creating it on first use.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_ollama_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            timeout=OLLAMA_TIMEOUT,
+            transport=httpx.AsyncHTTPTransport(retries=OLLAMA_CONNECT_RETRIES, limits=OLLAMA_LIMITS),
+        )
+        _async_ollama_clients[loop] = client
+    return client
+
+async def close_async_ollama_client() -> None:
+    """
+    Closes the running loop's async LLM client, if it was created.
+    """
+    client = _async_ollama_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+def close_ollama_client() -> None:
+    """
+    Closes the shared HTTP client, if it was created.
+    """
+    global _ollama_client
+    with _ollama_client_lock:
+        if _ollama_client is not None:
+            _ollama_client.close()
+            _ollama_client = None
+
+# Responses are cached by model and exact prompt, so re-sent events (retries,
+# replays) skip the LLM call. The cache is shared by every LLMService in the
+# process and guarded by a lock, as sync generation runs on worker threads.
+LLM_RESPONSE_CACHE_SIZE = 1024
+LLM_RESPONSE_TTL_SECONDS = 3600
+_llm_responses: TTLCache[bytes, str] = TTLCache(LLM_RESPONSE_CACHE_SIZE, LLM_RESPONSE_TTL_SECONDS)
+_llm_responses_lock = threading.Lock()
+
+def _response_key(model: str, prompt: str) -> bytes:
+    digest = hashlib.sha256(model.encode())
+    digest.update(b"\0")
+    digest.update(prompt.encode())
+    return digest.digest()
+
+def _get_cached_response(key: bytes) -> Optional[str]:
+    with _llm_responses_lock:
+        return _llm_responses.get(key)
+
+def _cache_response(key: bytes, response: str) -> None:
+    with _llm_responses_lock:
+        _llm_responses.set(key, response)
+
 class LLMService:
     """
     Service for interacting with Large Language Models (LLMs), supporting both local and cloud-based models.
@@ -17,8 +104,8 @@ class LLMService:
         Initializes the LLMService. The google-genai library is configured automatically
         by the genai.Client() constructor, which looks for the API key in the environment.
         """
-        self.settings = Settings()
-        self.prompt_manager = PromptManager()
+        self.settings = get_settings()
+        self.prompt_manager = get_prompt_manager()
         self._gemini_client = genai.Client()
 
     def generate(self, prompt: str, model: Optional[str] = None) -> str:
@@ -33,11 +120,17 @@ class LLMService:
             The generated text from the LLM.
         """
         model_to_use = model or self.settings.llm_model
+        cache_key = _response_key(model_to_use, prompt)
+        cached = _get_cached_response(cache_key)
+        if cached is not None:
+            return cached
 
         if model_to_use.startswith("gemini-"):
-            return self._generate_with_gemini(prompt, model_to_use)
+            response = self._generate_with_gemini(prompt, model_to_use)
         else:
-            return self._generate_with_ollama(prompt, model_to_use)
+            response = self._generate_with_ollama(prompt, model_to_use)
+        _cache_response(cache_key, response)
+        return response
 
     def _generate_with_gemini(self, prompt: str, model: str) -> str:
         try:
@@ -49,19 +142,61 @@ class LLMService:
                 return "".join([part.text for part in response.parts if part.text]).strip()
             return ""
         except Exception as e:
-            logger.error(f"Error communicating with Gemini API: {e}", exc_info=True)
+            logger.error("Error communicating with Gemini API: %s", e, exc_info=True)
             raise ServiceError(f"Error communicating with Gemini API: {e}") from e
 
     def _generate_with_ollama(self, prompt: str, model: str) -> str:
         try:
-            response = requests.post(
+            response = get_ollama_client().post(
                 self.settings.llm_api_url,
                 json={"model": model, "prompt": prompt, "stream": False},
             )
             response.raise_for_status()
             return response.json().get("response", "").strip()
-        except requests.RequestException as e:
-            logger.error(f"Error communicating with local LLM API: {e}", exc_info=True)
+        except httpx.HTTPError as e:
+            logger.error("Error communicating with local LLM API: %s", e, exc_info=True)
+            raise ServiceError(f"Error communicating with local LLM API: {e}") from e
+
+    async def agenerate(self, prompt: str, model: Optional[str] = None) -> str:
+        """
+        Async counterpart of generate, for callers running on the event loop.
+        """
+        model_to_use = model or self.settings.llm_model
+        cache_key = _response_key(model_to_use, prompt)
+        cached = _get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+        if model_to_use.startswith("gemini-"):
+            response = await self._agenerate_with_gemini(prompt, model_to_use)
+        else:
+            response = await self._agenerate_with_ollama(prompt, model_to_use)
+        _cache_response(cache_key, response)
+        return response
+
+    async def _agenerate_with_gemini(self, prompt: str, model: str) -> str:
+        try:
+            response = await self._gemini_client.aio.models.generate_content(
+                model=model,
+                contents=prompt
+            )
+            if response.parts:
+                return "".join([part.text for part in response.parts if part.text]).strip()
+            return ""
+        except Exception as e:
+            logger.error("Error communicating with Gemini API: %s", e, exc_info=True)
+            raise ServiceError(f"Error communicating with Gemini API: {e}") from e
+
+    async def _agenerate_with_ollama(self, prompt: str, model: str) -> str:
+        try:
+            response = await get_async_ollama_client().post(
+                self.settings.llm_api_url,
+                json={"model": model, "prompt": prompt, "stream": False},
+            )
+            response.raise_for_status()
+            return response.json().get("response", "").strip()
+        except httpx.HTTPError as e:
+            logger.error("Error communicating with local LLM API: %s", e, exc_info=True)
             raise ServiceError(f"Error communicating with local LLM API: {e}") from e
 
     def generate_commit_summary(self, commit_message: str, commit_diff: str) -> str:
@@ -85,4 +220,4 @@ class LLMService:
             change_type=change_type,
             content=content
         )
-        return self.generate(prompt)
\ No newline at end of file
+        return self.generate(prompt)
@@ -1,19 +1,77 @@
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import BaseLoader, ChoiceLoader, Environment, FileSystemLoader, ModuleLoader, Template, TemplateNotFound
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Dict, Optional, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Construct an absolute path to the 'prompts' directory from the project root
+PROMPTS_DIR = Path(__file__).parent.parent.parent / "cortex/prompts"
+# Templates precompiled to Python modules by scripts/compile_prompts.py. When
+# present they are imported instead of parsing the sources. Templates that were
+# added or edited since the last compile are still read from their sources.
+COMPILED_PROMPTS_DIR = Path(__file__).parent.parent.parent / "cortex/prompts_compiled"
+
+def _create_environment(loader: BaseLoader) -> Environment:
+    # Templates ship with the package, so compiled templates are kept for the
+    # life of the process without re-checking the files on every render.
+    return Environment(loader=loader, auto_reload=False, cache_size=-1, autoescape=False)
+
+def compile_prompts(target: Union[str, Path] = COMPILED_PROMPTS_DIR) -> None:
+    """
+    Compiles every prompt template into a Python module under target.
+    """
+    env = _create_environment(FileSystemLoader(str(PROMPTS_DIR)))
+    env.compile_templates(str(target), zip=None, ignore_errors=False)
+
+class _FreshModuleLoader(ModuleLoader):
+    """
+    ModuleLoader that skips a compiled template older than its source, so the
+    ChoiceLoader falls through to the source instead of serving a stale prompt.
+    """
+    def __init__(self, path: Path, source_dir: Path):
+        super().__init__(str(path))
+        self._compiled_dir = path
+        self._source_dir = source_dir
+
+    def load(self, environment: Environment, name: str, globals: Optional[Dict[str, Any]] = None) -> Template:
+        try:
+            source_mtime = (self._source_dir / name).stat().st_mtime
+            compiled_mtime = (self._compiled_dir / self.get_module_filename(name)).stat().st_mtime
+        except OSError:
+            # No source to compare against, or no compiled module at all (which
+            # the ModuleLoader reports as TemplateNotFound).
+            pass
+        else:
+            if compiled_mtime < source_mtime:
+                raise TemplateNotFound(name)
+        return super().load(environment, name, globals)
+
 class PromptManager:
     """
     Manages loading and rendering Jinja2 templates for prompts.
     """
     def __init__(self):
-        # Construct an absolute path to the 'prompts' directory from the project root
-        project_root = Path(__file__).parent.parent.parent
-        template_folder = project_root / "cortex/prompts"
-        logger.info(f"Attempting to load templates from: {template_folder.resolve()}")
-        self.env = Environment(loader=FileSystemLoader(str(template_folder)))
+        template_folder = PROMPTS_DIR
+        loader: BaseLoader = FileSystemLoader(str(template_folder))
+        if COMPILED_PROMPTS_DIR.is_dir():
+            logger.info("Loading precompiled templates from: %s", COMPILED_PROMPTS_DIR.resolve())
+            loader = ChoiceLoader([_FreshModuleLoader(COMPILED_PROMPTS_DIR, template_folder), loader])
+        else:
+            logger.info("Attempting to load templates from: %s", template_folder.resolve())
+        self.env = _create_environment(loader)
+        # Every shipped template is compiled up front, so render is a dict lookup.
+        self._templates: Dict[str, Template] = {
+            path.name: self.env.get_template(path.name) for path in template_folder.glob("*.jinja2")
+        }
+        self._static_renders: Dict[str, str] = {}
+
+    def _get_template(self, template_name: str) -> Template:
+        template = self._templates.get(template_name)
+        if template is None:
+            template = self._templates[template_name] = self.env.get_template(template_name)
+        return template
 
     def render(self, template_name: str, **kwargs) -> str:
         """
@@ -26,5 +84,19 @@ class PromptManager:
         Returns:
             The rendered prompt as a string.
         """
-        template = self.env.get_template(template_name)
-        return template.render(**kwargs)
+        if not kwargs:
+            # A render without variables always yields the same text
+            rendered = self._static_renders.get(template_name)
+            if rendered is None:
+                rendered = self._static_renders[template_name] = self._get_template(template_name).render()
+            return rendered
+        return self._get_template(template_name).render(**kwargs)
+
+@lru_cache(maxsize=1)
+def get_prompt_manager() -> PromptManager:
+    """
+    Returns the process-wide PromptManager, so every processor shares one
+    Jinja2 environment and its compiled templates.
+    """
+    return PromptManager()
+
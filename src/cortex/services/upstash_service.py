@@ -1,15 +1,31 @@
 
 from upstash_vector import AsyncIndex
 from upstash_vector.types import Data
-from cortex.core.config import Settings
+from cortex.core.config import get_settings
+from cortex.exceptions import ServiceError
+from cortex.utility.batching import AsyncBatcher
+from typing import List, Optional, Tuple
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bulk inserts are split into upserts of this many vectors, with only a couple
+# in flight at once; more parallel requests slow the client down rather than up.
+UPSTASH_UPSERT_BATCH_SIZE = 32
+UPSTASH_MAX_CONCURRENT_UPSERTS = 2
+
+# Single documents added concurrently through add_document (e.g. by parallel
+# curation runs) are sent as one bulk upsert; a lone add waits at most
+# ADD_DOCUMENT_MAX_DELAY_MS.
+ADD_DOCUMENT_BATCH_SIZE = 32
+ADD_DOCUMENT_MAX_DELAY_MS = 50
+
 class UpstashService:
     def __init__(self):
-        settings = Settings()
+        settings = get_settings()
         self.index = AsyncIndex(url=settings.upstash_url, token=settings.upstash_token)
+        self._batcher: Optional[AsyncBatcher[Tuple[str, str, dict]]] = None
 
     async def add_document(self, doc_id: str, content: str, metadata: dict):
         """Add a document to the Upstash collection with its embedding vector.
@@ -18,15 +34,46 @@ class UpstashService:
         doc_id: Unique identifier for the document
         content: The text content
         metadata: Associated metadata
+
+    Documents added concurrently are upserted together through add_documents.
+    A failed upsert is logged and raised as ServiceError to every document in it.
         """
-        try:
-            await self.index.upsert(
-                vectors=[
-                    Data(id=doc_id, metadata=metadata, data=content)
-                ]
+        if self._batcher is None:
+            self._batcher = AsyncBatcher(
+                self.add_documents, batch_size=ADD_DOCUMENT_BATCH_SIZE, max_delay_ms=ADD_DOCUMENT_MAX_DELAY_MS
             )
+        try:
+            await self._batcher.submit((doc_id, content, metadata))
         except Exception as e:
-            logger.error(f"[UpstashService] Error adding document {doc_id}: {e}")
+            logger.error("[UpstashService] Error adding document %s: %s", doc_id, e)
+            if isinstance(e, ServiceError):
+                raise
+            raise ServiceError(f"Failed to add document to Upstash: {e}") from e
+
+    async def add_documents(self, documents: List[Tuple[str, str, dict]]):
+        """Add many documents to the Upstash collection in bulk upserts.
+
+    Args:
+        documents: (doc_id, content, metadata) tuples
+
+    Failures are raised as ServiceError.
+        """
+        semaphore = asyncio.Semaphore(UPSTASH_MAX_CONCURRENT_UPSERTS)
+
+        async def upsert(chunk: List[Tuple[str, str, dict]]):
+            async with semaphore:
+                await self.index.upsert(
+                    vectors=[Data(id=doc_id, metadata=metadata, data=content) for doc_id, content, metadata in chunk]
+                )
+
+        results = await asyncio.gather(
+            *(upsert(documents[i:i + UPSTASH_UPSERT_BATCH_SIZE]) for i in range(0, len(documents), UPSTASH_UPSERT_BATCH_SIZE)),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            logger.error("[UpstashService] Error adding %s documents: %s", len(documents), errors[0])
+            raise ServiceError(f"Failed to add documents to Upstash: {errors[0]}") from errors[0]
 
     async def query(self, query_text: str, n_results: int = 3):
         """Query the collection for similar documents, letting Upstash generate the embedding."""
@@ -0,0 +1,32 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Generic, List, Optional, TypeVar
+
+A = TypeVar("A")
+
+class AgentPool(Generic[A]):
+    """
+    Keeps built agents for reuse instead of constructing one per request.
+
+    At most maxsize agents are checked out at once; further callers wait for
+    one to be returned. run_standalone_agent gives every run its own runner
+    and session, so a returned agent carries no conversation state and needs
+    no reset beyond going back on the idle list. A pool belongs to the event
+    loop it is first used on.
+    """
+    def __init__(self, factory: Callable[[], A], maxsize: int = 4):
+        self._factory = factory
+        self.maxsize = maxsize
+        self._idle: List[A] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @asynccontextmanager
+    async def agent(self) -> AsyncIterator[A]:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.maxsize)
+        async with self._slots:
+            agent = self._idle.pop() if self._idle else self._factory()
+            try:
+                yield agent
+            finally:
+                self._idle.append(agent)
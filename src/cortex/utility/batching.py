@@ -0,0 +1,61 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Optional, Set, TypeVar
+
+T = TypeVar("T")
+
+class AsyncBatcher(Generic[T]):
+    """
+    Coalesces items submitted by concurrent coroutines into batches.
+
+    A batch is flushed once it holds batch_size items, or max_delay_ms after
+    its first item arrived, whichever comes first. submit() returns when the
+    batch containing the item has been flushed, and raises if the flush failed,
+    so callers keep per-item error handling.
+    """
+    def __init__(self, flush: Callable[[List[T]], Awaitable[None]], batch_size: int = 128, max_delay_ms: float = 50):
+        self._flush = flush
+        self.batch_size = batch_size
+        self.max_delay = max_delay_ms / 1000
+        self._items: List[T] = []
+        self._futures: List[asyncio.Future] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._items.append(item)
+        self._futures.append(future)
+
+        if len(self._items) >= self.batch_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._start_flush)
+
+        await future
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        items, futures = self._items, self._futures
+        self._items, self._futures = [], []
+        if not items:
+            return
+
+        task = asyncio.ensure_future(self._run_flush(items, futures))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _run_flush(self, items: List[T], futures: List[asyncio.Future]) -> None:
+        try:
+            await self._flush(items)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future in futures:
+                if not future.done():
+                    future.set_result(None)
@@ -1,7 +1,9 @@
 
 from cortex.models.insights import Insight
+import asyncio
 import logging
-from cortex.core.redis import create_redis_pool, close_redis_pool
+from typing import Callable, TypeVar
+from cortex.core.redis import create_redis_pool, close_redis_pool, job_serializer, job_deserializer
 from cortex.pipelines.pipelines import Pipeline
 from cortex.pipelines.comprehension import (
     EventDeserializer,
@@ -11,32 +13,75 @@ from cortex.pipelines.comprehension import (
     SynthesisTrigger
 )
 from cortex.pipelines.synthesis import create_synthesis_pipeline
-from cortex.services.knowledge_graph_service import KnowledgeGraphService
-from cortex.services.chroma_service import ChromaService
+from cortex.services.knowledge_graph_service import KnowledgeGraphService, flush_index_appends
+from cortex.services.chroma_service import ChromaService, close_async_embedding_client
 from cortex.services.upstash_service import UpstashService
-from cortex.core.config import Settings
+from cortex.core.config import Settings, get_settings
 from cortex.pipelines.graph_traversal import GraphTraversalProcessor
-from cortex.services.llmservice import LLMService
+from cortex.services.llmservice import (
+    LLMService,
+    close_ollama_client,
+    close_async_ollama_client,
+    get_async_ollama_client,
+    get_ollama_client,
+)
 from google.adk.tools import google_search
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def process_event_task(ctx, event_data: dict):
+S = TypeVar("S")
+
+def _service(ctx: dict, key: str, factory: Callable[[], S]) -> S:
+    """
+    Returns the service cached on the worker context under key, creating and
+    caching it on first use. on_startup fills these in up front; tasks run
+    without it (e.g. in tests) still build each service only once.
+    """
+    service = ctx.get(key)
+    if service is None:
+        service = ctx[key] = factory()
+    return service
+
+async def _warm_connections(ctx: dict) -> None:
+    """
+    Opens the keep-alive connections to the LLM and Upstash endpoints so the
+    first event does not pay for the TCP/TLS handshakes. Failures are only
+    logged; the first real request will simply connect as usual.
+    """
+    llm_api_url = get_settings().llm_api_url
+    results = await asyncio.gather(
+        get_async_ollama_client().head(llm_api_url),
+        # Summaries use the synchronous client from a worker thread.
+        asyncio.to_thread(get_ollama_client().head, llm_api_url),
+        ctx["upstash_service"].index.info(),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("Connection warm-up failed: %s", result)
+
+async def process_event_task(ctx, event_data: str):
     """
     ARQ task to process a raw event using the new pipeline architecture.
+
+    event_data is the event's JSON as enqueued by the API. Jobs pickled by an
+    older API process cannot be decoded by the JSON job deserializer, so the
+    queue must be drained before upgrading (see cortex.core.redis).
     """
-    logger.info(f"--- Starting Comprehension Pipeline for Event ---")
+    logger.info("--- Starting Comprehension Pipeline for Event ---")
 
-    # 1. Instantiate services that the processors will need.
-    kg_service = KnowledgeGraphService()
-    chroma_service = ChromaService()
-    llm_service = LLMService()
+    # 1. Fetch the worker's services that the processors will need.
+    kg_service = _service(ctx, "kg_service", KnowledgeGraphService)
+    chroma_service = _service(ctx, "chroma_service", ChromaService)
+    llm_service = _service(ctx, "llm_service", LLMService)
 
     # 2. Define the pipeline by injecting dependencies into the processors.
     comprehension_pipeline = Pipeline([
         EventDeserializer(),
         InsightGenerator(llm_service=llm_service),
+        # The two writers are independent and overlap their I/O. The trigger
+        # stays after them so synthesis can find this insight in ChromaDB.
         [
             KnowledgeGraphWriter(kg_service),
             ChromaWriter(chroma_service),
@@ -54,33 +99,44 @@ async def process_event_task(ctx, event_data: dict):
             data=event_data,
             context=context
         )
-        logger.info(f"--- Comprehension Pipeline Finished Successfully ---")
+        logger.info("--- Comprehension Pipeline Finished Successfully ---")
 
     except Exception as e:
-        logger.error(f"Comprehension pipeline failed: {e}", exc_info=True)
+        logger.error("Comprehension pipeline failed: %s", e, exc_info=True)
 
 async def on_startup(ctx):
     """
-    Creates the redis pool on worker startup and stores it in the context.
+    Creates the redis pool and the services shared by the worker's tasks,
+    stores them in the context, and pre-warms the LLM and Upstash connections.
     """
     ctx["redis"] = await create_redis_pool()
+    ctx["kg_service"] = KnowledgeGraphService()
+    ctx["chroma_service"] = ChromaService()
+    ctx["llm_service"] = LLMService()
+    ctx["upstash_service"] = UpstashService()
+    await _warm_connections(ctx)
 
 async def on_shutdown(ctx):
     """
-    Closes the redis pool on worker shutdown.
+    Closes the redis pool and the shared LLM and embedding HTTP clients, and
+    writes out any held-back index links, on worker shutdown.
     """
     await close_redis_pool(ctx.get("redis"))
+    close_ollama_client()
+    await close_async_ollama_client()
+    await close_async_embedding_client()
+    flush_index_appends()
 
 async def synthesis_task(ctx, query_text: str):
     """
     ARQ task to perform synthesis on the given query text.
     """
-    logger.info(f"--- Starting Synthesis Pipeline for Query: {query_text[:50]}... ---")
+    logger.info("--- Starting Synthesis Pipeline for Query: %s... ---", query_text[:50])
 
-    # 1. Instantiate services.
-    chroma_service = ChromaService()
-    upstash_service = UpstashService()
-    llm_service = LLMService()
+    # 1. Fetch the worker's services.
+    chroma_service = _service(ctx, "chroma_service", ChromaService)
+    upstash_service = _service(ctx, "upstash_service", UpstashService)
+    llm_service = _service(ctx, "llm_service", LLMService)
 
     # 2. Define the pipeline.
     synthesis_pipeline = create_synthesis_pipeline(chroma_service, upstash_service, llm_service, ctx.get("redis"))
@@ -95,12 +151,14 @@ async def synthesis_task(ctx, query_text: str):
             data=query_text,
             context=context
         )
-        logger.info(f"--- Synthesis Pipeline Finished Successfully ---")
+        logger.info("--- Synthesis Pipeline Finished Successfully ---")
     except Exception as e:
-        logger.error(f"Synthesis pipeline failed: {e}", exc_info=True)
+        logger.error("Synthesis pipeline failed: %s", e, exc_info=True)
 
 class WorkerSettings:
     functions = [process_event_task, synthesis_task]
     queues = ['high_priority', 'low_priority']
     on_startup = on_startup
-    on_shutdown = on_shutdown
\ No newline at end of file
+    on_shutdown = on_shutdown
+    job_serializer = job_serializer
+    job_deserializer = job_deserializer
\ No newline at end of file
@@ -0,0 +1,40 @@
+import pytest
+from unittest.mock import AsyncMock
+from cortex.pipelines import synthesis
+from cortex.services import chroma_service, knowledge_graph_service, llmservice
+
+
+@pytest.fixture(autouse=True)
+def _clear_result_caches():
+    """Keep cached knowledge store results, embeddings, LLM responses and queued index links from leaking between tests."""
+    synthesis._private_query_results.clear()
+    synthesis._public_query_results.clear()
+    chroma_service._embedding_cache.clear()
+    llmservice._llm_responses.clear()
+    yield
+    # Links a test left queued (e.g. for an index path that can never be
+    # written) would otherwise be retried by every later flush.
+    with knowledge_graph_service._index_appender._lock:
+        knowledge_graph_service._index_appender._pending.clear()
+        knowledge_graph_service._index_appender._pending_count = 0
+
+
+@pytest.fixture(scope="session")
+def mock_redis():
+    """Fixture for a mocked Redis client / ARQ pool, shared by the whole session."""
+    redis = AsyncMock()
+    redis.publish = AsyncMock()
+    redis.enqueue_job = AsyncMock()
+    return redis
+
+
+@pytest.fixture(autouse=True)
+def _reset_redis(mock_redis):
+    """Forgets the calls, return values and side effects a test left on the shared Redis mock."""
+    yield
+    # Return values are only reset on the client methods: resetting them on the
+    # mock itself would also reset its magic methods, leaving bool(mock_redis)
+    # returning a MagicMock.
+    mock_redis.reset_mock(side_effect=True)
+    for method in (mock_redis.publish, mock_redis.enqueue_job):
+        method.reset_mock(return_value=True, side_effect=True)
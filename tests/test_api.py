@@ -1,6 +1,9 @@
+import asyncio
 import pytest
+from unittest.mock import AsyncMock, MagicMock
 from fastapi.testclient import TestClient
 from cortex.main import app
+from cortex.core.ws_connection_manager import ConnectionManager
 
 client = TestClient(app)
 
@@ -8,3 +11,44 @@ def test_read_root():
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Cortex API is running."}
+
+@pytest.mark.asyncio
+async def test_broadcast_sends_to_all_connections():
+    manager = ConnectionManager()
+    sockets = [MagicMock(send_bytes=AsyncMock()) for _ in range(3)]
+    manager.active_connections.extend(sockets)
+
+    await manager.broadcast(b"payload")
+
+    for socket in sockets:
+        socket.send_bytes.assert_awaited_once_with(b"payload")
+    assert manager.active_connections == sockets
+
+@pytest.mark.asyncio
+async def test_broadcast_drops_failing_and_stalled_connections(mocker):
+    mocker.patch("cortex.core.ws_connection_manager.BROADCAST_SEND_TIMEOUT_SECONDS", 0.05)
+
+    async def never_completes(message):
+        await asyncio.sleep(10)
+
+    healthy = MagicMock(send_text=AsyncMock())
+    failing = MagicMock(send_text=AsyncMock(side_effect=RuntimeError("closed")))
+    stalled = MagicMock(send_text=AsyncMock(side_effect=never_completes))
+    manager = ConnectionManager()
+    manager.active_connections.extend([healthy, failing, stalled])
+
+    await manager.broadcast("payload")
+
+    healthy.send_text.assert_awaited_once_with("payload")
+    assert manager.active_connections == [healthy]
+
+@pytest.mark.asyncio
+async def test_broadcast_serializes_dict_once():
+    manager = ConnectionManager()
+    sockets = [MagicMock(send_bytes=AsyncMock()) for _ in range(2)]
+    manager.active_connections.extend(sockets)
+
+    await manager.broadcast({"type": "insight", "text": "hello"})
+
+    for socket in sockets:
+        socket.send_bytes.assert_awaited_once_with(b'{"type":"insight","text":"hello"}')
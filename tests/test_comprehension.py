@@ -2,9 +2,16 @@
 Unit tests for comprehension pipeline processors.
 Tests: EventDeserializer, InsightGenerator, KnowledgeGraphWriter, ChromaWriter, SynthesisTrigger
 """
+import asyncio
+import re
+import threading
+import time
 import pytest
-from unittest.mock import MagicMock, AsyncMock, patch
+import redis.exceptions
+from unittest.mock import AsyncMock, Mock, patch
 from datetime import datetime
+from types import MappingProxyType
+from pydantic import ValidationError
 from uuid import uuid4
 
 from cortex.pipelines.comprehension import (
@@ -12,55 +19,105 @@ from cortex.pipelines.comprehension import (
     InsightGenerator,
     KnowledgeGraphWriter,
     ChromaWriter,
-    SynthesisTrigger
+    SynthesisTrigger,
+    MAX_EMBEDDED_MESSAGE_CHARS,
 )
 from cortex.models.events import GitCommitEvent, CodeChangeEvent
 from cortex.models.insights import Insight
-from cortex.services.llmservice import LLMService
 from cortex.services.knowledge_graph_service import KnowledgeGraphService
-from cortex.services.chroma_service import ChromaService
 from cortex.exceptions import ProcessorError, ServiceError
 
+# Error message patterns are compiled once for the module rather than by
+# pytest.raises on every run.
+_UNSUPPORTED_EVENT_TYPE_RE = re.compile(r"Unsupported event type: unsupported_type")
+_MISSING_EVENT_TYPE_RE = re.compile(r"Unsupported event type: None")
+_WRAPPED_ERROR_RES = {
+    (processor, reason): re.compile(rf"{processor} failed due to {reason}")
+    for processor in ("InsightGenerator", "KnowledgeGraphWriter", "ChromaWriter")
+    for reason in ("service error", "unexpected error")
+}
 
 # ============================================================================
 # Fixtures
 # ============================================================================
 
-@pytest.fixture
+# Hand-rolled stand-ins for the services, exposing a plain Mock for each method
+# the processors call. They skip the class introspection of MagicMock(spec=...).
+class _StubService:
+    def reset_mock(self, **kwargs):
+        for attribute in vars(self).values():
+            if isinstance(attribute, Mock):
+                attribute.reset_mock(**kwargs)
+
+
+class StubLLMService(_StubService):
+    def __init__(self):
+        self.generate_commit_summary = Mock(return_value="Test commit summary")
+        self.generate_code_change_summary = Mock(return_value="Test code change summary")
+
+
+class StubKnowledgeGraphService(_StubService):
+    def __init__(self):
+        self.process_insight = Mock()
+
+
+class StubChromaService(_StubService):
+    def __init__(self):
+        self.add_documents = Mock()
+
+
+# The service mocks are built once per session; _reset_service_mocks clears
+# calls and side effects after every test so assertions stay per-test.
+@pytest.fixture(scope="session")
 def mock_llm_service():
-    """Fixture for a mocked LLMService."""
-    service = MagicMock(spec=LLMService)
-    service.generate_commit_summary.return_value = "Test commit summary"
-    service.generate_code_change_summary.return_value = "Test code change summary"
-    return service
+    """Fixture for a stubbed LLMService."""
+    return StubLLMService()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_kg_service():
-    """Fixture for a mocked KnowledgeGraphService."""
-    service = MagicMock(spec=KnowledgeGraphService)
-    return service
+    """Fixture for a stubbed KnowledgeGraphService."""
+    return StubKnowledgeGraphService()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_chroma_service():
-    """Fixture for a mocked ChromaService."""
-    service = MagicMock(spec=ChromaService)
-    return service
+    """Fixture for a stubbed ChromaService."""
+    return StubChromaService()
+
 
+@pytest.fixture(autouse=True)
+def _reset_service_mocks(mock_llm_service, mock_kg_service, mock_chroma_service):
+    """Forgets the calls and side effects a test left on the shared service mocks."""
+    yield
+    for mock in (mock_llm_service, mock_kg_service, mock_chroma_service):
+        mock.reset_mock(side_effect=True)
 
-@pytest.fixture
-def mock_redis():
-    """Fixture for a mocked Redis/ARQ pool."""
-    redis = AsyncMock()
-    redis.enqueue_job = AsyncMock()
-    return redis
 
+@pytest.fixture(scope="module")
+def run():
+    """Runs a coroutine to completion on one event loop shared by the module's synchronous tests."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
+def event_deserializer():
+    """Fixture for an EventDeserializer; it holds no state."""
+    return EventDeserializer()
+
+
+# The sample payloads are shared by every test in the module, so they carry a
+# fixed timestamp and the raw dicts are read-only views. The sample models skip
+# validation; test_sample_fixtures_validate checks they are valid.
+_FIXED_TS = datetime(2024, 1, 1, 0, 0, 0)
+
+
+@pytest.fixture(scope="module")
 def sample_git_commit_data():
     """Sample raw git commit event data."""
-    return {
+    return MappingProxyType({
         "event_type": "git_commit",
         "repo_name": "test-repo",
         "branch_name": "main",
@@ -69,25 +126,25 @@ def sample_git_commit_data():
         "author_email": "test@example.com",
         "message": "feat: add new feature",
         "diff": "diff --git a/file.py b/file.py\n+new line",
-        "timestamp": datetime.now().isoformat()
-    }
+        "timestamp": _FIXED_TS.isoformat()
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_code_change_data():
     """Sample raw code change event data."""
-    return {
+    return MappingProxyType({
         "event_type": "file_change",
         "file_path": "/path/to/file.py",
         "change_type": "modified",
         "content": "def new_function():\n    pass"
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_git_commit_event():
     """Sample GitCommitEvent object."""
-    return GitCommitEvent(
+    return GitCommitEvent.model_construct(
         event_type="git_commit",
         repo_name="test-repo",
         branch_name="main",
@@ -96,14 +153,14 @@ def sample_git_commit_event():
         author_email="test@example.com",
         message="feat: add new feature",
         diff="diff --git a/file.py b/file.py\n+new line",
-        timestamp=datetime.now()
+        timestamp=_FIXED_TS
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_code_change_event():
     """Sample CodeChangeEvent object."""
-    return CodeChangeEvent(
+    return CodeChangeEvent.model_construct(
         event_type="file_change",
         file_path="/path/to/file.py",
         change_type="modified",
@@ -111,10 +168,10 @@ def sample_code_change_event():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_insight(sample_git_commit_event):
     """Sample Insight object."""
-    return Insight(
+    return Insight.model_construct(
         insight_id="test_insight_123",
         source_event_type="git_commit",
         summary="Test commit summary",
@@ -126,10 +183,16 @@ def sample_insight(sample_git_commit_event):
         },
         content_for_embedding="Test content for embedding",
         source_event=sample_git_commit_event,
-        timestamp=datetime.now()
+        timestamp=_FIXED_TS
     )
 
 
+def test_sample_fixtures_validate(sample_git_commit_event, sample_code_change_event, sample_insight):
+    """Test that the unvalidated sample models hold data that passes validation."""
+    for sample in (sample_git_commit_event, sample_code_change_event, sample_insight):
+        assert type(sample).model_validate(sample.model_dump()) == sample
+
+
 # ============================================================================
 # EventDeserializer Tests
 # ============================================================================
@@ -137,12 +200,9 @@ def sample_insight(sample_git_commit_event):
 class TestEventDeserializer:
     """Tests for EventDeserializer processor."""
 
-    @pytest.mark.asyncio
-    async def test_deserialize_git_commit_event(self, sample_git_commit_data):
+    def test_deserialize_git_commit_event(self, run, event_deserializer, sample_git_commit_data):
         """Test deserializing a git commit event."""
-        processor = EventDeserializer()
-
-        result = await processor.process(sample_git_commit_data, {})
+        result = run(event_deserializer.process(sample_git_commit_data, {}))
 
         assert isinstance(result, GitCommitEvent)
         assert result.event_type == "git_commit"
@@ -151,35 +211,47 @@ class TestEventDeserializer:
         assert result.commit_hash == "abc123def456"
         assert result.message == "feat: add new feature"
 
-    @pytest.mark.asyncio
-    async def test_deserialize_code_change_event(self, sample_code_change_data):
+    def test_deserialize_code_change_event(self, run, event_deserializer, sample_code_change_data):
         """Test deserializing a code change event."""
-        processor = EventDeserializer()
-
-        result = await processor.process(sample_code_change_data, {})
+        result = run(event_deserializer.process(sample_code_change_data, {}))
 
         assert isinstance(result, CodeChangeEvent)
         assert result.event_type == "file_change"
         assert result.file_path == "/path/to/file.py"
         assert result.change_type == "modified"
 
-    @pytest.mark.asyncio
-    async def test_deserialize_unsupported_event_type(self):
+    def test_deserialize_git_commit_event_from_json(self, run, event_deserializer, sample_git_commit_event):
+        """Test deserializing a git commit event enqueued as JSON."""
+        result = run(event_deserializer.process(sample_git_commit_event.model_dump_json(), {}))
+
+        assert isinstance(result, GitCommitEvent)
+        assert result == sample_git_commit_event
+
+    def test_deserialize_unsupported_event_type_from_json(self, run, event_deserializer):
+        """Test that JSON with an unsupported event type raises ValueError."""
+        with pytest.raises(ValueError):
+            run(event_deserializer.process('{"event_type": "unsupported_type"}', {}))
+
+    def test_deserialize_unsupported_event_type(self, run, event_deserializer):
         """Test that unsupported event types raise ValueError."""
-        processor = EventDeserializer()
         data = {"event_type": "unsupported_type"}
 
-        with pytest.raises(ValueError, match="Unsupported event type: unsupported_type"):
-            await processor.process(data, {})
+        with pytest.raises(ValueError, match=_UNSUPPORTED_EVENT_TYPE_RE):
+            run(event_deserializer.process(data, {}))
 
-    @pytest.mark.asyncio
-    async def test_deserialize_missing_event_type(self):
+    def test_deserialize_missing_event_type(self, run, event_deserializer):
         """Test that missing event type raises ValueError."""
-        processor = EventDeserializer()
         data = {"some_field": "value"}
 
-        with pytest.raises(ValueError, match="Unsupported event type: None"):
-            await processor.process(data, {})
+        with pytest.raises(ValueError, match=_MISSING_EVENT_TYPE_RE):
+            run(event_deserializer.process(data, {}))
+
+    def test_deserialized_event_is_immutable(self, run, event_deserializer, sample_git_commit_data):
+        """Test that events cannot be modified once deserialized."""
+        result = run(event_deserializer.process(sample_git_commit_data, {}))
+
+        with pytest.raises(ValidationError):
+            result.message = "changed"
 
 
 # ============================================================================
@@ -209,6 +281,24 @@ class TestInsightGenerator:
             commit_diff="diff --git a/file.py b/file.py\n+new line"
         )
 
+    @pytest.mark.asyncio
+    async def test_generate_insight_truncates_long_commit_message(self, mock_llm_service, sample_git_commit_event):
+        """Test that only the head of a long commit message is embedded."""
+        long_message = "x" * (MAX_EMBEDDED_MESSAGE_CHARS + 500)
+        event = sample_git_commit_event.model_copy(update={"message": long_message})
+        processor = InsightGenerator(llm_service=mock_llm_service)
+
+        result = await processor.process(event, {})
+
+        assert result.content_for_embedding == (
+            "Commit by Test Author to test-repo/main. Summary: Test commit summary. Message: "
+            + "x" * MAX_EMBEDDED_MESSAGE_CHARS
+        )
+        mock_llm_service.generate_commit_summary.assert_called_once_with(
+            commit_message=long_message,
+            commit_diff="diff --git a/file.py b/file.py\n+new line"
+        )
+
     @pytest.mark.asyncio
     async def test_generate_insight_from_code_change(self, mock_llm_service, sample_code_change_event):
         """Test generating insight from a code change event."""
@@ -229,22 +319,50 @@ class TestInsightGenerator:
         )
 
     @pytest.mark.asyncio
-    async def test_generate_insight_service_error(self, mock_llm_service, sample_git_commit_event):
-        """Test that ServiceError from LLM is wrapped in ProcessorError."""
-        mock_llm_service.generate_commit_summary.side_effect = ServiceError("LLM failed")
+    async def test_generate_insight_runs_summaries_concurrently(self, mock_llm_service, sample_git_commit_event):
+        """Test that blocking LLM calls run off the event loop so events overlap."""
+        # Each call waits for the other one at the barrier, so both only return
+        # if they run at the same time; serialized calls break it after the timeout.
+        both_running = threading.Barrier(2, timeout=5)
+
+        def blocking_summary(**kwargs):
+            both_running.wait()
+            return "Test commit summary"
+
+        mock_llm_service.generate_commit_summary.side_effect = blocking_summary
         processor = InsightGenerator(llm_service=mock_llm_service)
 
-        with pytest.raises(ProcessorError, match="InsightGenerator failed due to service error"):
-            await processor.process(sample_git_commit_event, {})
+        other_event = sample_git_commit_event.model_copy(update={"message": "Another commit"})
+
+        results = await asyncio.gather(
+            processor.process(sample_git_commit_event, {}),
+            processor.process(other_event, {}),
+        )
+
+        assert all(result.summary == "Test commit summary" for result in results)
+        assert mock_llm_service.generate_commit_summary.call_count == 2
 
     @pytest.mark.asyncio
-    async def test_generate_insight_unexpected_error(self, mock_llm_service, sample_git_commit_event):
-        """Test that unexpected errors are wrapped in ProcessorError."""
-        mock_llm_service.generate_commit_summary.side_effect = Exception("Unexpected error")
+    async def test_generate_insight_coalesces_identical_summaries(self, mock_llm_service, sample_git_commit_event):
+        """Test that concurrent identical commits share a single LLM call."""
+        def slow_summary(**kwargs):
+            time.sleep(0.05)
+            return "Test commit summary"
+
+        mock_llm_service.generate_commit_summary.side_effect = slow_summary
         processor = InsightGenerator(llm_service=mock_llm_service)
 
-        with pytest.raises(ProcessorError, match="InsightGenerator failed due to unexpected error"):
-            await processor.process(sample_git_commit_event, {})
+        results = await asyncio.gather(*(
+            processor.process(sample_git_commit_event, {}) for _ in range(3)
+        ))
+
+        assert mock_llm_service.generate_commit_summary.call_count == 1
+        assert all(result.summary == "Test commit summary" for result in results)
+        assert len({result.insight_id for result in results}) == 3
+
+        # Once finished, the same inputs are summarized afresh
+        await processor.process(sample_git_commit_event, {})
+        assert mock_llm_service.generate_commit_summary.call_count == 2
 
     @pytest.mark.asyncio
     async def test_generate_insight_id_uniqueness(self, mock_llm_service, sample_git_commit_event):
@@ -277,22 +395,52 @@ class TestKnowledgeGraphWriter:
         mock_kg_service.process_insight.assert_called_once_with(sample_insight)
 
     @pytest.mark.asyncio
-    async def test_write_insight_service_error(self, mock_kg_service, sample_insight):
-        """Test that ServiceError is wrapped in ProcessorError."""
-        mock_kg_service.process_insight.side_effect = ServiceError("KG write failed")
+    async def test_concurrent_writes_leave_all_index_links_written(self, sample_insight, sample_git_commit_event, tmp_path):
+        """Test that index links held back during a burst are written once the burst drains."""
+        from cortex.pipelines import comprehension
+        kg_service = KnowledgeGraphService(base_path=str(tmp_path))
+        processor = KnowledgeGraphWriter(kg_service=kg_service)
+        insights = [
+            sample_insight.model_copy(update={
+                "source_event": sample_git_commit_event.model_copy(update={"commit_hash": f"{i:012d}"})
+            })
+            for i in range(5)
+        ]
+
+        await asyncio.gather(*(processor.process(insight, {}) for insight in insights))
+
+        index = (tmp_path / "repositories" / "test-repo.md").read_text()
+        assert index.count("- [[../insights/git.commit.") == 5
+        assert comprehension._queued_kg_writes == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_index_flush_does_not_fail_the_draining_write(self, mock_kg_service, sample_insight):
+        """Test that held-back links failing to flush are logged instead of failing this insight."""
+        from cortex.pipelines import comprehension
         processor = KnowledgeGraphWriter(kg_service=mock_kg_service)
 
-        with pytest.raises(ProcessorError, match="KnowledgeGraphWriter failed due to service error"):
-            await processor.process(sample_insight, {})
+        with patch.object(comprehension, "flush_index_appends", side_effect=ServiceError("disk full")) as mock_flush:
+            result = await processor.process(sample_insight, {})
+
+        assert result is None
+        mock_flush.assert_called_once()
+        assert comprehension._queued_kg_writes == 0
 
     @pytest.mark.asyncio
-    async def test_write_insight_unexpected_error(self, mock_kg_service, sample_insight):
-        """Test that unexpected errors are wrapped in ProcessorError."""
-        mock_kg_service.process_insight.side_effect = Exception("Unexpected error")
+    async def test_failed_submission_is_taken_off_the_queued_count(self, mock_kg_service, sample_insight):
+        """Test that a write the executor rejects does not keep index links deferred."""
+        from concurrent.futures import ThreadPoolExecutor
+        from cortex.pipelines import comprehension
+        stopped_executor = ThreadPoolExecutor(max_workers=1)
+        stopped_executor.shutdown()
         processor = KnowledgeGraphWriter(kg_service=mock_kg_service)
 
-        with pytest.raises(ProcessorError, match="KnowledgeGraphWriter failed due to unexpected error"):
-            await processor.process(sample_insight, {})
+        with patch.object(comprehension, "_KG_WRITE_EXECUTOR", stopped_executor):
+            with pytest.raises(ProcessorError, match="unexpected error"):
+                await processor.process(sample_insight, {})
+
+        assert comprehension._queued_kg_writes == 0
+        mock_kg_service.process_insight.assert_not_called()
 
 
 # ============================================================================
@@ -310,33 +458,73 @@ class TestChromaWriter:
         result = await processor.process(sample_insight, {})
 
         assert result is None
-        mock_chroma_service.add_document.assert_called_once_with(
-            doc_id="test_insight_123",
-            content="Test content for embedding",
-            metadata={
+        mock_chroma_service.add_documents.assert_called_once_with(
+            doc_ids=["test_insight_123"],
+            contents=["Test content for embedding"],
+            metadatas=[{
                 "repo_name": "test-repo",
                 "branch_name": "main",
                 "commit_hash": "abc123def456"
-            }
+            }]
         )
 
     @pytest.mark.asyncio
-    async def test_write_insight_service_error(self, mock_chroma_service, sample_insight):
-        """Test that ServiceError is wrapped in ProcessorError."""
-        mock_chroma_service.add_document.side_effect = ServiceError("Chroma write failed")
+    async def test_concurrent_writes_are_batched(self, mock_chroma_service, sample_insight):
+        """Test that concurrent insights are written with a single add_documents call."""
         processor = ChromaWriter(chroma_service=mock_chroma_service)
+        insights = [
+            sample_insight.model_copy(update={"insight_id": f"insight_{i}"})
+            for i in range(3)
+        ]
 
-        with pytest.raises(ProcessorError, match="ChromaWriter failed due to service error"):
-            await processor.process(sample_insight, {})
+        await asyncio.gather(*(processor.process(insight, {}) for insight in insights))
+
+        mock_chroma_service.add_documents.assert_called_once()
+        assert mock_chroma_service.add_documents.call_args.kwargs["doc_ids"] == [
+            "insight_0", "insight_1", "insight_2"
+        ]
 
     @pytest.mark.asyncio
-    async def test_write_insight_unexpected_error(self, mock_chroma_service, sample_insight):
-        """Test that unexpected errors are wrapped in ProcessorError."""
-        mock_chroma_service.add_document.side_effect = Exception("Unexpected error")
-        processor = ChromaWriter(chroma_service=mock_chroma_service)
+    async def test_batcher_does_not_keep_service_alive(self, sample_insight):
+        """Test that a discarded ChromaService is released along with its batcher."""
+        import gc
+        from cortex.pipelines.comprehension import _chroma_batchers
 
-        with pytest.raises(ProcessorError, match="ChromaWriter failed due to unexpected error"):
-            await processor.process(sample_insight, {})
+        batchers_before = len(_chroma_batchers)
+        service = StubChromaService()
+        await ChromaWriter(chroma_service=service).process(sample_insight, {})
+        assert service in _chroma_batchers
+
+        del service
+        gc.collect()
+
+        assert len(_chroma_batchers) == batchers_before
+
+
+# ============================================================================
+# Error wrapping Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error, reason", [
+    (ServiceError("Service failed"), "service error"),
+    (Exception("Unexpected error"), "unexpected error"),
+], ids=["service_error", "unexpected_error"])
+@pytest.mark.parametrize("processor_cls, service_fixture, method, data_fixture", [
+    (InsightGenerator, "mock_llm_service", "generate_commit_summary", "sample_git_commit_event"),
+    (KnowledgeGraphWriter, "mock_kg_service", "process_insight", "sample_insight"),
+    (ChromaWriter, "mock_chroma_service", "add_documents", "sample_insight"),
+], ids=["InsightGenerator", "KnowledgeGraphWriter", "ChromaWriter"])
+async def test_service_failures_are_wrapped_in_processor_error(
+    request, processor_cls, service_fixture, method, data_fixture, error, reason
+):
+    """Test that ServiceError and unexpected errors from a service are wrapped in ProcessorError."""
+    service = request.getfixturevalue(service_fixture)
+    getattr(service, method).side_effect = error
+    processor = processor_cls(service)
+
+    with pytest.raises(ProcessorError, match=_WRAPPED_ERROR_RES[processor_cls.__name__, reason]):
+        await processor.process(request.getfixturevalue(data_fixture), {})
 
 
 # ============================================================================
@@ -361,51 +549,26 @@ class TestSynthesisTrigger:
         )
 
     @pytest.mark.asyncio
-    async def test_trigger_synthesis_no_redis(self, sample_insight):
-        """Test that missing Redis pool raises an error."""
+    @pytest.mark.parametrize("has_redis, enqueue_error, message", [
+        (False, None, "Redis pool not found"),
+        (True, redis.exceptions.ConnectionError("Redis connection failed"), "service error: Redis connection failed"),
+        (True, Exception("Enqueue failed"), "unexpected error: Enqueue failed"),
+    ], ids=["no_redis", "redis_error", "unexpected_error"])
+    async def test_trigger_synthesis_failure_modes(self, mock_redis, sample_insight, has_redis, enqueue_error, message):
+        """Test that a missing Redis pool or a failing enqueue raises ProcessorError."""
+        mock_redis.enqueue_job.side_effect = enqueue_error
         processor = SynthesisTrigger()
-        context = {}
+        context = {"redis": mock_redis} if has_redis else {}
 
-        # The processor raises ProcessorError when redis is missing,
-        # but the except clause tries to access redis.exceptions which fails
-        # So we expect an AttributeError in this case
-        with pytest.raises((ProcessorError, AttributeError)):
-            await processor.process(sample_insight, context)
-
-    @pytest.mark.asyncio
-    async def test_trigger_synthesis_redis_error(self, mock_redis, sample_insight):
-        """Test that general exceptions cause an error.
-
-        Note: The current implementation has a bug where it tries to catch
-        redis.exceptions.RedisError but 'redis' is a local variable (AsyncMock),
-        causing a TypeError. This test documents the current (buggy) behavior.
-        """
-        mock_redis.enqueue_job.side_effect = Exception("Redis connection failed")
-        processor = SynthesisTrigger()
-        context = {"redis": mock_redis}
-
-        # Due to the bug in exception handling, we get TypeError
-        # because redis.exceptions doesn't exist on the AsyncMock
-        with pytest.raises((ProcessorError, UnboundLocalError, TypeError)):
+        with pytest.raises(ProcessorError, match=message):
             await processor.process(sample_insight, context)
 
     @pytest.mark.asyncio
     async def test_trigger_synthesis_none_data(self, mock_redis):
-        """Test handling of None data.
-
-        Note: The current implementation has issues with None data due to
-        the exception handling trying to access redis.exceptions when redis
-        may be None or the local variable shadows the import.
-        """
+        """Test that None data is skipped without enqueueing a task."""
         processor = SynthesisTrigger()
-        context = {"redis": mock_redis}
 
-        # With None data, the `if data:` check prevents enqueue_job from being called
-        # But due to exception handling bugs, various errors can occur
-        try:
-            result = await processor.process(None, context)
-            # If we get here, verify enqueue wasn't called
-            mock_redis.enqueue_job.assert_not_called()
-        except (ProcessorError, TypeError, AttributeError, UnboundLocalError):
-            # Various errors can occur due to exception handling issues
-            pass
+        result = await processor.process(None, {"redis": mock_redis})
+
+        assert result is None
+        mock_redis.enqueue_job.assert_not_called()
@@ -5,6 +5,7 @@ Tests: UpstashWriter, CurationProcessor, create_curation_agent
 import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
 import uuid
+from google.adk.agents import LlmAgent
 
 from cortex.pipelines.curation import (
     UpstashWriter,
@@ -25,6 +26,7 @@ def mock_upstash_service():
     """Fixture for a mocked UpstashService."""
     service = MagicMock(spec=UpstashService)
     service.add_document = AsyncMock()
+    service.add_documents = AsyncMock()
     return service
 
 
@@ -59,10 +61,10 @@ class TestUpstashWriter:
         mock_upstash_service.add_document.assert_called_once()
 
         # Verify the call arguments
-        call_args = mock_upstash_service.add_document.call_args
-        assert call_args.kwargs["content"] == data
-        assert call_args.kwargs["metadata"] == {"source": "web_search_curation"}
-        assert "doc_id" in call_args.kwargs
+        call_kwargs = mock_upstash_service.add_document.call_args.kwargs
+        assert call_kwargs["content"] == data
+        assert call_kwargs["metadata"] == {"source": "web_search_curation"}
+        assert call_kwargs["doc_id"]
 
     @pytest.mark.asyncio
     async def test_write_sets_has_written_flag(self, mock_upstash_service):
@@ -118,6 +120,23 @@ class TestUpstashWriter:
 
         assert call1_doc_id != call2_doc_id
 
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_share_one_upsert(self, mocker):
+        """Test that concurrent writers are batched by the service into a single upsert."""
+        import asyncio
+        mock_index = MagicMock()
+        mock_index.upsert = AsyncMock()
+        mocker.patch('cortex.services.upstash_service.AsyncIndex', return_value=mock_index)
+        upstash_service = UpstashService()
+        writers = [UpstashWriter(upstash_service) for _ in range(3)]
+
+        results = await asyncio.gather(*(writer.write(f"Data {i}") for i, writer in enumerate(writers)))
+
+        assert results == ["Successfully wrote data to Upstash."] * 3
+        mock_index.upsert.assert_awaited_once()
+        contents = [vector.data for vector in mock_index.upsert.call_args.kwargs["vectors"]]
+        assert contents == ["Data 0", "Data 1", "Data 2"]
+
 
 # ============================================================================
 # CurationProcessor Tests
@@ -171,6 +190,59 @@ class TestCurationProcessor:
         # Verify create_curation_agent was called twice (once per request)
         assert mock_create_agent.call_count == 2
 
+    @pytest.mark.asyncio
+    async def test_process_reuses_prompt_manager(self, mock_upstash_service, mock_llm_service, mocker):
+        """Test that agents created per request share the processor's PromptManager."""
+        mock_create_agent = mocker.patch(
+            'cortex.pipelines.curation.create_curation_agent',
+            return_value=MagicMock()
+        )
+        mocker.patch(
+            'cortex.pipelines.curation.run_standalone_agent',
+            new_callable=AsyncMock,
+            return_value="Result"
+        )
+
+        processor = CurationProcessor(mock_upstash_service, mock_llm_service)
+        await processor.process({"query_text": "Query 1"}, {})
+        await processor.process({"query_text": "Query 2"}, {})
+
+        prompt_managers = {call.args[2] for call in mock_create_agent.call_args_list}
+        assert prompt_managers == {processor.prompt_manager}
+
+    @pytest.mark.asyncio
+    async def test_process_bounds_concurrent_runs(self, mock_upstash_service, mock_llm_service, mocker):
+        """Test that no more than curation_max_concurrency runs execute at once."""
+        import asyncio
+        from cortex.pipelines import curation
+
+        mocker.patch('cortex.pipelines.curation.create_curation_agent', return_value=MagicMock())
+        mocker.patch.object(curation, '_curation_slots', curation.WeakKeyDictionary())
+        mock_settings = MagicMock()
+        mock_settings.curation_max_concurrency = 2
+        mocker.patch('cortex.pipelines.curation.get_settings', return_value=mock_settings)
+
+        running = 0
+        peak = 0
+
+        async def fake_run(agent, query, target_agent_name):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return query
+
+        mocker.patch('cortex.pipelines.curation.run_standalone_agent', side_effect=fake_run)
+
+        processor = CurationProcessor(mock_upstash_service, mock_llm_service)
+        results = await asyncio.gather(*(
+            processor.process({"query_text": f"Query {i}"}, {}) for i in range(6)
+        ))
+
+        assert peak == 2
+        assert [r["augmented_knowledge"] for r in results] == [f"Query {i}" for i in range(6)]
+
     @pytest.mark.asyncio
     async def test_process_passes_correct_target_agent(self, mock_upstash_service, mock_llm_service, mocker):
         """Test that the correct target agent name is passed."""
@@ -199,37 +271,30 @@ class TestCurationProcessor:
 class TestCreateCurationAgent:
     """Tests for create_curation_agent factory function."""
 
-    def test_creates_sequential_agent(self, mock_upstash_service, mock_llm_service, mocker):
-        """Test that create_curation_agent returns a SequentialAgent."""
-        from google.adk.agents import LlmAgent
-
-        # Mock the google search agent with an actual LlmAgent mock
-        mock_web_searcher = LlmAgent(
-            name="mock_web_searcher",
-            instruction="Mock web searcher",
-            model="gemini-flash-test"
+    @pytest.fixture(autouse=True, scope="class")
+    def _patch_agent_dependencies(self, class_mocker):
+        """Patches the web search agent and prompt manager once for the whole class."""
+        # An agent can only belong to one parent, so every call gets a new one.
+        class_mocker.patch(
+            'cortex.pipelines.curation.create_google_search_agent',
+            side_effect=lambda **kwargs: LlmAgent(
+                name="mock_web_searcher",
+                instruction="Mock web searcher",
+                model="gemini-flash-test"
+            ),
         )
-        mocker.patch('cortex.pipelines.curation.create_google_search_agent', return_value=mock_web_searcher)
-        mocker.patch('cortex.pipelines.curation.PromptManager')
+        class_mocker.patch('cortex.pipelines.curation.get_prompt_manager')
 
+    def test_creates_sequential_agent(self, mock_upstash_service, mock_llm_service):
+        """Test that create_curation_agent returns a SequentialAgent."""
         agent = create_curation_agent(mock_upstash_service, mock_llm_service)
 
         assert agent.name == "curation_agent"
         # The agent should have 3 sub-agents: web_searcher, parallel_analyzer, chief_editor
         assert len(agent.sub_agents) == 3
 
-    def test_creates_parallel_analyzer(self, mock_upstash_service, mock_llm_service, mocker):
+    def test_creates_parallel_analyzer(self, mock_upstash_service, mock_llm_service):
         """Test that the parallel analyzer contains security and best practices analysts."""
-        from google.adk.agents import LlmAgent
-
-        mock_web_searcher = LlmAgent(
-            name="mock_web_searcher",
-            instruction="Mock web searcher",
-            model="gemini-flash-test"
-        )
-        mocker.patch('cortex.pipelines.curation.create_google_search_agent', return_value=mock_web_searcher)
-        mocker.patch('cortex.pipelines.curation.PromptManager')
-
         agent = create_curation_agent(mock_upstash_service, mock_llm_service)
 
         # The second sub-agent should be the parallel_analyzer
@@ -241,18 +306,8 @@ class TestCreateCurationAgent:
         assert "security_analyst" in analyst_names
         assert "best_practices_analyst" in analyst_names
 
-    def test_chief_editor_has_upstash_tool(self, mock_upstash_service, mock_llm_service, mocker):
+    def test_chief_editor_has_upstash_tool(self, mock_upstash_service, mock_llm_service):
         """Test that the chief editor has the UpstashWriter tool."""
-        from google.adk.agents import LlmAgent
-
-        mock_web_searcher = LlmAgent(
-            name="mock_web_searcher",
-            instruction="Mock web searcher",
-            model="gemini-flash-test"
-        )
-        mocker.patch('cortex.pipelines.curation.create_google_search_agent', return_value=mock_web_searcher)
-        mocker.patch('cortex.pipelines.curation.PromptManager')
-
         agent = create_curation_agent(mock_upstash_service, mock_llm_service)
 
         # The third sub-agent should be the chief_editor
@@ -262,18 +317,8 @@ class TestCreateCurationAgent:
         # Chief editor should have tools
         assert len(chief_editor.tools) > 0
 
-    def test_uses_correct_models(self, mock_upstash_service, mock_llm_service, mocker):
+    def test_uses_correct_models(self, mock_upstash_service, mock_llm_service):
         """Test that the agents use the correct LLM models from settings."""
-        from google.adk.agents import LlmAgent
-
-        mock_web_searcher = LlmAgent(
-            name="mock_web_searcher",
-            instruction="Mock web searcher",
-            model="gemini-flash-test"
-        )
-        mocker.patch('cortex.pipelines.curation.create_google_search_agent', return_value=mock_web_searcher)
-        mocker.patch('cortex.pipelines.curation.PromptManager')
-
         agent = create_curation_agent(mock_upstash_service, mock_llm_service)
 
         # Check that the chief_editor uses the pro model
@@ -284,3 +329,39 @@ class TestCreateCurationAgent:
         parallel_analyzer = agent.sub_agents[1]
         for analyst in parallel_analyzer.sub_agents:
             assert analyst.model == "gemini-flash-test"
+
+    @pytest.mark.asyncio
+    async def test_chief_editor_callback_collects_latest_analyst_outputs(self, mock_upstash_service, mock_llm_service):
+        """Test that the chief editor prompt uses each analyst's latest final response."""
+        prompt_manager = MagicMock()
+        prompt_manager.render.return_value = "rendered prompt"
+
+        agent = create_curation_agent(mock_upstash_service, mock_llm_service, prompt_manager)
+        callback = agent.sub_agents[2].before_model_callback
+
+        def make_event(author, *texts, final=True):
+            event = MagicMock()
+            event.author = author
+            event.is_final_response.return_value = final
+            event.content.parts = [MagicMock(text=text) for text in texts]
+            return event
+
+        callback_context = MagicMock()
+        callback_context.session.events = [
+            make_event("mock_web_searcher", "old search"),
+            make_event("mock_web_searcher", "search ", "results"),
+            make_event("security_analyst", "partial", final=False),
+            make_event("security_analyst", "security"),
+            make_event("user", "ignored"),
+        ]
+        llm_request = MagicMock()
+
+        await callback(callback_context, llm_request)
+
+        prompt_manager.render.assert_called_once_with(
+            "chief_editor.jinja2",
+            web_search_results="search results",
+            security_analysis="security",
+            best_practices_analysis=""
+        )
+        assert llm_request.contents[0].parts[0].text == "rendered prompt"
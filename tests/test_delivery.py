@@ -7,7 +7,7 @@ from unittest.mock import MagicMock, AsyncMock, patch
 import base64
 import json
 
-from cortex.pipelines.delivery import AudioDeliveryProcessor
+from cortex.pipelines.delivery import AudioDeliveryProcessor, encode_insight_message, split_for_tts
 from cortex.exceptions import ProcessorError
 
 
@@ -15,33 +15,27 @@ from cortex.exceptions import ProcessorError
 # Fixtures
 # ============================================================================
 
-@pytest.fixture
-def mock_redis():
-    """Fixture for a mocked Redis client."""
-    redis = AsyncMock()
-    redis.publish = AsyncMock()
-    return redis
+# TextToSpeechClient and get_settings are patched once for the whole module;
+# mock_tts_client clears whatever a test configured on the client afterwards.
+@pytest.fixture(scope="module", autouse=True)
+def _patch_delivery_dependencies(module_mocker):
+    """Patches the TTS client class and settings used by AudioDeliveryProcessor."""
+    MockTTS = module_mocker.patch('cortex.pipelines.delivery.texttospeech.TextToSpeechClient')
+    MockSettings = module_mocker.patch('cortex.pipelines.delivery.get_settings')
+    MockSettings.return_value.tts_voice_name = "en-US-Wavenet-D"
+    return MockTTS.return_value
 
 
 @pytest.fixture
-def mock_tts_client():
+def mock_tts_client(_patch_delivery_dependencies):
     """Fixture for a mocked Google Cloud Text-to-Speech client."""
-    with patch('cortex.pipelines.delivery.texttospeech.TextToSpeechClient') as MockTTS:
-        instance = MockTTS.return_value
-        yield instance
+    instance = _patch_delivery_dependencies
+    yield instance
+    instance.reset_mock(return_value=True, side_effect=True)
 
 
 @pytest.fixture
-def mock_settings():
-    """Fixture for mocked Settings."""
-    with patch('cortex.pipelines.delivery.Settings') as MockSettings:
-        instance = MockSettings.return_value
-        instance.tts_voice_name = "en-US-Wavenet-D"
-        yield instance
-
-
-@pytest.fixture
-def processor(mock_redis, mock_tts_client, mock_settings):
+def processor(mock_redis, mock_tts_client):
     """Fixture for AudioDeliveryProcessor with mocked dependencies."""
     return AudioDeliveryProcessor(redis=mock_redis)
 
@@ -225,6 +219,44 @@ class TestAudioDeliveryProcessor:
         assert "text" in parsed
         assert "audio" in parsed
 
+    @pytest.mark.asyncio
+    async def test_long_insight_synthesized_in_chunks(self, processor, mock_redis, mock_tts_client):
+        """Test that long insights are synthesized per chunk and published as one clip."""
+        mock_tts_client.synthesize_speech.side_effect = lambda input, voice, audio_config: MagicMock(
+            audio_content=input.text[:1].encode()
+        )
+        final_insight = " ".join(f"{letter * 600}." for letter in "abc")
+
+        await processor.process({"final_insight": final_insight}, {})
+
+        assert mock_tts_client.synthesize_speech.call_count == 3
+        mock_redis.publish.assert_called_once()
+        message = json.loads(mock_redis.publish.call_args[0][1])
+        assert message["text"] == final_insight
+        assert base64.b64decode(message["audio"]) == b"abc"
+
+    def test_split_for_tts_keeps_sentences_whole(self):
+        """Test that chunks are sentence aligned and cover the whole text."""
+        text = "One two. Three four! Five six? Seven."
+
+        chunks = split_for_tts(text, max_chars=20)
+
+        assert chunks == ["One two. Three four!", "Five six? Seven."]
+        assert split_for_tts("Short text.") == ["Short text."]
+
+    def test_encode_insight_message_escapes_text(self):
+        """Test that the spliced message stays valid JSON for arbitrary text."""
+        text = 'Quote " backslash \\ newline \n unicode \u00e9'
+        audio = bytes(range(256))
+
+        parsed = json.loads(encode_insight_message(text, audio))
+
+        assert parsed == {
+            "type": "insight",
+            "text": text,
+            "audio": base64.b64encode(audio).decode("ascii"),
+        }
+
     @pytest.mark.asyncio
     async def test_uses_mp3_encoding(self, processor, mock_tts_client):
         """Test that MP3 encoding is requested from TTS."""
@@ -35,8 +35,13 @@ async def real_redis_pool():
     try:
         from arq import create_pool
         from arq.connections import RedisSettings
+        from cortex.core.redis import job_serializer, job_deserializer
 
-        pool = await create_pool(RedisSettings(host='localhost', port=6379))
+        pool = await create_pool(
+            RedisSettings(host='localhost', port=6379),
+            job_serializer=job_serializer,
+            job_deserializer=job_deserializer,
+        )
         yield pool
         await pool.close()
     except Exception as e:
@@ -248,7 +253,7 @@ class TestRealPipelineIntegration:
         mock_kg.process_insight = MagicMock()
 
         mock_chroma = MagicMock()
-        mock_chroma.add_document = MagicMock()
+        mock_chroma.add_documents = MagicMock()
 
         # Build pipeline with real Redis
         pipeline = Pipeline([
@@ -282,7 +287,7 @@ class TestRealPipelineIntegration:
         # Verify services were called
         mock_llm.generate_commit_summary.assert_called_once()
         mock_kg.process_insight.assert_called_once()
-        mock_chroma.add_document.assert_called_once()
+        mock_chroma.add_documents.assert_called_once()
 
         # The synthesis job should have been enqueued to real Redis
         # (We can't easily verify this without checking Redis directly,
@@ -309,7 +314,7 @@ class TestRealPipelineIntegration:
                     audio_content=b"real_redis_test_audio"
                 )
 
-                with patch('cortex.pipelines.delivery.Settings') as MockSettings:
+                with patch('cortex.pipelines.delivery.get_settings') as MockSettings:
                     MockSettings.return_value.tts_voice_name = "en-US-Wavenet-D"
 
                     from cortex.pipelines.delivery import AudioDeliveryProcessor
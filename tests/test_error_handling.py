@@ -74,7 +74,7 @@ def mock_insight():
     )
 
 @patch("pathlib.Path.mkdir")
-@patch("builtins.open")
+@patch("os.open")
 def test_knowledge_graph_service_create_insight_node_failure(mock_open, mock_mkdir, mock_insight):
     kg_service = KnowledgeGraphService(base_path="/fake/path")
     mock_open.side_effect = IOError("File system is full")
@@ -83,7 +83,7 @@ def test_knowledge_graph_service_create_insight_node_failure(mock_open, mock_mkd
         kg_service._create_insight_node(mock_insight)
 
 @patch("pathlib.Path.mkdir")
-@patch("builtins.open")
+@patch("os.open")
 def test_knowledge_graph_service_update_index_node_failure(mock_open, mock_mkdir):
     kg_service = KnowledgeGraphService(base_path="/fake/path")
     mock_open.side_effect = IOError("Permission denied")
@@ -94,7 +94,7 @@ def test_knowledge_graph_service_update_index_node_failure(mock_open, mock_mkdir
             link_to_add=kg_service.base_path / "insights" / "link.md"
         )
 
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_ollama_embedding_helper_get_embedding_failure(mock_post):
     mock_post.side_effect = requests.exceptions.RequestException("Network error")
     
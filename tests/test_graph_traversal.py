@@ -104,6 +104,22 @@ class TestGraphTraversalProcessor:
         assert result["private_results"] == {"some": "data"}
         assert "traversed_knowledge" in result
 
+    @pytest.mark.asyncio
+    async def test_process_multiple_entry_points_share_visited(self, processor, temp_knowledge_graph):
+        """Test that entry points sharing a node contribute it only once."""
+        (temp_knowledge_graph / "a.md").write_text("A [[shared.md]]")
+        (temp_knowledge_graph / "b.md").write_text("B [[shared.md]]")
+        (temp_knowledge_graph / "shared.md").write_text("Shared")
+
+        data = {"entry_points": [
+            str(temp_knowledge_graph / "a.md"),
+            str(temp_knowledge_graph / "b.md"),
+        ]}
+
+        result = await processor.process(data, {})
+
+        assert result["traversed_knowledge"] == "A [[shared.md]]\nShared\nB [[shared.md]]"
+
     def test_traverse_method_exists(self, processor):
         """Test that _traverse method exists."""
         assert hasattr(processor, '_traverse')
@@ -138,27 +154,30 @@ class TestGraphTraversalProcessor:
 class TestTraverseMethod:
     """Tests for the _traverse method directly."""
 
-    def test_traverse_file_not_found(self, processor, temp_knowledge_graph):
+    @pytest.mark.asyncio
+    async def test_traverse_file_not_found(self, processor, temp_knowledge_graph):
         """Test _traverse with non-existent file."""
         visited = set()
         context = {}
 
-        result = processor._traverse("nonexistent.md", visited, context)
+        result = "\n".join(await processor._traverse("nonexistent.md", visited, context))
 
         assert result == ""
         assert "broken_links" in context
         assert len(context["broken_links"]) == 1
 
-    def test_traverse_prevents_revisits(self, processor, temp_knowledge_graph):
+    @pytest.mark.asyncio
+    async def test_traverse_prevents_revisits(self, processor, temp_knowledge_graph):
         """Test that visited files are not traversed again."""
         visited = {"already_visited.md"}
         context = {}
 
-        result = processor._traverse("already_visited.md", visited, context)
+        result = "\n".join(await processor._traverse("already_visited.md", visited, context))
 
         assert result == ""
 
-    def test_traverse_simple_file(self, processor, temp_knowledge_graph):
+    @pytest.mark.asyncio
+    async def test_traverse_simple_file(self, processor, temp_knowledge_graph):
         """Test traversing a simple file without links."""
         # Create a simple file
         simple_file = temp_knowledge_graph / "simple.md"
@@ -167,12 +186,13 @@ class TestTraverseMethod:
         visited = set()
         context = {}
 
-        result = processor._traverse("simple.md", visited, context)
+        result = "\n".join(await processor._traverse("simple.md", visited, context))
 
         assert "Simple content" in result
         assert "simple.md" in visited
 
-    def test_traverse_file_with_front_matter(self, processor, temp_knowledge_graph):
+    @pytest.mark.asyncio
+    async def test_traverse_file_with_front_matter(self, processor, temp_knowledge_graph):
         """Test traversing file with YAML front matter."""
         file_path = temp_knowledge_graph / "with_fm.md"
         create_markdown_file(
@@ -184,13 +204,28 @@ class TestTraverseMethod:
         visited = set()
         context = {}
 
-        result = processor._traverse("with_fm.md", visited, context)
+        result = "\n".join(await processor._traverse("with_fm.md", visited, context))
 
         assert "Body content here" in result
         # Front matter should be stripped, only body remains
         assert "with_fm.md" in visited
 
-    def test_traverse_file_with_wikilink(self, processor, temp_knowledge_graph):
+    @pytest.mark.asyncio
+    async def test_front_matter_is_not_parsed(self, processor, temp_knowledge_graph):
+        """Test that front matter which is not valid YAML still yields the body and its links."""
+        (temp_knowledge_graph / "odd_fm.md").write_text(
+            "---\nparent_nodes: - [[linked.md]]\n  bad: : indent\n---\nOdd body"
+        )
+        (temp_knowledge_graph / "linked.md").write_text("Linked content")
+
+        result = "\n".join(await processor._traverse("odd_fm.md", set(), {}))
+
+        assert "Odd body" in result
+        assert "bad: : indent" not in result
+        assert "Linked content" in result
+
+    @pytest.mark.asyncio
+    async def test_traverse_file_with_wikilink(self, processor, temp_knowledge_graph):
         """Test traversing file with wikilinks."""
         # Create main file with link
         main_file = temp_knowledge_graph / "main.md"
@@ -203,14 +238,15 @@ class TestTraverseMethod:
         visited = set()
         context = {}
 
-        result = processor._traverse("main.md", visited, context)
+        result = "\n".join(await processor._traverse("main.md", visited, context))
 
         assert "Main content" in result
         assert "Linked content" in result
         assert "main.md" in visited
         assert "linked.md" in visited
 
-    def test_traverse_circular_links(self, processor, temp_knowledge_graph):
+    @pytest.mark.asyncio
+    async def test_traverse_circular_links(self, processor, temp_knowledge_graph):
         """Test that circular links don't cause infinite loops."""
         # Create files that link to each other
         file_a = temp_knowledge_graph / "a.md"
@@ -223,7 +259,7 @@ class TestTraverseMethod:
         context = {}
 
         # Should complete without hanging
-        result = processor._traverse("a.md", visited, context)
+        result = "\n".join(await processor._traverse("a.md", visited, context))
 
         assert "Content A" in result
         assert "Content B" in result
@@ -231,7 +267,8 @@ class TestTraverseMethod:
         assert "a.md" in visited
         assert "b.md" in visited
 
-    def test_traverse_relative_links(self, processor, temp_knowledge_graph):
+    @pytest.mark.asyncio
+    async def test_traverse_relative_links(self, processor, temp_knowledge_graph):
         """Test traversing with relative path links."""
         # Create subdirectory structure
         subdir = temp_knowledge_graph / "sub"
@@ -246,12 +283,13 @@ class TestTraverseMethod:
         visited = set()
         context = {}
 
-        result = processor._traverse("main.md", visited, context)
+        result = "\n".join(await processor._traverse("main.md", visited, context))
 
         assert "Main content" in result
         assert "Sub content" in result
 
-    def test_traverse_broken_link(self, processor, temp_knowledge_graph):
+    @pytest.mark.asyncio
+    async def test_traverse_broken_link(self, processor, temp_knowledge_graph):
         """Test handling broken wikilinks."""
         main_file = temp_knowledge_graph / "main.md"
         main_file.write_text("Main content [[missing.md]]")
@@ -259,14 +297,44 @@ class TestTraverseMethod:
         visited = set()
         context = {}
 
-        result = processor._traverse("main.md", visited, context)
+        result = "\n".join(await processor._traverse("main.md", visited, context))
 
         assert "Main content" in result
         assert "broken_links" in context
         # The broken link path should be recorded
         assert any("missing.md" in link for link in context["broken_links"])
 
-    def test_traverse_multiple_links(self, processor, temp_knowledge_graph):
+    @pytest.mark.asyncio
+    async def test_traverse_rereads_modified_file(self, processor, temp_knowledge_graph):
+        """Test that cached nodes are reloaded once the file changes."""
+        main_file = temp_knowledge_graph / "main.md"
+        main_file.write_text("Old content")
+        assert await processor._traverse("main.md", set(), {}) == ["Old content"]
+
+        main_file.write_text("New content [[other.md]]")
+        (temp_knowledge_graph / "other.md").write_text("Other content")
+
+        result = "\n".join(await processor._traverse("main.md", set(), {}))
+        assert "New content" in result
+        assert "Other content" in result
+
+    @pytest.mark.asyncio
+    async def test_traverse_ignores_empty_wikilink(self, processor, temp_knowledge_graph):
+        """Test that an empty [[]] is not followed as a link."""
+        main_file = temp_knowledge_graph / "main.md"
+        main_file.write_text("Main content [[]]")
+
+        visited = set()
+        context = {}
+
+        result = "\n".join(await processor._traverse("main.md", visited, context))
+
+        assert result == "Main content [[]]"
+        assert visited == {"main.md"}
+        assert "broken_links" not in context
+
+    @pytest.mark.asyncio
+    async def test_traverse_multiple_links(self, processor, temp_knowledge_graph):
         """Test file with multiple wikilinks."""
         main_file = temp_knowledge_graph / "main.md"
         link1 = temp_knowledge_graph / "link1.md"
@@ -279,13 +347,14 @@ class TestTraverseMethod:
         visited = set()
         context = {}
 
-        result = processor._traverse("main.md", visited, context)
+        result = "\n".join(await processor._traverse("main.md", visited, context))
 
         assert "Main" in result
         assert "Link 1" in result
         assert "Link 2" in result
 
-    def test_traverse_deep_links(self, processor, temp_knowledge_graph):
+    @pytest.mark.asyncio
+    async def test_traverse_deep_links(self, processor, temp_knowledge_graph):
         """Test multi-hop traversal."""
         file_a = temp_knowledge_graph / "a.md"
         file_b = temp_knowledge_graph / "b.md"
@@ -298,13 +367,14 @@ class TestTraverseMethod:
         visited = set()
         context = {}
 
-        result = processor._traverse("a.md", visited, context)
+        result = "\n".join(await processor._traverse("a.md", visited, context))
 
         assert "A" in result
         assert "B" in result
         assert "C" in result
 
-    def test_traverse_empty_file(self, processor, temp_knowledge_graph):
+    @pytest.mark.asyncio
+    async def test_traverse_empty_file(self, processor, temp_knowledge_graph):
         """Test traversing empty file."""
         empty_file = temp_knowledge_graph / "empty.md"
         empty_file.write_text("")
@@ -312,12 +382,13 @@ class TestTraverseMethod:
         visited = set()
         context = {}
 
-        result = processor._traverse("empty.md", visited, context)
+        result = "\n".join(await processor._traverse("empty.md", visited, context))
 
         # Should handle gracefully
         assert result == "" or result.strip() == ""
 
-    def test_traverse_no_front_matter_delimiters(self, processor, temp_knowledge_graph):
+    @pytest.mark.asyncio
+    async def test_traverse_no_front_matter_delimiters(self, processor, temp_knowledge_graph):
         """Test file without front matter delimiters."""
         file_path = temp_knowledge_graph / "plain.md"
         file_path.write_text("Just plain markdown content")
@@ -325,6 +396,22 @@ class TestTraverseMethod:
         visited = set()
         context = {}
 
-        result = processor._traverse("plain.md", visited, context)
+        result = "\n".join(await processor._traverse("plain.md", visited, context))
 
         assert "Just plain markdown content" in result
+
+    @pytest.mark.asyncio
+    async def test_traverse_long_chain_without_recursion_limit(self, processor, temp_knowledge_graph):
+        """Test that a link chain longer than the recursion limit is fully traversed."""
+        chain_length = 1500
+        for i in range(chain_length):
+            next_link = f" [[n{i + 1}.md]]" if i + 1 < chain_length else ""
+            (temp_knowledge_graph / f"n{i}.md").write_text(f"Node {i}{next_link}")
+
+        visited = set()
+        context = {}
+
+        result = "\n".join(await processor._traverse("n0.md", visited, context))
+
+        assert len(visited) == chain_length
+        assert f"Node {chain_length - 1}" in result
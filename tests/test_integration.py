@@ -10,6 +10,7 @@ Use pytest markers to run these tests selectively:
 import pytest
 import asyncio
 import json
+import time
 from unittest.mock import MagicMock, AsyncMock, patch
 from datetime import datetime
 
@@ -33,7 +34,7 @@ class TestComprehensionPipelineIntegration:
 
         # Mock ChromaService
         mock_chroma = MagicMock()
-        mock_chroma.add_document = MagicMock()
+        mock_chroma.add_documents = MagicMock()
 
         # Mock LLMService
         mock_llm = MagicMock()
@@ -95,7 +96,7 @@ class TestComprehensionPipelineIntegration:
         # Verify all services were called
         mock_services["llm_service"].generate_commit_summary.assert_called_once()
         mock_services["kg_service"].process_insight.assert_called_once()
-        mock_services["chroma_service"].add_document.assert_called_once()
+        mock_services["chroma_service"].add_documents.assert_called_once()
         mock_services["redis"].enqueue_job.assert_called_once()
 
     @pytest.mark.asyncio
@@ -133,7 +134,7 @@ class TestComprehensionPipelineIntegration:
 
         mock_services["llm_service"].generate_code_change_summary.assert_called_once()
         mock_services["kg_service"].process_insight.assert_called_once()
-        mock_services["chroma_service"].add_document.assert_called_once()
+        mock_services["chroma_service"].add_documents.assert_called_once()
 
 
 class TestSynthesisPipelineIntegration:
@@ -144,7 +145,7 @@ class TestSynthesisPipelineIntegration:
         """Create mocked services for synthesis testing."""
         # Mock ChromaService
         mock_chroma = MagicMock()
-        mock_chroma.query = MagicMock(return_value={
+        mock_chroma.aquery = AsyncMock(return_value={
             "documents": [["private doc content"]],
             "metadatas": [[{"file_path": "/path/to/insight.md"}]],
             "distances": [[0.1]]
@@ -163,7 +164,7 @@ class TestSynthesisPipelineIntegration:
 
         mock_llm = MagicMock()
         mock_llm.settings = mock_settings
-        mock_llm.generate = MagicMock(return_value="Synthesized insight content")
+        mock_llm.agenerate = AsyncMock(return_value="Synthesized insight content")
 
         # Mock Redis
         mock_redis = AsyncMock()
@@ -190,7 +191,7 @@ class TestSynthesisPipelineIntegration:
         assert "query_text" in result
         assert "private_results" in result
         assert "entry_points" in result
-        mock_synthesis_services["chroma_service"].query.assert_called_once()
+        mock_synthesis_services["chroma_service"].aquery.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_public_knowledge_retrieval(self, mock_synthesis_services, mocker):
@@ -237,6 +238,24 @@ class TestPipelineOrchestration:
 
         assert execution_order == ["first", "second", "third"]
 
+    @pytest.mark.asyncio
+    async def test_subclass_execute_override_is_used(self):
+        """Test that a sequential pipeline does not shadow an overridden execute()."""
+        from cortex.pipelines.pipelines import Pipeline
+        from cortex.pipelines.processors import Processor
+
+        class UpperProcessor(Processor):
+            async def process(self, data, context):
+                return data.upper()
+
+        class WrappedPipeline(Pipeline):
+            async def execute(self, data, context):
+                return f"<{await super().execute(data, context)}>"
+
+        pipeline = WrappedPipeline([UpperProcessor()])
+
+        assert await pipeline.execute(data="test", context={}) == "<TEST>"
+
     @pytest.mark.asyncio
     async def test_parallel_execution(self):
         """Test that processors in a list execute in parallel."""
@@ -330,6 +349,89 @@ class TestPipelineOrchestration:
         # Both dicts should be merged
         assert "a" in result and "c" in result
 
+    @pytest.mark.asyncio
+    async def test_parallel_results_merged_as_branches_finish(self):
+        """Test that a fast branch's result is merged before a slow branch completes."""
+        from cortex.pipelines.pipelines import Pipeline
+        from cortex.pipelines.processors import Processor
+
+        seen_by_slow = {}
+
+        class FastProcessor(Processor):
+            async def process(self, data, context):
+                await asyncio.sleep(0)
+                return {"fast": True}
+
+        class SlowProcessor(Processor):
+            async def process(self, data, context):
+                await asyncio.sleep(0.05)
+                seen_by_slow.update(data)
+                return {"slow": True}
+
+        pipeline = Pipeline([[SlowProcessor(), FastProcessor()]])
+
+        result = await pipeline.execute(data={}, context={})
+
+        assert result == {"fast": True, "slow": True}
+        assert seen_by_slow == {"fast": True}
+
+    @pytest.mark.asyncio
+    async def test_parallel_step_skips_wait_when_branches_finish_eagerly(self, mocker):
+        """Test that branches completing without suspending are merged without waiting."""
+        from cortex.pipelines.pipelines import Pipeline
+        from cortex.pipelines.processors import Processor
+
+        class ImmediateProcessor(Processor):
+            def __init__(self, result_dict):
+                self.result_dict = result_dict
+
+            async def process(self, data, context):
+                return self.result_dict
+
+        mock_wait = mocker.patch('cortex.pipelines.pipelines.asyncio.wait')
+
+        pipeline = Pipeline([
+            [
+                ImmediateProcessor({"a": 1}),
+                ImmediateProcessor({"b": 2}),
+            ],
+        ])
+
+        result = await pipeline.execute(data={}, context={})
+
+        assert result == {"a": 1, "b": 2}
+        mock_wait.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_parallel_side_effect_processors_pass_data_through(self):
+        """Test that parallel processors returning None leave the data unchanged."""
+        from cortex.pipelines.pipelines import Pipeline
+        from cortex.pipelines.processors import Processor
+
+        calls = []
+
+        class SideEffectProcessor(Processor):
+            def __init__(self, name):
+                self.name = name
+
+            async def process(self, data, context):
+                await asyncio.sleep(0)
+                calls.append(self.name)
+                return None
+
+        pipeline = Pipeline([
+            [
+                SideEffectProcessor("kg"),
+                SideEffectProcessor("chroma"),
+            ],
+        ])
+
+        data = {"insight": "value"}
+        result = await pipeline.execute(data=data, context={})
+
+        assert result is data
+        assert sorted(calls) == ["chroma", "kg"]
+
     @pytest.mark.asyncio
     async def test_context_sharing(self):
         """Test that context is shared across all processors."""
@@ -389,7 +491,7 @@ class TestWebSocketIntegration:
                 audio_content=b"test_audio_data"
             )
 
-            with patch('cortex.pipelines.delivery.Settings') as MockSettings:
+            with patch('cortex.pipelines.delivery.get_settings') as MockSettings:
                 MockSettings.return_value.tts_voice_name = "en-US-Wavenet-D"
 
                 from cortex.pipelines.delivery import AudioDeliveryProcessor
@@ -469,6 +571,63 @@ class TestErrorRecoveryIntegration:
         with pytest.raises(Exception, match="Intentional failure"):
             await pipeline.execute(data={}, context={})
 
+    @pytest.mark.asyncio
+    async def test_parallel_failure_cancels_running_branches(self):
+        """Test that the first parallel failure cancels branches still running."""
+        from cortex.pipelines.pipelines import Pipeline
+        from cortex.pipelines.processors import Processor
+
+        cancelled = asyncio.Event()
+
+        class SlowProcessor(Processor):
+            async def process(self, data, context):
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+
+        class FailingProcessor(Processor):
+            async def process(self, data, context):
+                await asyncio.sleep(0)
+                raise Exception("Intentional failure")
+
+        pipeline = Pipeline([[SlowProcessor(), FailingProcessor()]])
+
+        with pytest.raises(Exception, match="Intentional failure"):
+            await asyncio.wait_for(pipeline.execute(data={}, context={}), timeout=1)
+        await asyncio.sleep(0)
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_parallel_failure_waits_for_cancelled_branches(self):
+        """Test that a failed parallel step re-raises only after cancelled branches have unwound."""
+        from cortex.pipelines.pipelines import Pipeline
+        from cortex.pipelines.processors import Processor
+
+        cleaned_up = False
+
+        class SlowProcessor(Processor):
+            async def process(self, data, context):
+                nonlocal cleaned_up
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    await asyncio.sleep(0)
+                    cleaned_up = True
+                    raise
+
+        class FailingProcessor(Processor):
+            async def process(self, data, context):
+                await asyncio.sleep(0)
+                raise ValueError("Intentional failure")
+
+        pipeline = Pipeline([[SlowProcessor(), FailingProcessor()]])
+
+        with pytest.raises(ValueError, match="Intentional failure"):
+            await pipeline.execute(data={}, context={})
+        assert cleaned_up
+
     @pytest.mark.asyncio
     async def test_service_error_propagation(self):
         """Test that service errors are properly propagated through the pipeline."""
@@ -517,7 +676,7 @@ class TestFullE2EFlow:
         mock_llm = MagicMock()
         mock_llm.generate_commit_summary = MagicMock(return_value="AI-generated commit summary")
         mock_llm.generate_code_change_summary = MagicMock(return_value="AI-generated code summary")
-        mock_llm.generate = MagicMock(return_value="Final synthesized insight")
+        mock_llm.agenerate = AsyncMock(return_value="Final synthesized insight")
 
         mock_settings = MagicMock()
         mock_settings.gemini_flash_model = "gemini-flash"
@@ -531,8 +690,8 @@ class TestFullE2EFlow:
 
         # Mock ChromaService
         mock_chroma = MagicMock()
-        mock_chroma.add_document = MagicMock()
-        mock_chroma.query = MagicMock(return_value={
+        mock_chroma.add_documents = MagicMock()
+        mock_chroma.aquery = AsyncMock(return_value={
             "documents": [["Related private knowledge from local store"]],
             "metadatas": [[{"file_path": "/insights/related.md"}]],
             "distances": [[0.15]]
@@ -625,7 +784,7 @@ class TestFullE2EFlow:
 
         # Verify Step 3: Knowledge was stored in both stores (parallel)
         mock_all_services["kg_service"].process_insight.assert_called_once()
-        mock_all_services["chroma_service"].add_document.assert_called_once()
+        mock_all_services["chroma_service"].add_documents.assert_called_once()
 
         # Verify Step 4: Synthesis was triggered
         mock_all_services["redis"].enqueue_job.assert_called_once()
@@ -649,7 +808,7 @@ class TestFullE2EFlow:
         @test_app.post("/api/events", status_code=202)
         async def create_event(event: GitCommitEvent, request: Request):
             redis = request.app.state.redis
-            await redis.enqueue_job('process_event_task', event.model_dump())
+            await redis.enqueue_job('process_event_task', event.model_dump_json())
             return {"message": "Event received and queued for processing."}
 
         test_app.state.redis = mock_redis
@@ -677,7 +836,7 @@ class TestFullE2EFlow:
             mock_redis.enqueue_job.assert_called_once()
             job_name, job_data = mock_redis.enqueue_job.call_args[0]
             assert job_name == 'process_event_task'
-            assert job_data["repo_name"] == "test-repo"
+            assert json.loads(job_data)["repo_name"] == "test-repo"
 
     @pytest.mark.asyncio
     async def test_websocket_message_delivery_format(self, mock_all_services, mocker):
@@ -691,7 +850,7 @@ class TestFullE2EFlow:
         # Mock TTS service
         mocker.patch('cortex.pipelines.delivery.texttospeech.TextToSpeechClient',
                     return_value=mock_all_services["tts"])
-        mocker.patch('cortex.pipelines.delivery.Settings',
+        mocker.patch('cortex.pipelines.delivery.get_settings',
                     return_value=mock_all_services["settings"])
 
         processor = AudioDeliveryProcessor(redis=mock_all_services["redis"])
@@ -736,11 +895,11 @@ class TestFullE2EFlow:
         # Track execution timing
         execution_log = []
 
-        # ChromaService.query is synchronous, so use a sync wrapper
-        def tracked_chroma_query(*args, **kwargs):
-            execution_log.append(("chroma_start", asyncio.get_event_loop().time()))
-            # Synchronous - no sleep here, just return mock data
-            execution_log.append(("chroma_end", asyncio.get_event_loop().time()))
+        # ChromaService.aquery is async
+        async def tracked_chroma_query(*args, **kwargs):
+            execution_log.append(("chroma_start", time.monotonic()))
+            await asyncio.sleep(0.01)  # Small delay to verify async behavior
+            execution_log.append(("chroma_end", time.monotonic()))
             return {
                 "documents": [["Related private knowledge"]],
                 "metadatas": [[{"file_path": "/insights/test.md"}]],
@@ -749,12 +908,12 @@ class TestFullE2EFlow:
 
         # UpstashService.query is async
         async def tracked_upstash_query(*args, **kwargs):
-            execution_log.append(("upstash_start", asyncio.get_event_loop().time()))
+            execution_log.append(("upstash_start", time.monotonic()))
             await asyncio.sleep(0.01)  # Small delay to verify async behavior
-            execution_log.append(("upstash_end", asyncio.get_event_loop().time()))
+            execution_log.append(("upstash_end", time.monotonic()))
             return [MagicMock(id="pub1", metadata={"source": "curated"}, data="Public knowledge")]
 
-        mock_all_services["chroma_service"].query = tracked_chroma_query
+        mock_all_services["chroma_service"].aquery = tracked_chroma_query
         mock_all_services["upstash_service"].query = tracked_upstash_query
 
         # Build parallel retrieval pipeline
@@ -827,7 +986,7 @@ class TestFullE2EFlow:
 
         # Knowledge stores should NOT have been written to
         mock_all_services["kg_service"].process_insight.assert_not_called()
-        mock_all_services["chroma_service"].add_document.assert_not_called()
+        mock_all_services["chroma_service"].add_documents.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_context_propagation_through_pipeline(self, mock_all_services):
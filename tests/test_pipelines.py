@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import MagicMock, AsyncMock, call
-from cortex.pipelines.synthesis import KnowledgeGatewayProcessor, GatewayDecision, PrivateKnowledgeQuerier, PublicKnowledgeQuerier, CurationTriggerProcessor, InsightSynthesizer, RunPrivatePipeline, RunPublicPipeline
+from cortex.pipelines.synthesis import KnowledgeGatewayProcessor, GatewayDecision, PrivateKnowledgeQuerier, PublicKnowledgeQuerier, InsightSynthesizer, RunPrivatePipeline, RunPublicPipeline
 from cortex.pipelines.curation import CurationProcessor # Import CurationProcessor for mocking
 from cortex.services.llmservice import LLMService
 from cortex.services.prompt_manager import PromptManager
@@ -14,8 +14,11 @@ from cortex.pipelines.graph_traversal import GraphTraversalProcessor
 from cortex.pipelines.delivery import AudioDeliveryProcessor # New import
 from redis.asyncio import Redis # New import for mocking
 from google.cloud import texttospeech # New import for mocking
+import asyncio
 import base64
 import json
+from weakref import WeakKeyDictionary
+from cortex.utility.ttl_cache import TTLCache
 
 
 @pytest.fixture
@@ -45,11 +48,24 @@ def mock_settings(mocker):
     return mock_s
 
 @pytest.fixture
-def gateway_processor(mock_llm_service, mock_prompt_manager, mocker):
+def mock_curation_processor(mocker):
+    """Fixture for the CurationProcessor the gateway hands improvable knowledge to."""
+    mock_cp = MagicMock(spec=CurationProcessor)
+    mock_cp.process = AsyncMock(side_effect=lambda data, context: {**data, "augmented_knowledge": "curated"})
+    mocker.patch('cortex.pipelines.synthesis.CurationProcessor', return_value=mock_cp)
+    return mock_cp
+
+@pytest.fixture
+def gateway_processor(mock_llm_service, mock_prompt_manager, mock_curation_processor, mocker):
     """Fixture for KnowledgeGatewayProcessor with mocked dependencies."""
+    # Start every test with an empty decision cache
+    mocker.patch('cortex.pipelines.synthesis._gateway_decisions', TTLCache(16, 300.0))
+    mocker.patch('cortex.pipelines.synthesis._gateway_agent_pools', WeakKeyDictionary())
     # Patch PromptManager at the module level before instantiating KnowledgeGatewayProcessor
-    mocker.patch('cortex.pipelines.synthesis.PromptManager', return_value=mock_prompt_manager)
-    return KnowledgeGatewayProcessor(mock_llm_service)
+    mocker.patch('cortex.pipelines.synthesis.get_prompt_manager', return_value=mock_prompt_manager)
+    # The instruction is rendered once when the processor is created
+    mock_prompt_manager.render.return_value = "mocked instruction"
+    return KnowledgeGatewayProcessor(mock_llm_service, MagicMock(spec=UpstashService))
 
 @pytest.mark.asyncio
 async def test_knowledge_gateway_processor_needs_improvement_true(gateway_processor, mock_llm_service, mock_prompt_manager, mocker):
@@ -65,7 +81,7 @@ async def test_knowledge_gateway_processor_needs_improvement_true(gateway_proces
     context = {}
     
     # Set return values for prompt_manager.render for this test specifically
-    mock_prompt_manager.render.side_effect = ["mocked instruction", "rendered prompt"]
+    mock_prompt_manager.render.side_effect = ["rendered prompt"]
 
     result = await gateway_processor.process(data, context)
     
@@ -101,13 +117,71 @@ async def test_knowledge_gateway_processor_needs_improvement_false(gateway_proce
     context = {}
     
     # Set return values for prompt_manager.render for this test specifically
-    mock_prompt_manager.render.side_effect = ["mocked instruction", "rendered prompt"]
+    mock_prompt_manager.render.side_effect = ["rendered prompt"]
 
     result = await gateway_processor.process(data, context)
     
     assert result["needs_improvement"] is False
 
 
+@pytest.mark.asyncio
+async def test_knowledge_gateway_processor_reuses_cached_decision(gateway_processor, mock_llm_service, mock_prompt_manager, mocker):
+    """Test that a repeated query and context reuse the earlier decision."""
+    mock_run_standalone_agent = mocker.patch(
+        'cortex.pipelines.synthesis.run_standalone_agent',
+        new_callable=mocker.AsyncMock,
+        return_value='{"needs_improvement": true}'
+    )
+    mock_prompt_manager.render.return_value = "rendered"
+
+    first = await gateway_processor.process({"query_text": "test query", "public_results": ["r"]}, {})
+    second = await gateway_processor.process({"query_text": "test query", "public_results": ["r"]}, {})
+    other = await gateway_processor.process({"query_text": "other query", "public_results": ["r"]}, {})
+
+    assert first["needs_improvement"] is True
+    assert second["needs_improvement"] is True
+    assert other["needs_improvement"] is True
+    assert mock_run_standalone_agent.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_knowledge_gateway_processor_reuses_pooled_agent(gateway_processor, mock_llm_service, mock_prompt_manager, mocker):
+    """Test that the gateway agent and its instruction are built once and reused."""
+    mock_run_standalone_agent = mocker.patch(
+        'cortex.pipelines.synthesis.run_standalone_agent',
+        new_callable=mocker.AsyncMock,
+        return_value='{"needs_improvement": false}'
+    )
+    mock_prompt_manager.render.return_value = "rendered"
+
+    await gateway_processor.process({"query_text": "first query"}, {})
+    await gateway_processor.process({"query_text": "second query"}, {})
+
+    first_agent = mock_run_standalone_agent.call_args_list[0].args[0]
+    second_agent = mock_run_standalone_agent.call_args_list[1].args[0]
+    assert first_agent is second_agent
+    instruction_renders = [c for c in mock_prompt_manager.render.call_args_list if not c.kwargs]
+    assert len(instruction_renders) == 1
+
+
+@pytest.mark.asyncio
+async def test_knowledge_gateway_processor_cached_decision_expires(gateway_processor, mock_llm_service, mock_prompt_manager, mocker):
+    """Test that cached decisions are not used past their TTL."""
+    mock_run_standalone_agent = mocker.patch(
+        'cortex.pipelines.synthesis.run_standalone_agent',
+        new_callable=mocker.AsyncMock,
+        return_value='{"needs_improvement": false}'
+    )
+    mock_prompt_manager.render.return_value = "rendered"
+    mock_time = mocker.patch('cortex.utility.ttl_cache.time.monotonic', return_value=1000.0)
+
+    await gateway_processor.process({"query_text": "test query"}, {})
+    mock_time.return_value = 1000.0 + 301
+    await gateway_processor.process({"query_text": "test query"}, {})
+
+    assert mock_run_standalone_agent.call_count == 2
+
+
 @pytest.mark.asyncio
 async def test_knowledge_gateway_processor_fallback_true(gateway_processor, mock_llm_service, mock_prompt_manager, mocker):
     """Test processor fallback for non-JSON response indicating true."""
@@ -121,13 +195,27 @@ async def test_knowledge_gateway_processor_fallback_true(gateway_processor, mock
     context = {}
     
     # Set return values for prompt_manager.render for this test specifically
-    mock_prompt_manager.render.side_effect = ["mocked instruction", "rendered prompt"]
+    mock_prompt_manager.render.side_effect = ["rendered prompt"]
 
     result = await gateway_processor.process(data, context)
     
     assert result["needs_improvement"] is True
 
 
+@pytest.mark.asyncio
+async def test_knowledge_gateway_processor_fallback_ignores_late_verdict(gateway_processor, mock_llm_service, mock_prompt_manager, mocker):
+    """Test that the fallback only looks at the start of a long non-JSON reply."""
+    mocker.patch(
+        'cortex.pipelines.synthesis.run_standalone_agent',
+        new_callable=mocker.AsyncMock,
+        return_value="x" * 1000 + " true"
+    )
+
+    result = await gateway_processor.process({"query_text": "test query"}, {})
+
+    assert result["needs_improvement"] is False
+
+
 @pytest.mark.asyncio
 async def test_knowledge_gateway_processor_fallback_false(gateway_processor, mock_llm_service, mock_prompt_manager, mocker):
     """Test processor fallback for non-JSON response indicating false."""
@@ -141,7 +229,7 @@ async def test_knowledge_gateway_processor_fallback_false(gateway_processor, moc
     context = {}
     
     # Set return values for prompt_manager.render for this test specifically
-    mock_prompt_manager.render.side_effect = ["mocked instruction", "rendered prompt"]
+    mock_prompt_manager.render.side_effect = ["rendered prompt"]
 
     result = await gateway_processor.process(data, context)
     
@@ -161,7 +249,7 @@ async def test_knowledge_gateway_processor_llm_agent_error(gateway_processor, mo
     context = {}
     
     # Set return values for prompt_manager.render for this test specifically
-    mock_prompt_manager.render.side_effect = ["mocked instruction", "rendered prompt"]
+    mock_prompt_manager.render.side_effect = ["rendered prompt"]
 
     result = await gateway_processor.process(data, context)
     
@@ -196,9 +284,105 @@ def mock_upstash_service(mocker):
     ])
     return mock_us
 
+@pytest.mark.asyncio
+async def test_public_knowledge_querier_timeout_returns_empty(mock_upstash_service, mocker):
+    """Test that a slow Upstash query degrades to empty results instead of stalling synthesis."""
+    mocker.patch('cortex.pipelines.synthesis.KNOWLEDGE_QUERY_TIMEOUT_SECONDS', 0.01)
+
+    async def slow_query(*args, **kwargs):
+        await asyncio.sleep(1)
+
+    mock_upstash_service.query = mocker.AsyncMock(side_effect=slow_query)
+    querier = PublicKnowledgeQuerier(mock_upstash_service)
+
+    result = await querier.process("query", {})
+
+    assert result == {"public_results": [], "query_text": "query"}
+
+@pytest.mark.asyncio
+async def test_public_knowledge_querier_skips_short_query(mock_upstash_service):
+    """Test that an empty or trivial query never reaches Upstash."""
+    querier = PublicKnowledgeQuerier(mock_upstash_service)
+
+    result = await querier.process(" a ", {})
+
+    assert result == {"public_results": [], "query_text": " a "}
+    mock_upstash_service.query.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_public_knowledge_querier_reuses_recent_results(mock_upstash_service):
+    """Test that a repeated query is answered without searching again."""
+    querier = PublicKnowledgeQuerier(mock_upstash_service)
+
+    first = await querier.process("repeated query", {})
+    second = await querier.process("repeated query", {})
+
+    assert second["public_results"] == first["public_results"]
+    mock_upstash_service.query.assert_awaited_once_with("repeated query", n_results=2)
+
+@pytest.mark.asyncio
+async def test_knowledge_queriers_cache_is_not_shared_with_callers(mock_upstash_service, mock_chroma_service, mocker):
+    """Test that mutating returned results does not change what later cache hits see."""
+    mock_upstash_service.query.return_value = [{"id": "doc1", "metadata": {"source": "docs"}}]
+    mock_chroma_service.aquery = mocker.AsyncMock(return_value={"metadatas": [[{"file_path": "a.md"}]]})
+    public_querier = PublicKnowledgeQuerier(mock_upstash_service)
+    private_querier = PrivateKnowledgeQuerier(mock_chroma_service)
+
+    public_first = await public_querier.process("repeated query", {})
+    private_first = await private_querier.process("repeated query", {})
+    public_first["public_results"][0]["metadata"]["source"] = "mutated"
+    private_first["private_results"]["metadatas"][0].clear()
+
+    public_second = await public_querier.process("repeated query", {})
+    private_second = await private_querier.process("repeated query", {})
+
+    assert public_second["public_results"] == [{"id": "doc1", "metadata": {"source": "docs"}}]
+    assert private_second["entry_points"] == ["a.md"]
+    mock_upstash_service.query.assert_awaited_once()
+    mock_chroma_service.aquery.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_private_knowledge_querier_skips_short_query(mock_chroma_service, mocker):
+    """Test that an empty query returns empty results without embedding."""
+    mock_chroma_service.aquery = mocker.AsyncMock()
+    querier = PrivateKnowledgeQuerier(mock_chroma_service)
+
+    result = await querier.process("", {})
+
+    assert result["private_results"] == {"ids": [[]], "documents": [[]], "metadatas": [[]]}
+    assert result["entry_points"] == []
+    mock_chroma_service.aquery.assert_not_called()
+
+
+# Tests for the gateway's curation step
+@pytest.mark.asyncio
+async def test_knowledge_gateway_processor_triggers_curation(gateway_processor, mock_curation_processor, mocker):
+    """Test that knowledge needing improvement is handed to curation."""
+    mocker.patch(
+        'cortex.pipelines.synthesis.run_standalone_agent',
+        new_callable=mocker.AsyncMock,
+        return_value='{"needs_improvement": true}'
+    )
+
+    result = await gateway_processor.process({"query_text": "test query"}, {})
+
+    mock_curation_processor.process.assert_awaited_once()
+    assert result["needs_improvement"] is True
+    assert result["augmented_knowledge"] == "curated"
+
+@pytest.mark.asyncio
+async def test_knowledge_gateway_processor_skips_curation_when_sufficient(gateway_processor, mock_curation_processor, mocker):
+    """Test that sufficient knowledge is passed through without curation."""
+    mocker.patch(
+        'cortex.pipelines.synthesis.run_standalone_agent',
+        new_callable=mocker.AsyncMock,
+        return_value='{"needs_improvement": false}'
+    )
+
+    result = await gateway_processor.process({"query_text": "test query"}, {})
 
-# Tests for CurationTriggerProcessor
-from cortex.pipelines.curation import CurationProcessor
+    mock_curation_processor.process.assert_not_called()
+    assert "augmented_knowledge" not in result
 
 
 # Tests for InsightSynthesizer
@@ -206,7 +390,7 @@ from cortex.pipelines.curation import CurationProcessor
 def insight_synthesizer(mock_llm_service, mock_prompt_manager, mocker):
     """Fixture for InsightSynthesizer with mocked dependencies."""
     # Patch PromptManager at the module level before instantiating InsightSynthesizer
-    mocker.patch('cortex.pipelines.synthesis.PromptManager', return_value=mock_prompt_manager)
+    mocker.patch('cortex.pipelines.synthesis.get_prompt_manager', return_value=mock_prompt_manager)
     return InsightSynthesizer(mock_llm_service)
 
 @pytest.mark.asyncio
@@ -218,7 +402,7 @@ async def test_insight_synthesizer_success(insight_synthesizer, mock_llm_service
             "traversed_knowledge": ["traversed doc 1"]
         },
         "public_knowledge": {
-            "public_results": [MagicMock(data="public doc 1")],
+            "public_results": [{"id": "pub_doc1", "data": "public doc 1"}],
             "augmented_knowledge": "augmented data"
         }
     }
@@ -228,19 +412,19 @@ async def test_insight_synthesizer_success(insight_synthesizer, mock_llm_service
     mock_prompt_manager.render.return_value = "synthesis prompt content"
     
     # Explicitly mock the generate method of the llm_service within the insight_synthesizer instance
-    mocker.patch.object(insight_synthesizer.llm_service, 'generate', return_value="Synthesized Insight")
+    mocker.patch.object(insight_synthesizer.llm_service, 'agenerate', new_callable=AsyncMock, return_value="Synthesized Insight")
 
     result = await insight_synthesizer.process(data, context)
     
     mock_prompt_manager.render.assert_called_once_with(
         "insight_synthesis.jinja2",
-        private_results=data["private_knowledge"]["private_results"],
-        traversed_knowledge=data["private_knowledge"]["traversed_knowledge"],
-        public_results=data["public_knowledge"]["public_results"],
-        augmented_knowledge=data["public_knowledge"]["augmented_knowledge"]
+        private_results='{"docs":["private doc 1"]}',
+        traversed_knowledge='["traversed doc 1"]',
+        public_results='[{"id":"pub_doc1","data":"public doc 1"}]',
+        augmented_knowledge="augmented data"
     )
     # The assertion now checks the patched object's call
-    insight_synthesizer.llm_service.generate.assert_called_once_with(
+    insight_synthesizer.llm_service.agenerate.assert_awaited_once_with(
         "synthesis prompt content",
         model="gemini-pro-test"
     )
@@ -286,7 +470,6 @@ def run_public_pipeline_instance(mocker, mock_upstash_service, mock_llm_service)
     # Patch the *classes* that RunPublicPipeline instantiates
     mocker.patch('cortex.pipelines.synthesis.PublicKnowledgeQuerier')
     mocker.patch('cortex.pipelines.synthesis.KnowledgeGatewayProcessor')
-    mocker.patch('cortex.pipelines.synthesis.CurationTriggerProcessor')
 
     # Create a mock Pipeline with an AsyncMock execute method
     mock_pipeline_instance = MagicMock(spec=Pipeline)
@@ -0,0 +1,402 @@
+"""
+Unit tests for the git post-commit observer hook.
+Tests: repository settings cache, fast config read, diff backends, offline queue, detached sending
+"""
+import importlib.util
+import io
+import json
+import os
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import git
+import pytest
+import requests
+
+
+HOOK_PATH = Path(__file__).resolve().parents[1] / "observers" / "git_hooks" / "post-commit.py"
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture(scope="module")
+def hook():
+    """Loads post-commit.py as a module (its file name is not importable)."""
+    spec = importlib.util.spec_from_file_location("post_commit_hook", HOOK_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(autouse=True)
+def _clear_hook_state(hook):
+    """Keeps the hook's in-process memos from leaking between tests."""
+    yield
+    hook._REPO_SETTINGS.clear()
+    hook._PYGIT2_REPOS.clear()
+    hook._read_local_config_value.cache_clear()
+    hook._SESSION = None
+
+
+def commit_files(repo: git.Repo, files: dict, message: str) -> git.Commit:
+    """Helper to write files into the work tree and commit them."""
+    for name, content in files.items():
+        path = Path(repo.working_dir) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    repo.index.add(list(files))
+    return repo.index.commit(message)
+
+
+def bump_mtime(path: str, seconds: float = 10) -> None:
+    """Helper to move a file's mtime forward so the change is visible even on coarse clocks."""
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + seconds))
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    """A throwaway repository with one commit on `main` and cortex.api-url configured."""
+    repo = git.Repo.init(tmp_path / "sample-repo", initial_branch="main")
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test Author")
+        config.set_value("user", "email", "author@example.com")
+        config.set_value("cortex", "api-url", "http://127.0.0.1:8000/api/events")
+    commit_files(repo, {"README.md": "hello\n"}, "Initial commit")
+    return repo
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    """Path of the offline queue file."""
+    return str(tmp_path / "cortex-queue.jsonl")
+
+
+def http_error(status_code: int) -> requests.HTTPError:
+    """Helper to build the HTTPError raise_for_status() raises for a status code."""
+    return requests.HTTPError(response=MagicMock(status_code=status_code))
+
+
+def read_lines(path: str) -> list:
+    with open(path, "rb") as f:
+        return f.read().splitlines()
+
+
+# ============================================================================
+# Repository Settings Tests
+# ============================================================================
+
+class TestRepoSettings:
+    """Tests for get_repo_settings and the cortex-cache.json file."""
+
+    def test_resolves_settings_and_writes_cache(self, hook, git_repo):
+        settings = hook.get_repo_settings(git_repo)
+
+        assert settings == {
+            "api_url": "http://127.0.0.1:8000/api/events",
+            "repo_name": "sample-repo",
+            "branch_name": "main",
+        }
+        cached = json.loads(Path(git_repo.git_dir, hook.CACHE_FILE_NAME).read_text())
+        assert cached["api_url"] == settings["api_url"]
+        assert tuple(cached["cache_mtime"]) == hook._settings_stamp(git_repo.git_dir)
+
+    def test_reuses_cache_file_while_config_and_head_are_unchanged(self, hook, git_repo):
+        first = hook.get_repo_settings(git_repo)
+        hook._REPO_SETTINGS.clear()
+
+        with patch.object(hook, "_resolve_repo_settings") as mock_resolve:
+            assert hook.get_repo_settings(git_repo) == first
+        mock_resolve.assert_not_called()
+
+    def test_config_change_invalidates_cache(self, hook, git_repo):
+        hook.get_repo_settings(git_repo)
+        with git_repo.config_writer() as config:
+            config.set_value("cortex", "api-url", "http://example.com/events")
+        bump_mtime(os.path.join(git_repo.git_dir, "config"))
+
+        assert hook.get_repo_settings(git_repo)["api_url"] == "http://example.com/events"
+
+    def test_head_change_invalidates_cache(self, hook, git_repo):
+        hook.get_repo_settings(git_repo)
+        git_repo.git.checkout("-b", "feature")
+        bump_mtime(os.path.join(git_repo.git_dir, "HEAD"))
+
+        assert hook.get_repo_settings(git_repo)["branch_name"] == "feature"
+
+    def test_detached_head(self, hook, git_repo):
+        git_repo.git.checkout(git_repo.head.commit.hexsha)
+
+        assert hook.get_repo_settings(git_repo)["branch_name"] == "DETACHED_HEAD"
+
+    def test_corrupt_cache_file_is_ignored(self, hook, git_repo):
+        Path(git_repo.git_dir, hook.CACHE_FILE_NAME).write_text("{not json")
+
+        assert hook.get_repo_settings(git_repo)["repo_name"] == "sample-repo"
+
+    def test_prefetched_api_url_skips_config_read(self, hook, git_repo):
+        with patch.object(hook, "_get_api_url") as mock_get_api_url:
+            settings = hook.get_repo_settings(git_repo, "http://prefetched/events")
+
+        mock_get_api_url.assert_not_called()
+        assert settings["api_url"] == "http://prefetched/events"
+
+
+# ============================================================================
+# Fast Config Read Tests
+# ============================================================================
+
+class TestReadApiUrlFast:
+    """Tests for reading cortex.api-url with configparser."""
+
+    def test_reads_configured_url(self, hook, git_repo):
+        assert hook._read_api_url_fast(git_repo.git_dir) == "http://127.0.0.1:8000/api/events"
+
+    def test_strips_quotes_and_inline_comments(self, hook, git_repo):
+        config_path = os.path.join(git_repo.git_dir, "config")
+        with open(config_path, "a", encoding="utf-8") as f:
+            f.write('[cortex]\n\tapi-url = "http://quoted/events" ; set by setup_hooks.sh\n')
+
+        assert hook._read_api_url_fast(git_repo.git_dir) == "http://quoted/events"
+
+    def test_returns_none_when_url_is_not_set(self, hook, git_repo):
+        with git_repo.config_writer() as config:
+            config.remove_section("cortex")
+
+        assert hook._read_api_url_fast(git_repo.git_dir) is None
+
+    def test_unreadable_config_returns_sentinel(self, hook, tmp_path):
+        assert hook._read_api_url_fast(str(tmp_path / "missing")) is hook._URL_NOT_READ
+        assert hook._read_api_url_fast(None) is hook._URL_NOT_READ
+
+    def test_linked_worktree_reads_shared_config(self, hook, git_repo, tmp_path):
+        worktree = tmp_path / "linked"
+        git_repo.git.worktree("add", str(worktree), "-b", "linked")
+        git_dir = git.Repo(worktree).git_dir
+
+        assert hook._read_api_url_fast(git_dir) == "http://127.0.0.1:8000/api/events"
+
+
+# ============================================================================
+# Diff Tests
+# ============================================================================
+
+class TestCommitDiff:
+    """Tests for get_commit_diff and its size limits."""
+
+    @pytest.fixture(autouse=True)
+    def _use_subprocess_backend(self, hook, monkeypatch):
+        monkeypatch.setattr(hook, "_load_pygit2", lambda: None)
+
+    def test_small_diff_is_embedded(self, hook, git_repo):
+        commit = commit_files(git_repo, {"app.py": "print('hi')\n"}, "Add app")
+
+        diff_text, stats = hook.get_commit_diff(commit)
+
+        assert "app.py" in diff_text
+        assert "+print('hi')" in diff_text
+        assert stats == {"files_changed": 1, "insertions": 1, "deletions": 0}
+
+    def test_root_commit_has_no_stats(self, hook, git_repo):
+        diff_text, stats = hook.get_commit_diff(git_repo.head.commit)
+
+        assert "README.md" in diff_text
+        assert stats is None
+
+    def test_too_many_files_truncates_diff(self, hook, git_repo, monkeypatch):
+        monkeypatch.setattr(hook, "MAX_DIFF_FILES", 2)
+        commit = commit_files(git_repo, {f"f{i}.txt": "x\n" for i in range(2)}, "Two files")
+
+        diff_text, stats = hook.get_commit_diff(commit)
+
+        assert diff_text is None
+        assert stats["files_changed"] == 2
+
+    def test_too_many_lines_truncates_diff(self, hook, git_repo, monkeypatch):
+        monkeypatch.setattr(hook, "MAX_DIFF_LINES", 10)
+        commit = commit_files(git_repo, {"big.txt": "line\n" * 10}, "Big file")
+
+        diff_text, stats = hook.get_commit_diff(commit)
+
+        assert diff_text is None
+        assert stats["insertions"] == 10
+
+    def test_truncated_diff_is_flagged_on_event(self, hook, git_repo, monkeypatch):
+        monkeypatch.setattr(hook, "MAX_DIFF_FILES", 1)
+        commit = commit_files(git_repo, {"a.txt": "a\n"}, "One file")
+
+        event = hook.get_commit_details(commit)
+
+        assert event.diff is None
+        assert event.truncated_diff is True
+        assert event.repo_name == "sample-repo"
+        assert event.commit_hash == commit.hexsha
+
+
+def test_pygit2_and_gitpython_backends_agree(hook, git_repo, monkeypatch):
+    """Both diff backends report the same stats, patch files and truncation."""
+    pygit2 = pytest.importorskip("pygit2")
+    monkeypatch.setattr(hook, "_load_pygit2", lambda: pygit2)
+    monkeypatch.setattr(hook, "MAX_DIFF_LINES", 6)
+    small = commit_files(git_repo, {"a.txt": "a\n", "b.txt": "b\nb\n"}, "Small")
+    large = commit_files(git_repo, {"a.txt": "a\n" * 6}, "Large")
+
+    for commit in (small, large, git_repo.commit(small.parents[0])):
+        stats_git, load_git = hook._probe_with_subprocess(commit)
+        stats_lib, load_lib = hook._probe_in_process(commit)
+
+        assert stats_lib == stats_git
+        assert hook._diff_within_limits(stats_lib) == hook._diff_within_limits(stats_git)
+        files_git = [line for line in load_git().splitlines() if line.startswith("diff --git")]
+        files_lib = [line for line in load_lib().splitlines() if line.startswith("diff --git")]
+        assert files_lib == files_git
+
+
+# ============================================================================
+# Offline Queue Tests
+# ============================================================================
+
+class TestOfflineQueue:
+    """Tests for drain_queue and deliver_payload."""
+
+    def test_drains_queue_oldest_first_then_sends_event(self, hook, queue_path):
+        hook._enqueue_payloads([b"first", b"second"], queue_path)
+
+        with patch.object(hook, "_post_payload") as mock_post:
+            hook.deliver_payload(b"new", "http://api", queue_path)
+
+        assert [c.args[0] for c in mock_post.call_args_list] == [b"first", b"second", b"new"]
+        assert not os.path.exists(queue_path)
+
+    @pytest.mark.parametrize("error", [
+        requests.ConnectionError("offline"),
+        requests.Timeout("slow"),
+        http_error(503),
+    ])
+    def test_transient_failure_requeues_unsent_events(self, hook, queue_path, error):
+        hook._enqueue_payloads([b"first", b"second"], queue_path)
+
+        with patch.object(hook, "_post_payload", side_effect=[None, error]):
+            with pytest.raises(type(error)):
+                hook.deliver_payload(b"new", "http://api", queue_path)
+
+        assert read_lines(queue_path) == [b"second", b"new"]
+
+    def test_rejected_queued_event_is_dead_lettered(self, hook, queue_path):
+        hook._enqueue_payloads([b"bad", b"good"], queue_path)
+
+        with patch.object(hook, "_post_payload", side_effect=[http_error(422), None, None]) as mock_post:
+            hook.deliver_payload(b"new", "http://api", queue_path)
+
+        assert [c.args[0] for c in mock_post.call_args_list] == [b"bad", b"good", b"new"]
+        assert not os.path.exists(queue_path)
+        assert read_lines(hook._dead_letter_path(queue_path)) == [b"bad"]
+
+    def test_rejected_new_event_is_dead_lettered_not_queued(self, hook, queue_path):
+        with patch.object(hook, "_post_payload", side_effect=http_error(400)):
+            with pytest.raises(requests.HTTPError):
+                hook.deliver_payload(b"new", "http://api", queue_path)
+
+        assert not os.path.exists(queue_path)
+        assert read_lines(hook._dead_letter_path(queue_path)) == [b"new"]
+
+    def test_queue_is_claimed_by_only_one_drainer(self, hook, queue_path):
+        hook._enqueue_payloads([b"first"], queue_path)
+
+        assert hook._claim_queue(queue_path) == [b"first"]
+        assert hook._claim_queue(queue_path) == []
+        assert os.listdir(os.path.dirname(queue_path)) == []
+
+    def test_missing_queue_is_a_no_op(self, hook, queue_path):
+        with patch.object(hook, "_post_payload") as mock_post:
+            hook.drain_queue("http://api", queue_path)
+
+        mock_post.assert_not_called()
+
+
+# ============================================================================
+# Detached Sending Tests
+# ============================================================================
+
+class TestSendEventDetached:
+    """Tests for the fork and --send detachment paths."""
+
+    @pytest.fixture
+    def event(self):
+        return MagicMock(body=b'{"event_type": "git_commit"}')
+
+    def test_parent_returns_without_sending(self, hook, event, queue_path):
+        with patch.object(hook.os, "fork", return_value=1234, create=True), \
+             patch.object(hook, "deliver_payload") as mock_deliver:
+            hook.send_event_detached(event, "http://api", queue_path)
+
+        mock_deliver.assert_not_called()
+
+    @pytest.mark.parametrize("deliver_error, exit_code", [(None, 0), (requests.ConnectionError("offline"), 1)])
+    def test_child_detaches_and_delivers(self, hook, event, queue_path, deliver_error, exit_code):
+        with patch.object(hook.os, "fork", return_value=0, create=True), \
+             patch.object(hook.os, "setsid", create=True) as mock_setsid, \
+             patch.object(hook.os, "open", return_value=99), \
+             patch.object(hook.os, "dup2") as mock_dup2, \
+             patch.object(hook.os, "_exit", side_effect=SystemExit) as mock_exit, \
+             patch.object(hook, "deliver_payload", side_effect=deliver_error) as mock_deliver:
+            with pytest.raises(SystemExit):
+                hook.send_event_detached(event, "http://api", queue_path)
+
+        mock_setsid.assert_called_once()
+        assert [c.args for c in mock_dup2.call_args_list] == [(99, 0), (99, 1), (99, 2)]
+        mock_deliver.assert_called_once_with(event.body, "http://api", queue_path)
+        mock_exit.assert_called_once_with(exit_code)
+
+    def test_without_fork_reinvokes_script_in_send_mode(self, hook, event, queue_path, monkeypatch):
+        monkeypatch.delattr(hook.os, "fork", raising=False)
+
+        with patch.object(hook.subprocess, "Popen") as mock_popen:
+            hook.send_event_detached(event, "http://api", queue_path)
+
+        args = mock_popen.call_args.args[0]
+        assert args[1:] == [str(HOOK_PATH), "--send", "http://api", queue_path]
+        mock_popen.return_value.stdin.write.assert_called_once_with(event.body)
+        mock_popen.return_value.stdin.close.assert_called_once()
+
+    def test_send_mode_delivers_stdin_body(self, hook, queue_path, monkeypatch):
+        monkeypatch.setattr(hook.sys, "stdin", io.TextIOWrapper(io.BytesIO(b'{"a": 1}\n')))
+
+        with patch.object(hook, "deliver_payload") as mock_deliver:
+            hook.send_from_stdin("http://api", queue_path)
+
+        mock_deliver.assert_called_once_with(b'{"a": 1}', "http://api", queue_path)
+
+
+# ============================================================================
+# main() Tests
+# ============================================================================
+
+class TestMain:
+    """Tests for the hook entry point."""
+
+    def test_missing_url_exits_before_loading_gitpython(self, hook, git_repo, monkeypatch, capsys):
+        with git_repo.config_writer() as config:
+            config.remove_section("cortex")
+        monkeypatch.chdir(git_repo.working_dir)
+        monkeypatch.delenv("GIT_DIR", raising=False)
+
+        with patch.object(hook, "get_repo_settings") as mock_settings:
+            hook.main()
+
+        mock_settings.assert_not_called()
+        assert "Cortex API URL not set" in capsys.readouterr().err
+
+    def test_dispatches_head_commit(self, hook, git_repo, monkeypatch):
+        monkeypatch.chdir(git_repo.working_dir)
+        monkeypatch.delenv("GIT_DIR", raising=False)
+
+        with patch.object(hook, "send_event_detached") as mock_send:
+            hook.main()
+
+        event, url, queue_path = mock_send.call_args.args
+        assert event.commit_hash == git_repo.head.commit.hexsha
+        assert url == "http://127.0.0.1:8000/api/events"
+        assert queue_path == os.path.join(git_repo.git_dir, hook.QUEUE_FILE_NAME)
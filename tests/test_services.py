@@ -1,7 +1,11 @@
+import asyncio
+import os
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+from weakref import WeakKeyDictionary
 from cortex.services.llmservice import LLMService
 from cortex.exceptions import ServiceError
+import httpx
 import requests
 
 @pytest.fixture
@@ -16,21 +20,79 @@ def test_generate_with_ollama_success(llm_service, mocker):
     mock_response = MagicMock()
     mock_response.raise_for_status.return_value = None
     mock_response.json.return_value = {"response": "  Ollama response.  "}
-    mocker.patch('requests.post', return_value=mock_response)
+    mock_client = MagicMock()
+    mock_client.post.return_value = mock_response
+    mocker.patch('cortex.services.llmservice.get_ollama_client', return_value=mock_client)
 
     prompt = "Test prompt for Ollama"
     result = llm_service._generate_with_ollama(prompt, "test-model")
 
     assert result == "Ollama response."
-    requests.post.assert_called_once()
+    mock_client.post.assert_called_once()
 
 def test_generate_with_ollama_api_error(llm_service, mocker):
     """Test handling of API error from Ollama."""
-    mocker.patch('requests.post', side_effect=requests.RequestException("API is down"))
+    mock_client = MagicMock()
+    mock_client.post.side_effect = httpx.ConnectError("API is down")
+    mocker.patch('cortex.services.llmservice.get_ollama_client', return_value=mock_client)
 
     with pytest.raises(ServiceError, match="Error communicating with local LLM API: API is down"):
         llm_service._generate_with_ollama("prompt", "test-model")
 
+def test_ollama_client_is_shared_and_retries_connects(mocker):
+    """Test that one pooled client is reused and failed connects are retried."""
+    from cortex.services import llmservice
+    mocker.patch.object(llmservice, '_ollama_client', None)
+    mock_transport = mocker.patch('httpx.HTTPTransport', wraps=httpx.HTTPTransport)
+
+    client = llmservice.get_ollama_client()
+
+    assert llmservice.get_ollama_client() is client
+    mock_transport.assert_called_once()
+    assert mock_transport.call_args.kwargs["retries"] == llmservice.OLLAMA_CONNECT_RETRIES
+    client.close()
+
+@pytest.mark.asyncio
+async def test_agenerate_with_ollama_uses_async_client(llm_service, mocker):
+    """Test that async generation awaits the per-loop async client."""
+    from cortex.services import llmservice
+    mock_response = MagicMock()
+    mock_response.raise_for_status.return_value = None
+    mock_response.json.return_value = {"response": " Ollama response. "}
+    mock_post = mocker.patch('httpx.AsyncClient.post', new_callable=AsyncMock, return_value=mock_response)
+
+    result = await llm_service.agenerate("prompt", "llama3")
+
+    assert result == "Ollama response."
+    mock_post.assert_awaited_once()
+    assert llmservice.get_async_ollama_client() is llmservice.get_async_ollama_client()
+    await llmservice.close_async_ollama_client()
+    assert asyncio.get_running_loop() not in llmservice._async_ollama_clients
+
+@pytest.mark.asyncio
+async def test_agenerate_with_ollama_api_error(llm_service, mocker):
+    """Test that async transport errors surface as ServiceError."""
+    mocker.patch('httpx.AsyncClient.post', new_callable=AsyncMock, side_effect=httpx.ConnectError("API is down"))
+
+    with pytest.raises(ServiceError, match="Error communicating with local LLM API: API is down"):
+        await llm_service.agenerate("prompt", "llama3")
+
+@pytest.mark.asyncio
+async def test_agenerate_uses_gemini_async_client(llm_service, mocker):
+    """Test that async generation goes through the async Gemini client for gemini models."""
+    mock_gemini_client = MagicMock()
+    mock_part = MagicMock()
+    mock_part.text = "Gemini response."
+    mock_gemini_client.aio.models.generate_content = AsyncMock(return_value=MagicMock(parts=[mock_part]))
+    mocker.patch.object(llm_service, '_gemini_client', mock_gemini_client)
+    mocker.patch.object(llm_service.settings, 'llm_model', "gemini-pro")
+
+    result = await llm_service.agenerate("Summarize: feat: new thing")
+
+    assert result == "Gemini response."
+    assert mock_gemini_client.aio.models.generate_content.await_args.kwargs["contents"] == "Summarize: feat: new thing"
+    mock_gemini_client.models.generate_content.assert_not_called()
+
 def test_generate_with_gemini_success(llm_service, mocker):
     """Test successful generation with Gemini."""
     # Mock the entire genai client chain
@@ -79,6 +141,36 @@ def test_generate_selects_gemini(llm_service, mocker):
 
     mock_gemini.assert_called_once_with("prompt", "gemini-pro")
 
+def test_generate_caches_responses_per_model_and_prompt(llm_service, mocker):
+    """Test that an identical prompt to the same model is answered from the cache."""
+    mock_ollama = mocker.patch.object(llm_service, '_generate_with_ollama', side_effect=["first", "second", "third"])
+
+    assert llm_service.generate("prompt", "llama3") == "first"
+    assert llm_service.generate("prompt", "llama3") == "first"
+    assert llm_service.generate("other prompt", "llama3") == "second"
+    assert llm_service.generate("prompt", "mistral") == "third"
+
+    assert mock_ollama.call_count == 3
+
+@pytest.mark.asyncio
+async def test_agenerate_shares_response_cache(llm_service, mocker):
+    """Test that async generation reuses responses cached by sync generation and vice versa."""
+    mocker.patch.object(llm_service, '_generate_with_ollama', return_value="cached")
+    mock_async = mocker.patch.object(llm_service, '_agenerate_with_ollama', new_callable=AsyncMock)
+
+    llm_service.generate("prompt", "llama3")
+
+    assert await llm_service.agenerate("prompt", "llama3") == "cached"
+    mock_async.assert_not_awaited()
+
+def test_generate_does_not_cache_errors(llm_service, mocker):
+    """Test that a failed generation is retried on the next call."""
+    mocker.patch.object(llm_service, '_generate_with_ollama', side_effect=[ServiceError("down"), "ok"])
+
+    with pytest.raises(ServiceError):
+        llm_service.generate("prompt", "llama3")
+    assert llm_service.generate("prompt", "llama3") == "ok"
+
 def test_generate_commit_summary(llm_service, mocker):
     """Test the commit summary generation prompt and flow."""
     mock_generate = mocker.patch.object(llm_service, 'generate')
@@ -98,17 +190,47 @@ def test_get_embedding_success(mocker):
     mock_response = MagicMock()
     mock_response.raise_for_status.return_value = None
     mock_response.json.return_value = {"embeddings": [[0.1, 0.2, 0.3]]}
-    mocker.patch('requests.post', return_value=mock_response)
+    mock_post = mocker.patch('requests.Session.post', return_value=mock_response)
     
     helper = OllamaEmbeddingHelper()
     embedding = helper.get_embedding("some text")
     
     assert embedding == [0.1, 0.2, 0.3]
-    requests.post.assert_called_once()
+    mock_post.assert_called_once()
+
+def test_get_embeddings_single_request(mocker):
+    """Test that several texts are embedded with one request."""
+    mock_response = MagicMock()
+    mock_response.raise_for_status.return_value = None
+    mock_response.json.return_value = {"embeddings": [[0.1], [0.2]]}
+    mock_post = mocker.patch('requests.Session.post', return_value=mock_response)
+
+    helper = OllamaEmbeddingHelper()
+    embeddings = helper.get_embeddings(["first", "second"])
+
+    assert embeddings == [[0.1], [0.2]]
+    mock_post.assert_called_once()
+    assert mock_post.call_args.kwargs["json"]["input"] == ["first", "second"]
+
+def test_get_embeddings_requests_only_uncached_texts(mocker):
+    """Test that cached and repeated texts are not sent to Ollama again."""
+    mock_response = MagicMock()
+    mock_response.raise_for_status.return_value = None
+    mock_response.json.return_value = {"embeddings": [[0.1]]}
+    mock_post = mocker.patch('requests.Session.post', return_value=mock_response)
+
+    helper = OllamaEmbeddingHelper()
+    helper.get_embedding("first")
+    mock_response.json.return_value = {"embeddings": [[0.2]]}
+    embeddings = helper.get_embeddings(["first", "second", "second"])
+
+    assert embeddings == [[0.1], [0.2], [0.2]]
+    assert mock_post.call_count == 2
+    assert mock_post.call_args.kwargs["json"]["input"] == ["second"]
 
 def test_get_embedding_api_error(mocker):
     """Test handling of API error during embedding generation."""
-    mocker.patch('requests.post', side_effect=requests.RequestException("Embedding API is down"))
+    mocker.patch('requests.Session.post', side_effect=requests.RequestException("Embedding API is down"))
     
     helper = OllamaEmbeddingHelper()
     
@@ -121,11 +243,25 @@ def chroma_service(mocker):
     """Fixture to provide a mocked instance of ChromaService."""
     # Mock the chromadb client so we don't interact with the real database
     mocker.patch('chromadb.PersistentClient')
+    mocker.patch('cortex.services.chroma_service._chroma_collections', {})
     service = ChromaService()
     # Further mock the collection object that is created in __init__
     service.collection = MagicMock()
     return service
 
+def test_chroma_services_share_client_and_collection(mocker):
+    """Test that services on the same path open the database only once."""
+    mock_client_cls = mocker.patch('chromadb.PersistentClient')
+    mocker.patch('cortex.services.chroma_service._chroma_collections', {})
+
+    first = ChromaService()
+    second = ChromaService()
+
+    mock_client_cls.assert_called_once()
+    assert first.client is second.client
+    assert first.collection is second.collection
+    first.collection.count.assert_called_once()
+
 def test_add_document_success(chroma_service, mocker):
     """Test successfully adding a document to ChromaDB."""
     mock_embedding = [0.4, 0.5, 0.6]
@@ -154,6 +290,19 @@ def test_add_document_chroma_error(chroma_service, mocker):
     with pytest.raises(ServiceError, match="Failed to add document to ChromaDB: ChromaDB unavailable"):
         chroma_service.add_document("id", "content", {})
 
+def test_add_documents_single_collection_add(chroma_service, mocker):
+    """Test that a batch of documents is written with one collection.add call."""
+    mocker.patch.object(chroma_service.embedding_helper, 'get_embeddings', return_value=[[0.1], [0.2]])
+
+    chroma_service.add_documents(["id1", "id2"], ["first", "second"], [{"n": 1}, {"n": 2}])
+
+    chroma_service.collection.add.assert_called_once_with(
+        ids=["id1", "id2"],
+        embeddings=[[0.1], [0.2]],
+        documents=["first", "second"],
+        metadatas=[{"n": 1}, {"n": 2}]
+    )
+
 def test_query_success(chroma_service, mocker):
     """Test a successful query to ChromaDB."""
     query_embedding = [0.7, 0.8, 0.9]
@@ -172,6 +321,74 @@ def test_query_success(chroma_service, mocker):
         n_results=1,
         include=["documents", "metadatas"]
     )
+@pytest.mark.asyncio
+async def test_aquery_success(chroma_service, mocker):
+    """Test that aquery awaits the embedding and returns the vector search results."""
+    query_embedding = [0.7, 0.8, 0.9]
+    mock_results = {"documents": [["doc1"]], "metadatas": [[{"source": "test"}]]}
+
+    mocker.patch.object(chroma_service.embedding_helper, 'aget_embedding', new=AsyncMock(return_value=query_embedding))
+    chroma_service.collection.query.return_value = mock_results
+
+    results = await chroma_service.aquery("find similar documents", n_results=1)
+
+    assert results == mock_results
+    chroma_service.embedding_helper.aget_embedding.assert_awaited_once_with("find similar documents")
+    chroma_service.collection.query.assert_called_once_with(
+        query_embeddings=[query_embedding],
+        n_results=1,
+        include=["documents", "metadatas"]
+    )
+
+@pytest.mark.asyncio
+async def test_aget_embeddings_success(mocker):
+    """Test async batch embedding through the shared async client."""
+    mock_response = MagicMock()
+    mock_response.raise_for_status.return_value = None
+    mock_response.json.return_value = {"embeddings": [[0.1], [0.2]]}
+    mock_post = mocker.patch('httpx.AsyncClient.post', new=AsyncMock(return_value=mock_response))
+
+    helper = OllamaEmbeddingHelper()
+    embeddings = await helper.aget_embeddings(["first", "second"])
+
+    assert embeddings == [[0.1], [0.2]]
+    assert mock_post.call_args.kwargs["json"]["input"] == ["first", "second"]
+
+@pytest.mark.asyncio
+async def test_aget_embedding_api_error(mocker):
+    """Test that async embedding failures raise ServiceError."""
+    mocker.patch('httpx.AsyncClient.post', new=AsyncMock(side_effect=httpx.ConnectError("Embedding API is down")))
+
+    helper = OllamaEmbeddingHelper()
+
+    with pytest.raises(ServiceError, match="Failed to get embedding from Ollama: Embedding API is down"):
+        await helper.aget_embedding("some text")
+
+@pytest.mark.asyncio
+async def test_aget_embeddings_caps_concurrent_requests(mocker):
+    """Test that concurrent embedding requests are limited to the configured slots."""
+    mocker.patch('cortex.services.chroma_service._embed_slots', WeakKeyDictionary())
+    mocker.patch('cortex.services.chroma_service.get_settings').return_value.embed_max_concurrency = 2
+    in_flight = 0
+    peak = 0
+
+    async def slow_post(*args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        response = MagicMock()
+        response.json.return_value = {"embeddings": [[0.1]]}
+        return response
+
+    mocker.patch('httpx.AsyncClient.post', new=AsyncMock(side_effect=slow_post))
+    helper = OllamaEmbeddingHelper()
+
+    await asyncio.gather(*(helper.aget_embedding(f"text {i}") for i in range(6)))
+
+    assert peak == 2
+
 import yaml
 from datetime import datetime
 from cortex.services.knowledge_graph_service import KnowledgeGraphService
@@ -184,6 +401,27 @@ def kg_service(tmp_path):
     """Fixture to provide an instance of KnowledgeGraphService using a temporary directory."""
     return KnowledgeGraphService(base_path=str(tmp_path))
 
+def test_kg_service_creates_directories_once_per_base_path(tmp_path, mocker):
+    """Test that further services for the same graph skip the mkdir calls."""
+    kg_service = KnowledgeGraphService(base_path=str(tmp_path))
+    assert (tmp_path / "insights").is_dir()
+    assert (tmp_path / "repositories").is_dir()
+
+    mock_mkdir = mocker.patch("pathlib.Path.mkdir")
+    KnowledgeGraphService(base_path=str(tmp_path))
+    KnowledgeGraphService(base_path=str(tmp_path / "other"))
+
+    assert mock_mkdir.call_count == 2
+    assert kg_service.base_path in KnowledgeGraphService._prepared_paths
+
+def test_services_share_process_settings(llm_service, mocker, tmp_path):
+    """Test that services read the cached settings instead of building their own."""
+    from cortex.core.config import get_settings
+    mocker.patch.object(get_settings(), 'knowledge_graph_path', str(tmp_path / "kg"))
+
+    assert llm_service.settings is get_settings()
+    assert KnowledgeGraphService().base_path == tmp_path / "kg"
+
 @pytest.fixture
 def sample_commit_insight():
     """Fixture for a sample insight from a GitCommitEvent."""
@@ -246,6 +484,52 @@ def test_create_insight_node_for_commit(kg_service, sample_commit_insight, tmp_p
         assert "[[../repositories/test-repo.md]]" in content
         assert "# Insight: Initial feature implementation." in content
 
+def test_create_insight_node_overwrites_in_one_write(kg_service, sample_commit_insight, tmp_path, mocker):
+    """Test that re-creating an insight node replaces the old file with a single write."""
+    insight_file = tmp_path / "insights" / "git.commit.abcdef123456.md"
+    insight_file.write_text("stale content that is longer than nothing " * 100)
+    write = mocker.spy(os, "write")
+
+    kg_service._create_insight_node(sample_commit_insight)
+
+    assert write.call_count == 1
+    content = insight_file.read_text(encoding="utf-8")
+    assert content.startswith("---\n")
+    assert "stale content" not in content
+
+def _read_frontmatter(insight_file):
+    return yaml.safe_load(insight_file.read_text(encoding="utf-8").split("---\n")[1])
+
+def test_insight_frontmatter_round_trips(kg_service, sample_commit_insight, tmp_path):
+    """Test that the emitted front matter parses back to the insight's values."""
+    tricky = [
+        "null", "- not a list", 'quote " and \\ slash', "colon: value", "line\nbreak\u2028sep", "\x85next", "12", "",
+        "tab\tbell\x07del\x7f", "c1\x9f", "para\u2029end\ufffe\uffff", "caf\u00e9 \u2603 \U0001F600", "'single'", "# not a comment",
+    ]
+    insight = sample_commit_insight.model_copy(update={"patterns": tricky})
+
+    insight_file = kg_service._create_insight_node(insight)
+
+    assert _read_frontmatter(insight_file) == {
+        "insight_id": "insight-commit-1",
+        "source_event_type": "git_commit",
+        "timestamp": "2023-01-01T12:00:00",
+        "patterns": tricky,
+        "parent_nodes": ["[[../repositories/test-repo.md]]"],
+    }
+
+def test_insight_frontmatter_matches_yaml_dump(kg_service, sample_code_change_insight, tmp_path):
+    """Test that the specialised emitter and the PyYAML fallback agree."""
+    fast_file = kg_service._create_insight_node(sample_code_change_insight)
+    fast = _read_frontmatter(fast_file)
+    fast_file.unlink()
+
+    kg_service.fast_frontmatter = False
+    fallback = _read_frontmatter(kg_service._create_insight_node(sample_code_change_insight))
+
+    assert fast == fallback
+    assert fast["parent_nodes"] == []
+
 def test_update_index_node(kg_service, tmp_path):
     """Test creating and appending to an index node."""
     index_file = tmp_path / "repositories" / "my-repo.md"
@@ -269,6 +553,81 @@ def test_update_index_node(kg_service, tmp_path):
         assert content.count("- [[") == 2
         assert "- [[../insights/another-insight.md]]" in content
 
+def test_update_index_node_links_from_nested_index(kg_service, tmp_path, mocker):
+    """Test that only the repository-to-insight link skips the relative path walk."""
+    relpath = mocker.spy(os.path, "relpath")
+    nested_index = tmp_path / "repositories" / "org" / "my-repo.md"
+    nested_index.parent.mkdir()
+
+    kg_service._update_index_node(tmp_path / "repositories" / "my-repo.md", tmp_path / "insights" / "a.md")
+    relpath.assert_not_called()
+    kg_service._update_index_node(nested_index, tmp_path / "insights" / "a.md")
+
+    relpath.assert_called_once()
+    assert "- [[../../insights/a.md]]" in nested_index.read_text()
+
+def test_update_index_node_recreates_deleted_index(kg_service, tmp_path):
+    """Test that an index node removed between appends is recreated with its header."""
+    index_file = tmp_path / "repositories" / "my-repo.md"
+    kg_service._update_index_node(index_file, tmp_path / "insights" / "first.md")
+    index_file.unlink()
+
+    kg_service._update_index_node(index_file, tmp_path / "insights" / "second.md")
+
+    content = index_file.read_text()
+    assert content.startswith("# Index: my-repo")
+    assert "first.md" not in content
+    assert "- [[../insights/second.md]]" in content
+
+def test_deferred_index_appends_are_written_together(kg_service, tmp_path, mocker):
+    """Test that deferred links reach an index node in one append on flush."""
+    from cortex.services.knowledge_graph_service import defer_index_appends, flush_index_appends
+    index_file = tmp_path / "repositories" / "my-repo.md"
+    write = mocker.spy(os, "write")
+
+    with defer_index_appends():
+        kg_service._update_index_node(index_file, tmp_path / "insights" / "first.md")
+        kg_service._update_index_node(index_file, tmp_path / "insights" / "second.md")
+    assert not index_file.exists()
+
+    flush_index_appends()
+
+    assert write.call_count == 1
+    content = index_file.read_text()
+    assert content.startswith("# Index: my-repo")
+    assert "- [[../insights/first.md]]\n- [[../insights/second.md]]\n" in content
+
+def test_failed_index_flush_keeps_only_that_nodes_links_queued(kg_service, tmp_path):
+    """Test that one index node failing mid-burst does not drop the other nodes' links."""
+    from cortex.services import knowledge_graph_service
+    from cortex.services.knowledge_graph_service import defer_index_appends, flush_index_appends
+    good_index = tmp_path / "repositories" / "good-repo.md"
+    broken_index = tmp_path / "repositories" / "broken-repo.md"
+    other_index = tmp_path / "repositories" / "other-repo.md"
+    real_get_append_fd = knowledge_graph_service._get_append_fd
+
+    def get_append_fd(path):
+        if path == str(broken_index):
+            raise OSError(28, "No space left on device")
+        return real_get_append_fd(path)
+
+    with defer_index_appends():
+        for index_file in (good_index, broken_index, other_index):
+            kg_service._update_index_node(index_file, tmp_path / "insights" / "first.md")
+
+    with patch.object(knowledge_graph_service, "_get_append_fd", side_effect=get_append_fd):
+        with pytest.raises(ServiceError, match="broken-repo.md: .*No space left on device"):
+            flush_index_appends()
+
+    assert "- [[../insights/first.md]]" in good_index.read_text()
+    assert "- [[../insights/first.md]]" in other_index.read_text()
+    assert not broken_index.exists()
+
+    flush_index_appends()
+
+    assert broken_index.read_text().startswith("# Index: broken-repo")
+    assert good_index.read_text().count("first.md") == 1
+
 def test_process_insight_for_commit(kg_service, sample_commit_insight, tmp_path):
     """Test the end-to-end processing of a commit insight."""
     kg_service.process_insight(sample_commit_insight)
@@ -336,11 +695,41 @@ async def test_add_document_error(upstash_service):
     content = "Error content."
     metadata = {"source": "error"}
 
-    # We don't expect a ServiceError here, as the current implementation only logs the error.
-    # If the requirement changes to raise a ServiceError, this test would need to be updated.
-    await upstash_service.add_document(doc_id, content, metadata)
+    # Failures are raised so callers such as UpstashWriter can report them.
+    with pytest.raises(ServiceError, match="Upstash is down"):
+        await upstash_service.add_document(doc_id, content, metadata)
     upstash_service.index.upsert.assert_called_once()
-    # Further assertions could be added to check logging output if needed.
+
+@pytest.mark.asyncio
+async def test_concurrent_add_document_calls_share_one_upsert(upstash_service):
+    """Test that documents added concurrently are sent in a single bulk upsert."""
+    await asyncio.gather(*(
+        upstash_service.add_document(f"doc_{i}", f"content {i}", {"i": i}) for i in range(3)
+    ))
+
+    upstash_service.index.upsert.assert_called_once()
+    vectors = upstash_service.index.upsert.call_args.kwargs["vectors"]
+    assert [vector.id for vector in vectors] == ["doc_0", "doc_1", "doc_2"]
+
+@pytest.mark.asyncio
+async def test_add_documents_chunks_upserts(upstash_service, mocker):
+    """Test that bulk adds are split into upserts of UPSTASH_UPSERT_BATCH_SIZE vectors."""
+    mocker.patch('cortex.services.upstash_service.UPSTASH_UPSERT_BATCH_SIZE', 2)
+    documents = [(f"doc_{i}", f"content {i}", {"i": i}) for i in range(5)]
+
+    await upstash_service.add_documents(documents)
+
+    sent = [call.kwargs["vectors"] for call in upstash_service.index.upsert.call_args_list]
+    assert [len(vectors) for vectors in sent] == [2, 2, 1]
+    assert [vector.id for vectors in sent for vector in vectors] == [f"doc_{i}" for i in range(5)]
+
+@pytest.mark.asyncio
+async def test_add_documents_error_raises_service_error(upstash_service):
+    """Test that a failed bulk upsert raises ServiceError."""
+    upstash_service.index.upsert.side_effect = Exception("Upstash is down")
+
+    with pytest.raises(ServiceError, match="Failed to add documents to Upstash"):
+        await upstash_service.add_documents([("doc", "content", {})])
 
 @pytest.mark.asyncio
 async def test_query_success(upstash_service, mocker):
@@ -358,4 +747,68 @@ async def test_query_success(upstash_service, mocker):
         data=query_text,
         top_k=1,
         include_metadata=True
-    )
\ No newline at end of file
+    )
+
+# Tests for PromptManager
+from cortex.services.prompt_manager import PromptManager, get_prompt_manager
+
+def test_prompt_manager_caches_static_render(mocker):
+    """Test that a render without variables is only rendered once."""
+    prompt_manager = PromptManager()
+    template_render = mocker.spy(prompt_manager._templates["knowledge_gateway.jinja2"], "render")
+
+    first = prompt_manager.render("knowledge_gateway.jinja2")
+    second = prompt_manager.render("knowledge_gateway.jinja2")
+
+    assert first == second
+    assert template_render.call_count == 1
+
+def test_prompt_manager_precompiles_templates(mocker):
+    """Test that shipped templates are compiled at init and not looked up on render."""
+    prompt_manager = PromptManager()
+    get_template = mocker.spy(prompt_manager.env, "get_template")
+
+    rendered = prompt_manager.render("commit_summary.jinja2", commit_message="feat: x", commit_diff="diff")
+
+    assert "commit_summary.jinja2" in prompt_manager._templates
+    assert "feat: x" in rendered
+    get_template.assert_not_called()
+
+def test_prompt_manager_uses_precompiled_templates(tmp_path, mocker):
+    """Test that precompiled template modules render the same prompts as the sources."""
+    from cortex.services import prompt_manager as prompt_manager_module
+    from jinja2 import ModuleLoader
+    source_render = PromptManager().render("commit_summary.jinja2", commit_message="feat: x", commit_diff="diff")
+
+    prompt_manager_module.compile_prompts(tmp_path)
+    mocker.patch.object(prompt_manager_module, 'COMPILED_PROMPTS_DIR', tmp_path)
+    prompt_manager = PromptManager()
+
+    assert isinstance(prompt_manager.env.loader.loaders[0], ModuleLoader)
+    assert prompt_manager.render("commit_summary.jinja2", commit_message="feat: x", commit_diff="diff") == source_render
+
+def test_prompt_manager_prefers_sources_newer_than_compiled_templates(tmp_path, mocker):
+    """Test that added or edited prompts are read from source when compiled modules exist."""
+    import shutil
+    from cortex.services import prompt_manager as prompt_manager_module
+    sources = tmp_path / "prompts"
+    compiled = tmp_path / "compiled"
+    shutil.copytree(prompt_manager_module.PROMPTS_DIR, sources)
+    mocker.patch.object(prompt_manager_module, 'PROMPTS_DIR', sources)
+    mocker.patch.object(prompt_manager_module, 'COMPILED_PROMPTS_DIR', compiled)
+    prompt_manager_module.compile_prompts(compiled)
+
+    edited = sources / "knowledge_gateway.jinja2"
+    edited.write_text("Edited prompt")
+    stat = edited.stat()
+    os.utime(edited, (stat.st_atime, stat.st_mtime + 10))
+    (sources / "new_prompt.jinja2").write_text("New prompt for {{ name }}")
+    prompt_manager = PromptManager()
+
+    assert prompt_manager.render("knowledge_gateway.jinja2") == "Edited prompt"
+    assert prompt_manager.render("new_prompt.jinja2", name="tests") == "New prompt for tests"
+    assert "feat: x" in prompt_manager.render("commit_summary.jinja2", commit_message="feat: x", commit_diff="diff")
+
+def test_get_prompt_manager_is_shared():
+    """Test that processors share one PromptManager."""
+    assert get_prompt_manager() is get_prompt_manager()
@@ -2,6 +2,7 @@
 Unit tests for ARQ worker tasks.
 Tests: process_event_task, synthesis_task, on_startup, on_shutdown, WorkerSettings
 """
+import httpx
 import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
 from datetime import datetime
@@ -11,7 +12,8 @@ from cortex.workers import (
     synthesis_task,
     on_startup,
     on_shutdown,
-    WorkerSettings
+    WorkerSettings,
+    _warm_connections,
 )
 
 
@@ -29,6 +31,19 @@ def mock_context():
     return ctx
 
 
+def patch_worker_services(mocker):
+    """Patches the service classes the worker builds and returns their instances by context key."""
+    services = {}
+    for key, name in [
+        ("kg_service", "KnowledgeGraphService"),
+        ("chroma_service", "ChromaService"),
+        ("llm_service", "LLMService"),
+        ("upstash_service", "UpstashService"),
+    ]:
+        services[key] = mocker.patch(f'cortex.workers.{name}').return_value
+    return services
+
+
 @pytest.fixture
 def sample_git_commit_event_data():
     """Sample raw git commit event data."""
@@ -73,12 +88,47 @@ class TestOnStartup:
             return_value=mock_pool
         )
 
+        patch_worker_services(mocker)
+        mocker.patch('cortex.workers._warm_connections', new_callable=AsyncMock)
+
         ctx = {}
         await on_startup(ctx)
 
         mock_create_pool.assert_called_once()
         assert ctx["redis"] == mock_pool
 
+    @pytest.mark.asyncio
+    async def test_caches_services_and_warms_connections(self, mocker):
+        """Test that on_startup builds the shared services once and pre-warms their connections."""
+        mocker.patch('cortex.workers.create_redis_pool', new_callable=AsyncMock)
+        mock_services = patch_worker_services(mocker)
+        mock_warm = mocker.patch('cortex.workers._warm_connections', new_callable=AsyncMock)
+
+        ctx = {}
+        await on_startup(ctx)
+
+        for key, service in mock_services.items():
+            assert ctx[key] is service
+        mock_warm.assert_awaited_once_with(ctx)
+
+    @pytest.mark.asyncio
+    async def test_warm_up_failures_are_only_logged(self, mocker):
+        """Test that unreachable endpoints during warm-up do not fail startup."""
+        mock_async_client = MagicMock()
+        mock_async_client.head = AsyncMock(side_effect=httpx.ConnectError("LLM is down"))
+        mocker.patch('cortex.workers.get_async_ollama_client', return_value=mock_async_client)
+        mock_client = MagicMock()
+        mocker.patch('cortex.workers.get_ollama_client', return_value=mock_client)
+        mock_upstash = MagicMock()
+        mock_upstash.index.info = AsyncMock()
+        mock_logger = mocker.patch('cortex.workers.logger')
+
+        await _warm_connections({"upstash_service": mock_upstash})
+
+        mock_client.head.assert_called_once()
+        mock_upstash.index.info.assert_awaited_once()
+        mock_logger.warning.assert_called_once()
+
 
 # ============================================================================
 # on_shutdown Tests
@@ -114,6 +164,36 @@ class TestOnShutdown:
 
         mock_close.assert_called_once_with(None)
 
+    @pytest.mark.asyncio
+    async def test_closes_ollama_client(self, mocker):
+        """Test that on_shutdown closes the shared LLM HTTP client."""
+        mocker.patch('cortex.workers.close_redis_pool', new_callable=AsyncMock)
+        mock_close_client = mocker.patch('cortex.workers.close_ollama_client')
+
+        await on_shutdown({})
+
+        mock_close_client.assert_called_once_with()
+
+    @pytest.mark.asyncio
+    async def test_closes_async_embedding_client(self, mocker):
+        """Test that on_shutdown closes the async embedding HTTP client."""
+        mocker.patch('cortex.workers.close_redis_pool', new_callable=AsyncMock)
+        mock_close_client = mocker.patch('cortex.workers.close_async_embedding_client', new_callable=AsyncMock)
+
+        await on_shutdown({})
+
+        mock_close_client.assert_awaited_once_with()
+
+    @pytest.mark.asyncio
+    async def test_closes_async_ollama_client(self, mocker):
+        """Test that on_shutdown closes the async LLM HTTP client."""
+        mocker.patch('cortex.workers.close_redis_pool', new_callable=AsyncMock)
+        mock_close_client = mocker.patch('cortex.workers.close_async_ollama_client', new_callable=AsyncMock)
+
+        await on_shutdown({})
+
+        mock_close_client.assert_awaited_once_with()
+
 
 # ============================================================================
 # process_event_task Tests
@@ -232,6 +312,24 @@ class TestProcessEventTask:
         assert len(processors[2]) == 2  # KnowledgeGraphWriter and ChromaWriter
 
 
+    @pytest.mark.asyncio
+    async def test_reuses_services_from_context(self, mock_context, sample_git_commit_event_data, mocker):
+        """Test that services cached on the context are used instead of new ones."""
+        mock_kg_cls = mocker.patch('cortex.workers.KnowledgeGraphService')
+        mock_context["kg_service"] = MagicMock()
+        mocker.patch('cortex.workers.ChromaService')
+        mocker.patch('cortex.workers.LLMService')
+        mock_pipeline_cls = mocker.patch('cortex.workers.Pipeline')
+        mock_pipeline_cls.return_value.execute = AsyncMock()
+
+        await process_event_task(mock_context, sample_git_commit_event_data)
+        await process_event_task(mock_context, sample_git_commit_event_data)
+
+        mock_kg_cls.assert_not_called()
+        writers = mock_pipeline_cls.call_args[0][0][2]
+        assert writers[0].kg_service is mock_context["kg_service"]
+
+
 # ============================================================================
 # synthesis_task Tests
 # ============================================================================
@@ -370,3 +468,28 @@ class TestWorkerSettings:
     def test_queues_list_length(self):
         """Test that exactly 2 queues are configured."""
         assert len(WorkerSettings.queues) == 2
+
+    def test_jobs_round_trip_through_json_serializer(self):
+        """Test that the worker decodes jobs the API pool encodes."""
+        from cortex.core.redis import job_serializer
+
+        job = {"t": 1, "f": "synthesis_task", "a": ["query text"], "k": {}, "et": 1700000000000}
+
+        encoded = WorkerSettings.job_serializer(job)
+
+        assert encoded == job_serializer(job)
+        assert WorkerSettings.job_deserializer(encoded) == job
+
+    def test_failed_job_result_keeps_the_error(self):
+        """Test that an exception stored as a job result survives JSON serialization."""
+        from arq.jobs import deserialize_result, serialize_result
+
+        encoded = serialize_result(
+            "process_event_task", (), {}, 1, 0, False, TimeoutError("job timed out"),
+            0, 0, "process_event_task:job-id", "arq:queue", "job-id",
+            serializer=WorkerSettings.job_serializer,
+        )
+        info = deserialize_result(encoded, deserializer=WorkerSettings.job_deserializer)
+
+        assert info.success is False
+        assert info.result == "TimeoutError: job timed out"